@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Admission Control - start conversion jobs only when there is memory for them
+
+Each job reserves its estimated peak memory against a host budget before
+it starts. A job that does not fit stays queued, without holding a worker,
+and smaller or more urgent jobs that fit may start before it - until it has
+waited MAX_PASSED_SECONDS, after which the budget is left to drain for it.
+Besides the reservations, the memory the process actually grew by while
+jobs are running is sampled, so jobs that use more than estimated hold back
+the queue as well.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from html2pdf.cost_model import rss_mb
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_MB = 256.0  # reservation of a job that cannot be estimated
+SAMPLE_SECONDS = 0.5  # interval of memory samples and of re-checking waiting jobs
+BUDGET_FRACTION = 0.75  # default budget: share of the host's physical memory
+MAX_PASSED_SECONDS = 600  # after waiting this long for memory, a job is no longer passed by others
+
+
+def host_memory_mb() -> Optional[float]:
+    """Physical memory of the host in MB (None where /proc/meminfo is unavailable)."""
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemTotal:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def default_budget_mb() -> float:
+    """BUDGET_FRACTION of the host's memory, 0 (admission disabled) if it is unknown."""
+    total = host_memory_mb()
+    return round(total * BUDGET_FRACTION) if total else 0
+
+
+class AdmissionController:
+    """
+    Memory budget shared by the running conversion jobs.
+
+    A job is admitted when its estimate fits next to what is in use: the
+    larger of the running jobs' reservations and the observed growth of the
+    process since it was last idle. A job larger than the whole budget runs,
+    alone, once nothing else is running. The job queue decides which job to
+    try next; jobs that did not fit are listed as waiting.
+    """
+
+    def __init__(self, budget_mb: float, estimate: Optional[Callable[..., float]] = None,
+                 memory_probe: Callable[[], Optional[float]] = rss_mb):
+        """
+        Args:
+            budget_mb: Memory the running jobs may use together
+            estimate: estimate(kind, args, kwargs) -> expected peak MB of a job
+            memory_probe: Current memory of the process in MB (None if unknown)
+        """
+        self.budget_mb = budget_mb
+        self.estimate = estimate
+        self.memory_probe = memory_probe
+        self._condition = threading.Condition()
+        self._waiting: "OrderedDict[str, float]" = OrderedDict()  # job id -> when it first did not fit
+        self._running: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._baseline = memory_probe()
+        self._observed = 0.0
+        self._sampler: Optional[threading.Thread] = None
+        self.admitted = 0
+        self.waited = 0
+
+    def estimate_mb(self, kind: str, args: tuple = (), kwargs: Optional[Dict[str, Any]] = None) -> float:
+        """Memory to reserve for a job: its estimated peak in MB."""
+        kwargs = kwargs or {}
+        if self.estimate is None:
+            return DEFAULT_JOB_MB
+        try:
+            return max(0.0, float(self.estimate(kind, args, kwargs)))
+        except Exception as e:
+            logger.warning(f"⚠️  No memory estimate for a {kind} job, reserving {DEFAULT_JOB_MB:.0f} MB: {e}")
+            return DEFAULT_JOB_MB
+
+    def _sample(self) -> None:
+        # Called with the condition held
+        current = self.memory_probe()
+        if current is None or self._baseline is None:
+            return
+        if not self._running:
+            self._baseline = current
+            self._observed = 0.0
+            return
+        self._observed = max(0.0, current - self._baseline)
+        for job in self._running.values():
+            job['observed_peak_mb'] = max(job['observed_peak_mb'], self._observed)
+
+    def _in_use(self) -> float:
+        reserved = sum(job['reserved_mb'] for job in self._running.values())
+        return max(reserved, self._observed)
+
+    def try_admit(self, job_id: str, kind: str, reserve_mb: float) -> bool:
+        """
+        Reserve a job's memory if it fits into the budget now.
+
+        Args:
+            job_id: Job to admit
+            kind: Job type, for the log
+            reserve_mb: Memory to reserve (see estimate_mb)
+
+        Returns:
+            True if the job was admitted and may start; False if it has to
+            wait, in which case it is listed as waiting
+        """
+        with self._condition:
+            self._sample()
+            if self._running and self._in_use() + reserve_mb > self.budget_mb:
+                if job_id not in self._waiting:
+                    self._waiting[job_id] = time.time()
+                    self.waited += 1
+                    logger.info(f"⏸️  {kind} job {job_id} waits for memory: needs {reserve_mb:.0f} MB, "
+                                f"{self._in_use():.0f}/{self.budget_mb:.0f} MB in use")
+                return False
+            self._waiting.pop(job_id, None)
+            if reserve_mb > self.budget_mb:
+                logger.warning(f"⚠️  {kind} job {job_id} needs {reserve_mb:.0f} MB, more than the "
+                               f"{self.budget_mb:.0f} MB budget: running it alone")
+            self._running[job_id] = {'kind': kind, 'reserved_mb': reserve_mb, 'observed_peak_mb': 0.0,
+                                     'admitted_at': time.time()}
+            self.admitted += 1
+            if self._sampler is None or not self._sampler.is_alive():
+                self._sampler = threading.Thread(target=self._sample_while_running, name='admission-sampler',
+                                                 daemon=True)
+                self._sampler.start()
+            return True
+
+    def held_back(self, job_id: str) -> bool:
+        """Whether a job has waited for memory so long that no other job may start before it."""
+        with self._condition:
+            since = self._waiting.get(job_id)
+            return since is not None and time.time() - since >= MAX_PASSED_SECONDS
+
+    def release(self, job_id: str) -> None:
+        """Return a finished job's reservation."""
+        with self._condition:
+            job = self._running.pop(job_id, None)
+            if job is not None:
+                logger.info(f"📉 {job['kind']} job {job_id}: reserved {job['reserved_mb']:.0f} MB, "
+                            f"process grew by up to {job['observed_peak_mb']:.0f} MB")
+            self._sample()
+
+    def _sample_while_running(self) -> None:
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                self._sample()
+            time.sleep(SAMPLE_SECONDS)
+
+    def stats(self) -> Dict[str, Any]:
+        """Budget, memory in use and the jobs running and waiting."""
+        with self._condition:
+            self._sample()
+            in_use = self._in_use()
+            return {
+                'budget_mb': self.budget_mb,
+                'reserved_mb': round(sum(job['reserved_mb'] for job in self._running.values()), 1),
+                'observed_mb': round(self._observed, 1),
+                'in_use_mb': round(in_use, 1),
+                'headroom_mb': round(max(0.0, self.budget_mb - in_use), 1),
+                'running': [{'job_id': job_id, 'kind': job['kind'], 'reserved_mb': round(job['reserved_mb'], 1),
+                             'observed_peak_mb': round(job['observed_peak_mb'], 1)}
+                            for job_id, job in self._running.items()],
+                'waiting': list(self._waiting),
+                'queue_depth': len(self._waiting),
+                'admitted': self.admitted,
+                'waited': self.waited
+            }
@@ -1,11 +1,19 @@
-from flask import Flask, render_template, request, send_file, jsonify, redirect, url_for
+from flask import Flask, Response, render_template, request, send_file, jsonify, redirect, url_for, stream_with_context
 from werkzeug.utils import secure_filename
 from dxf_converter import DXFToPDFConverter
-from html2pdf.service import HTMLToPDFService
-from unified_converter import UnifiedConverter
+from admission import AdmissionController, default_budget_mb
+from jobs import DEFAULT_WORKERS, PRIORITIES, JobManager
+from job_store import JobStore
+from catalog import COLLECTIONS, DEFAULT_PER_PAGE, FileCatalog
+from html2pdf import checkpoints, cost_model, progress
+from html2pdf.progress import ProgressBus
 from pathlib import Path
 import os
+import json
+import hashlib
 import logging
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -15,44 +23,289 @@ app.config['SECRET_KEY'] = os.environ.get('SESSION_SECRET', 'dev-secret-key-chan
 app.config['MAX_CONTENT_LENGTH'] = 100 * 1024 * 1024
 app.config['UPLOAD_FOLDER'] = 'INPUT_DATA'
 app.config['OUTPUT_FOLDER'] = 'OUTPUT_PDF'
+app.config['HTML_BACKEND'] = os.environ.get('HTML_BACKEND', 'wkhtmltopdf')
+app.config['HTML_OUTPUT_PROFILE'] = os.environ.get('HTML_OUTPUT_PROFILE', 'quality')
+app.config['DXF_COMBINE_MODE'] = os.environ.get('DXF_COMBINE_MODE', 'merge')
+app.config['INCREMENTAL_SESSIONS'] = os.environ.get('INCREMENTAL_SESSIONS', '0') == '1'
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', DEFAULT_WORKERS))
+app.config['JOB_STORE'] = os.environ.get('JOB_STORE', 'LOGS/job_store.sqlite3')
+# Warm worker processes for DXF conversions of explicit file lists (0 = convert in the job thread)
+app.config['DXF_WORKER_PROCESSES'] = int(os.environ.get('DXF_WORKER_PROCESSES', 0))
+app.config['DXF_WORKER_MAX_TASKS'] = int(os.environ.get('DXF_WORKER_MAX_TASKS', 50))
+# Run each DXF conversion in a child process with CPU-time and address-space limits
+app.config['DXF_ISOLATION'] = os.environ.get('DXF_ISOLATION', '0') == '1'
+app.config['DXF_CPU_LIMIT_SECONDS'] = int(os.environ.get('DXF_CPU_LIMIT_SECONDS', 600))
+app.config['DXF_MEMORY_LIMIT_MB'] = int(os.environ.get('DXF_MEMORY_LIMIT_MB', 4096))
+app.config['DXF_TIMEOUT_SECONDS'] = float(os.environ.get('DXF_TIMEOUT_SECONDS', 900))
+# Jobs estimated to finish within this many seconds are queued as interactive
+app.config['INTERACTIVE_MAX_SECONDS'] = float(os.environ.get('INTERACTIVE_MAX_SECONDS', 30))
+# Waiting interactive jobs preempt DXF batch jobs at page-batch boundaries
+app.config['JOB_PREEMPTION'] = os.environ.get('JOB_PREEMPTION', '1') == '1'
+# Identical requests (same inputs and settings) attach to the unfinished job instead of converting again
+app.config['COALESCE_JOBS'] = os.environ.get('COALESCE_JOBS', '1') == '1'
+# Memory the running conversion jobs may use together (MB; 0 disables admission control)
+app.config['ADMISSION_MEMORY_MB'] = float(os.environ.get('ADMISSION_MEMORY_MB', default_budget_mb()))
+# Past conversion costs the preflight estimates are calibrated on
+app.config['PREFLIGHT_MODEL'] = os.environ.get('PREFLIGHT_MODEL', 'LOGS/preflight_model.json')
 
-# Initialize converters with 3 scale options
-standard_converter = DXFToPDFConverter(scale_mode='standard')      # Standard scale
-enlarged_2x_converter = DXFToPDFConverter(scale_mode='enlarged_2x') # 2x enlarged scale
-maximum_4x_converter = DXFToPDFConverter(scale_mode='maximum_4x')   # 4x maximum detail
+# Converters, the job store and their heavy imports (matplotlib, ezdxf,
+# reportlab, PyPDF2) are created on first use, so importing the app is fast
+# and touches no files
+_converters = {}
+_converters_lock = threading.Lock()
 
-# Default converter (for backward compatibility)
-converter = standard_converter
-html_converter = HTMLToPDFService(app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'], 
-                                      page_size='A4', orientation='Portrait')
-unified_converter = UnifiedConverter(app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'])
+def get_dxf_converter(scale_mode='standard'):
+    """DXF converter of a scale mode ('standard', 'enlarged_2x' or 'maximum_4x'), created on first use."""
+    if scale_mode not in DXFToPDFConverter.SCALE_OPTIONS:
+        scale_mode = 'standard'
+    with _converters_lock:
+        if scale_mode not in _converters:
+            _converters[scale_mode] = DXFToPDFConverter(scale_mode=scale_mode)
+        return _converters[scale_mode]
+
+def get_html_converter():
+    """HTML to PDF service, created on first use."""
+    with _converters_lock:
+        if 'html' not in _converters:
+            from html2pdf.service import HTMLToPDFService
+            _converters['html'] = HTMLToPDFService(app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'], 
+                                                   page_size='A4', orientation='Portrait',
+                                                   backend=app.config['HTML_BACKEND'],
+                                                   output_profile=app.config['HTML_OUTPUT_PROFILE'])
+        return _converters['html']
+
+def get_dxf_limits():
+    """Resource limits of isolated DXF conversions (None unless DXF_ISOLATION is on)."""
+    if not app.config['DXF_ISOLATION']:
+        return None
+    from isolation import ResourceLimits
+    return ResourceLimits(cpu_seconds=app.config['DXF_CPU_LIMIT_SECONDS'] or None,
+                          memory_limit_mb=app.config['DXF_MEMORY_LIMIT_MB'] or None,
+                          timeout_seconds=app.config['DXF_TIMEOUT_SECONDS'] or None)
+
+_dxf_pool = None
+
+def get_dxf_pool():
+    """Warm DXF worker pool (DXF_WORKER_PROCESSES > 0), started on first use; None if disabled."""
+    global _dxf_pool
+    if app.config['DXF_WORKER_PROCESSES'] <= 0:
+        return None
+    with _converters_lock:
+        if _dxf_pool is None:
+            from worker_pool import WarmWorkerPool
+            _dxf_pool = WarmWorkerPool(workers=app.config['DXF_WORKER_PROCESSES'],
+                                       max_tasks_per_worker=app.config['DXF_WORKER_MAX_TASKS'],
+                                       output_folder=app.config['OUTPUT_FOLDER'])
+        return _dxf_pool
+
+def get_cost_model():
+    """Preflight cost model, loaded on first use; conversions in this process calibrate it."""
+    with _converters_lock:
+        if cost_model.active() is None:
+            cost_model.set_model(cost_model.CostModel(app.config['PREFLIGHT_MODEL']))
+        return cost_model.active()
+
+# Background workers for the conversion endpoints; jobs and their checkpoints
+# are persisted so a restart resumes interrupted conversions
+progress_bus = ProgressBus()
+_job_manager = None
+_job_manager_lock = threading.Lock()
+
+def _file_estimates(files, file_kind, estimate_key, value):
+    """
+    Quick estimates (one value each) of a job's input files; all inputs of the kind if files is empty.
+    
+    Runs in the request thread before the job is admitted, so files are
+    not parsed: see preflight.quick_estimate.
+    """
+    from preflight import quick_estimate
+    
+    model = get_cost_model()
+    upload_folder = Path(app.config['UPLOAD_FOLDER'])
+    if file_kind == 'dxf' and estimate_key not in DXFToPDFConverter.SCALE_OPTIONS:
+        estimate_key = 'standard'
+    values = []
+    for filename in files or catalog.names('inputs', kind=file_kind):
+        path = upload_folder / filename
+        if path.exists():
+            values.append(quick_estimate(path, estimate_key, model)[value])
+    return sorted(values)
+
+def estimate_job_memory(kind, args, kwargs):
+    """Expected peak memory (MB) of a conversion job, from the quick estimates of its files."""
+    def peaks(files, file_kind, estimate_key):
+        return _file_estimates(files, file_kind, estimate_key, 'peak_mb')
+    
+    def dxf_peak(files, scale_mode):
+        values = peaks(files, 'dxf', scale_mode)
+        pool = get_dxf_pool()
+        # Files run one after another in the job thread, or several at once on the pool
+        return sum(values[-pool.workers:]) if pool is not None else max(values, default=0.0)
+    
+    if kind == 'dxf':
+        return dxf_peak(args[0], args[1])
+    if kind == 'html':
+        return max(peaks(args[0], 'html', 'default'), default=0.0)
+    # Unified sessions run the HTML and DXF pipelines at the same time
+    return max(peaks(None, 'html', 'default'), default=0.0) + dxf_peak(None, 'standard')
+
+def estimate_job_seconds(kind, args):
+    """Expected run time of a conversion job: the sum of its files' quick estimates."""
+    if kind == 'dxf':
+        return sum(_file_estimates(args[0], 'dxf', args[1], 'seconds'))
+    if kind == 'html':
+        return sum(_file_estimates(args[0], 'html', 'default', 'seconds'))
+    return sum(_file_estimates(None, 'html', 'default', 'seconds')) + \
+        sum(_file_estimates(None, 'dxf', 'standard', 'seconds'))
+
+def job_priority(data, kind, args):
+    """
+    Priority class of a submitted job: data['priority'] if given, otherwise
+    'interactive' for jobs estimated to finish within INTERACTIVE_MAX_SECONDS
+    and 'batch' for the rest (and for unified sessions).
+    """
+    if data.get('priority'):
+        return data['priority']
+    if kind == 'unified':
+        return 'batch'
+    try:
+        seconds = estimate_job_seconds(kind, args)
+    except Exception as e:
+        logger.warning(f"⚠️  No run time estimate for a {kind} job, queueing it as batch: {e}")
+        return 'batch'
+    return 'interactive' if seconds <= app.config['INTERACTIVE_MAX_SECONDS'] else 'batch'
+
+def request_user(data):
+    """Who submitted a request, for fairness between users: data['user'], the X-User header or the client address."""
+    return str(data.get('user') or request.headers.get('X-User') or request.remote_addr or 'anonymous')
+
+MAX_CACHED_HASHES = 1024
+# (path, mtime, size) -> content hash, so repeated requests hash a file once
+_input_hashes = {}
+
+def _input_sha256(path):
+    from conversion_manifest import file_sha256
+    
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+    if key not in _input_hashes:
+        if len(_input_hashes) >= MAX_CACHED_HASHES:
+            _input_hashes.pop(next(iter(_input_hashes)), None)
+        _input_hashes[key] = file_sha256(path)
+    return _input_hashes[key]
+
+def job_fingerprint(kind, args):
+    """Identity of a conversion job: its kind, arguments, the settings it runs with and the hashes of its inputs."""
+    upload_folder = Path(app.config['UPLOAD_FOLDER'])
+    if kind == 'dxf':
+        files = args[0] or catalog.names('inputs', kind='dxf')
+    elif kind == 'html':
+        files = args[0] or catalog.names('inputs', kind='html')
+    else:
+        files = catalog.names('inputs', kind='dxf') + catalog.names('inputs', kind='html')
+    inputs = {filename: _input_sha256(upload_folder / filename) for filename in files
+              if (upload_folder / filename).exists()}
+    settings = {name: app.config[name] for name in ('HTML_BACKEND', 'HTML_OUTPUT_PROFILE', 'DXF_COMBINE_MODE',
+                                                    'INCREMENTAL_SESSIONS', 'DXF_ISOLATION')}
+    payload = json.dumps({'kind': kind, 'args': list(args), 'inputs': inputs, 'settings': settings}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+_admission = None
+
+def get_admission():
+    """Admission control of the job manager (None if ADMISSION_MEMORY_MB is 0)."""
+    global _admission
+    if _admission is None and app.config['ADMISSION_MEMORY_MB'] > 0:
+        _admission = AdmissionController(app.config['ADMISSION_MEMORY_MB'], estimate=estimate_job_memory)
+    return _admission
+
+def get_job_manager():
+    """
+    Job manager backed by the job store; opened (resuming interrupted jobs) on
+    first use by a route that queues or inspects jobs, so other requests (the
+    index page, /health) never touch the store or start workers.
+    """
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            # Resumed jobs record what they cost as well
+            get_cost_model()
+            job_store = JobStore(app.config['JOB_STORE'])
+            _job_manager = JobManager(workers=app.config['JOB_WORKERS'], bus=progress_bus, store=job_store,
+                                      admission=get_admission(), preempt=app.config['JOB_PREEMPTION'])
+            # Jobs interrupted by the last shutdown continue from their checkpoints
+            _job_manager.resume({
+                'dxf': run_dxf_conversion,
+                'html': run_html_conversion,
+                'unified': run_unified_conversion
+            })
+        return _job_manager
+
+# Indexed listing of the input and output folders for the UI
+catalog = FileCatalog(app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'])
 
 ALLOWED_EXTENSIONS = {'dxf', 'DXF', 'html', 'htm', 'HTML', 'HTM'}
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1] in ALLOWED_EXTENSIONS
 
-@app.route('/')
-def index():
-    # Get DXF files
-    dxf_files = list(Path(app.config['UPLOAD_FOLDER']).glob('*.dxf'))
-    dxf_files.extend(Path(app.config['UPLOAD_FOLDER']).glob('*.DXF'))
-    dxf_files = sorted(set(dxf_files), key=lambda x: x.name)
-    
-    # Get HTML files
-    html_files = list(Path(app.config['UPLOAD_FOLDER']).glob('*.html'))
-    html_files.extend(Path(app.config['UPLOAD_FOLDER']).glob('*.htm'))
-    html_files.extend(Path(app.config['UPLOAD_FOLDER']).glob('*.HTML'))
-    html_files.extend(Path(app.config['UPLOAD_FOLDER']).glob('*.HTM'))
-    html_files = sorted(set(html_files), key=lambda x: x.name)
+def run_or_enqueue(data, kind, func, *args):
+    """Run a conversion in the request if data['sync'] is set, otherwise queue it as a job."""
+    get_cost_model()
+    if data.get('sync'):
+        return jsonify(func(*args))
     
-    # Get output PDF files
-    output_files = sorted(Path(app.config['OUTPUT_FOLDER']).glob('*.pdf'), key=lambda x: x.stat().st_mtime, reverse=True)
+    priority = job_priority(data, kind, args)
+    if priority not in PRIORITIES:
+        return jsonify({'error': f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}"}), 400
     
+    dedupe_key = job_fingerprint(kind, args) if app.config['COALESCE_JOBS'] else None
+    job_manager = get_job_manager()
+    submitted = time.time()
+    job = job_manager.submit(kind, func, *args, priority=priority, user=request_user(data), dedupe_key=dedupe_key)
+    return jsonify({
+        'success': True,
+        'job_id': job.id,
+        'status': job.status,
+        'priority': job.priority,
+        # Attached to an identical job that was already queued or running
+        'coalesced': job.submitted_at < submitted,
+        'queue_position': job_manager.queue_position(job.id),
+        'status_url': url_for('job_status', job_id=job.id),
+        'events_url': url_for('job_events', job_id=job.id)
+    }), 202
+
+@app.route('/')
+def index():
+    # Listings come from the catalog; folders are only re-read when they change
     return render_template('index.html', 
-                         dxf_files=[f.name for f in dxf_files],
-                         html_files=[f.name for f in html_files],
-                         output_files=[f.name for f in output_files])
+                         dxf_files=catalog.names('inputs', kind='dxf'),
+                         html_files=catalog.names('inputs', kind='html'),
+                         output_files=catalog.names('outputs', sort='mtime', order='desc'))
+
+@app.route('/catalog/<collection>')
+def catalog_listing(collection):
+    """Sorted, paginated listing of inputs, outputs or sessions (supports If-None-Match)."""
+    if collection not in COLLECTIONS:
+        return jsonify({'success': False, 'error': f'Unknown collection: {collection}'}), 404
+    try:
+        result = catalog.query(collection,
+                               sort=request.args.get('sort', 'name'),
+                               order=request.args.get('order', 'asc'),
+                               page=request.args.get('page', 1, type=int),
+                               per_page=request.args.get('per_page', DEFAULT_PER_PAGE, type=int),
+                               kind=request.args.get('type'),
+                               with_pages=request.args.get('pages') == '1')
+    except Exception as e:
+        logger.error(f"Error listing {collection}: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    etag = result.pop('etag')
+    if request.if_none_match.contains(etag):
+        return Response(status=304, headers={'ETag': f'"{etag}"'})
+    response = jsonify(dict(result, success=True))
+    response.set_etag(etag)
+    return response
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
@@ -60,6 +313,7 @@ def upload_file():
         return jsonify({'success': False, 'error': 'No files uploaded'}), 400
     
     files = request.files.getlist('files[]')
+    Path(app.config['UPLOAD_FOLDER']).mkdir(exist_ok=True)
     uploaded = []
     errors = []
     
@@ -73,6 +327,9 @@ def upload_file():
         elif file and file.filename:
             errors.append(f"{file.filename} - Invalid file type")
     
+    # Re-uploading a file under the same name does not change the folder's mtime
+    catalog.invalidate()
+    
     return jsonify({
         'success': True,
         'uploaded': uploaded,
@@ -80,6 +337,122 @@ def upload_file():
         'count': len(uploaded)
     })
 
+def run_dxf_conversion(files_to_convert, scale_mode):
+    """Convert DXF files (all of them if files_to_convert is empty) with one scale mode."""
+    # Choose converter based on scale mode
+    active_converter = get_dxf_converter(scale_mode)
+    
+    if get_dxf_pool() is not None:
+        # The pool schedules the whole batch by estimated cost
+        results = run_pooled_dxf_conversion(files_to_convert or catalog.names('inputs', kind='dxf'),
+                                            scale_mode)
+    elif not files_to_convert:
+        results = active_converter.batch_convert(limits=get_dxf_limits())
+    elif get_dxf_limits() is not None:
+        results = run_isolated_dxf_conversion(active_converter, files_to_convert, get_dxf_limits())
+    else:
+        results = []
+        progress.expect_files(len(files_to_convert))
+        for filename in files_to_convert:
+            dxf_path = Path(app.config['UPLOAD_FOLDER']) / filename
+            if dxf_path.exists():
+                success, output, pages = active_converter.convert_dxf_to_pdf(dxf_path)
+                results.append({
+                    'input': filename,
+                    'output': Path(output).name if success else output,
+                    'success': success,
+                    'pages': pages,
+                    'scale_mode': scale_mode
+                })
+    
+    successful = [r for r in results if r['success']]
+    failed = [r for r in results if not r['success']]
+    catalog.invalidate()
+    
+    return {
+        'success': True,
+        'total': len(results),
+        'successful': len(successful),
+        'failed': len(failed),
+        'results': results,
+        'scale_mode': scale_mode
+    }
+
+def run_isolated_dxf_conversion(active_converter, files_to_convert, limits):
+    """Convert a list of DXF files one by one in child processes with resource limits."""
+    from isolation import convert_isolated
+    
+    results = []
+    progress.expect_files(len(files_to_convert))
+    for filename in files_to_convert:
+        dxf_path = Path(app.config['UPLOAD_FOLDER']) / filename
+        if not dxf_path.exists():
+            continue
+        progress.emit('file_started', file=filename)
+        outcome = convert_isolated(dxf_path, scale_mode=active_converter.scale_mode,
+                                   output_folder=app.config['OUTPUT_FOLDER'], limits=limits)
+        progress.emit('file_done', file=filename, success=outcome['success'])
+        results.append({
+            'input': filename,
+            'output': Path(outcome['output']).name if outcome['success'] else outcome['output'],
+            'success': outcome['success'],
+            'pages': outcome['pages'],
+            'scale_mode': active_converter.scale_mode,
+            'status': outcome['status'],
+            'usage': outcome['usage']
+        })
+    active_converter.write_conversion_log(results)
+    return results
+
+def run_pooled_dxf_conversion(files_to_convert, scale_mode):
+    """Convert a list of DXF files in parallel on the warm worker pool, largest first."""
+    from scheduler import run_scheduled
+    
+    pool = get_dxf_pool()
+    if scale_mode not in DXFToPDFConverter.SCALE_OPTIONS:
+        scale_mode = 'standard'
+    journal = checkpoints.active()
+    progress.expect_files(len(files_to_convert))
+    output_folder = Path(app.config['OUTPUT_FOLDER'])
+    output_folder.mkdir(exist_ok=True)
+    suffix = DXFToPDFConverter.SCALE_OPTIONS[scale_mode]['suffix']
+    
+    finished = {}
+    to_convert = {}
+    for filename in files_to_convert:
+        dxf_path = Path(app.config['UPLOAD_FOLDER']) / filename
+        if not dxf_path.exists():
+            continue
+        # Files finished before a restart are not converted again
+        done = journal.load(f"dxf_pool:{scale_mode}:{filename}") if journal is not None else None
+        if done and Path(output_folder, done['output']).exists():
+            progress.emit('file_done', file=filename)
+            finished[filename] = done
+            continue
+        progress.emit('file_started', file=filename)
+        to_convert[filename] = dxf_path
+    
+    def record(index, outcome):
+        filename = outcome['input']
+        result = {
+            'input': filename,
+            'output': Path(outcome['output']).name if outcome['success'] else outcome['output'],
+            'success': outcome['success'],
+            'pages': outcome['pages'],
+            'scale_mode': scale_mode
+        }
+        if result['success'] and journal is not None:
+            journal.save(f"dxf_pool:{scale_mode}:{filename}", result)
+        progress.emit('file_done', file=filename)
+        finished[filename] = result
+    
+    if to_convert:
+        pdf_paths = {filename: output_folder / f"{Path(filename).stem}{suffix}_A4_landscape.pdf"
+                     for filename in to_convert}
+        run_scheduled(pool, to_convert, pdf_paths, scale_mode, on_done=record)
+    
+    return [finished[filename] for filename in files_to_convert if filename in finished]
+
 @app.route('/convert', methods=['POST'])
 def convert_files():
     try:
@@ -87,41 +460,7 @@ def convert_files():
         files_to_convert = data.get('files', [])
         scale_mode = data.get('scale_mode', 'standard')  # 'standard' or 'enlarged'
         
-        # Choose converter based on scale mode
-        converter_map = {
-            'standard': standard_converter,
-            'enlarged_2x': enlarged_2x_converter,
-            'maximum_4x': maximum_4x_converter
-        }
-        active_converter = converter_map.get(scale_mode, standard_converter)
-        
-        if not files_to_convert:
-            results = active_converter.batch_convert()
-        else:
-            results = []
-            for filename in files_to_convert:
-                dxf_path = Path(app.config['UPLOAD_FOLDER']) / filename
-                if dxf_path.exists():
-                    success, output, pages = active_converter.convert_dxf_to_pdf(dxf_path)
-                    results.append({
-                        'input': filename,
-                        'output': Path(output).name if success else output,
-                        'success': success,
-                        'pages': pages,
-                        'scale_mode': scale_mode
-                    })
-        
-        successful = [r for r in results if r['success']]
-        failed = [r for r in results if not r['success']]
-        
-        return jsonify({
-            'success': True,
-            'total': len(results),
-            'successful': len(successful),
-            'failed': len(failed),
-            'results': results,
-            'scale_mode': scale_mode
-        })
+        return run_or_enqueue(data, 'dxf', run_dxf_conversion, files_to_convert, scale_mode)
     
     except Exception as e:
         logger.error(f"Conversion error: {str(e)}")
@@ -139,6 +478,49 @@ def get_scale_options():
         logger.error(f"Error getting scale options: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/preflight/<filename>')
+def preflight_file(filename):
+    """Statistics and predicted conversion cost of one uploaded file."""
+    from preflight import preflight
+    try:
+        filepath = Path(app.config['UPLOAD_FOLDER']) / secure_filename(filename)
+        if not filepath.exists():
+            return jsonify({'success': False, 'error': 'File not found'}), 404
+        return jsonify(dict(preflight(filepath, get_cost_model()), success=True))
+    
+    except Exception as e:
+        logger.error(f"Preflight error for {filename}: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+@app.route('/preflight', methods=['POST'])
+def preflight_files():
+    """Predicted cost of converting several uploaded files, with totals for one scale mode."""
+    from preflight import preflight
+    data = request.get_json() or {}
+    scale_mode = data.get('scale_mode', 'standard')
+    if scale_mode not in DXFToPDFConverter.SCALE_OPTIONS:
+        scale_mode = 'standard'
+    model = get_cost_model()
+    
+    files, errors = [], []
+    totals = {'seconds': 0.0, 'peak_mb': 0.0, 'output_bytes': 0}
+    for filename in data.get('files') or catalog.names('inputs'):
+        filepath = Path(app.config['UPLOAD_FOLDER']) / secure_filename(filename)
+        try:
+            result = preflight(filepath, model)
+        except Exception as e:
+            errors.append({'file': filename, 'error': str(e)})
+            continue
+        estimate = result['estimates'].get(scale_mode, result['estimates'].get('default'))
+        totals['seconds'] += estimate['seconds']
+        totals['peak_mb'] = max(totals['peak_mb'], estimate['peak_mb'])
+        totals['output_bytes'] += estimate['output_bytes']
+        files.append(result)
+    
+    totals['seconds'] = round(totals['seconds'], 2)
+    return jsonify({'success': not errors, 'scale_mode': scale_mode, 'files': files,
+                    'errors': errors, 'totals': totals})
+
 @app.route('/download/<filename>')
 def download_file(filename):
     try:
@@ -172,6 +554,19 @@ def delete_output(filename):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def run_html_conversion(files_to_convert, output_filename):
+    """Convert HTML files into one combined PDF."""
+    result = get_html_converter().convert_html_to_pdf(files_to_convert, output_filename)
+    
+    if result['success']:
+        logger.info(f"HTML to PDF conversion successful: {result['output_file']}")
+    else:
+        logger.error(f"HTML to PDF conversion failed: {result.get('error', 'Unknown error')}")
+    
+    # Outputs rewritten in place keep their folder's mtime
+    catalog.invalidate()
+    return result
+
 @app.route('/convert_html', methods=['POST'])
 def convert_html_files():
     """Convert HTML files to PDF."""
@@ -180,15 +575,7 @@ def convert_html_files():
         files_to_convert = data.get('files', [])
         output_filename = data.get('output_filename')
         
-        # Convert HTML files
-        result = html_converter.convert_html_to_pdf(files_to_convert, output_filename)
-        
-        if result['success']:
-            logger.info(f"HTML to PDF conversion successful: {result['output_file']}")
-        else:
-            logger.error(f"HTML to PDF conversion failed: {result.get('error', 'Unknown error')}")
-        
-        return jsonify(result)
+        return run_or_enqueue(data, 'html', run_html_conversion, files_to_convert, output_filename)
     
     except Exception as e:
         logger.error(f"HTML conversion error: {str(e)}")
@@ -198,30 +585,43 @@ def convert_html_files():
 def get_html_files():
     """Get list of available HTML files."""
     try:
-        html_files = html_converter.get_html_files()
+        html_files = get_html_converter().get_html_files()
         return jsonify({'success': True, 'files': html_files})
     except Exception as e:
         logger.error(f"Error getting HTML files: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+def run_unified_conversion():
+    """Convert all HTML and DXF files in a new session."""
+    logger.info("Starting unified conversion of all files")
+    
+    from unified_converter import UnifiedConverter
+    
+    # Create new unified converter instance for this session
+    session_converter = UnifiedConverter(app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'],
+                                         html_backend=app.config['HTML_BACKEND'],
+                                         html_output_profile=app.config['HTML_OUTPUT_PROFILE'],
+                                         combine_mode=app.config['DXF_COMBINE_MODE'],
+                                         incremental=app.config['INCREMENTAL_SESSIONS'],
+                                         dxf_pool=get_dxf_pool(), dxf_limits=get_dxf_limits())
+    
+    # Perform unified conversion
+    results = session_converter.convert_all_files()
+    
+    if results['summary'].get('overall_success'):
+        logger.info(f"Unified conversion successful - Session: {results['timestamp']}")
+    else:
+        logger.error(f"Unified conversion failed - Session: {results['timestamp']}")
+    
+    catalog.invalidate()
+    return results
+
 @app.route('/convert_all', methods=['POST'])
 def convert_all_files():
     """Convert all HTML and DXF files in one operation with organized output."""
     try:
-        logger.info("Starting unified conversion of all files")
-        
-        # Create new unified converter instance for this session
-        session_converter = UnifiedConverter(app.config['UPLOAD_FOLDER'], app.config['OUTPUT_FOLDER'])
-        
-        # Perform unified conversion
-        results = session_converter.convert_all_files()
-        
-        if results['summary']['overall_success']:
-            logger.info(f"Unified conversion successful - Session: {results['timestamp']}")
-        else:
-            logger.error(f"Unified conversion failed - Session: {results['timestamp']}")
-        
-        return jsonify(results)
+        data = request.get_json(silent=True) or {}
+        return run_or_enqueue(data, 'unified', run_unified_conversion)
     
     except Exception as e:
         logger.error(f"Unified conversion error: {str(e)}")
@@ -231,26 +631,51 @@ def convert_all_files():
             'summary': {'overall_success': False}
         }), 500
 
+@app.route('/jobs')
+def list_jobs():
+    """Status of recent conversion jobs."""
+    return jsonify({'success': True, 'jobs': get_job_manager().list_jobs()})
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    """Status, queue position and (once finished) result of a conversion job."""
+    job_manager = get_job_manager()
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify(dict(job_manager.describe(job), success=True))
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    """Stream a job's progress events (Server-Sent Events) until it finishes."""
+    get_job_manager()  # channels of resumed jobs are opened with the manager
+    if progress_bus.get(job_id) is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    
+    # Reconnecting clients continue after the last event they saw
+    try:
+        after = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        after = 0
+    
+    def generate():
+        for event in progress_bus.stream(job_id, after):
+            if event is None:
+                yield ": keep-alive\n\n"
+            else:
+                yield f"id: {event['seq']}\nevent: {event['kind']}\ndata: {json.dumps(event)}\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/get_session_folders')
 def get_session_folders():
     """Get list of available session folders."""
     try:
-        base_output = Path(app.config['OUTPUT_FOLDER'])
-        
-        # Get HTML session folders
-        html_sessions = []
-        html_base = base_output / "HTML_REPORTS"
-        if html_base.exists():
-            html_sessions = [f.name for f in html_base.iterdir() if f.is_dir() and f.name.startswith('session_')]
-        
-        # Get DXF session folders
-        dxf_sessions = []
-        dxf_base = base_output / "DXF_DRAWINGS"
-        if dxf_base.exists():
-            dxf_sessions = [f.name for f in dxf_base.iterdir() if f.is_dir() and f.name.startswith('session_')]
-        
-        # Get all unique sessions
-        all_sessions = sorted(list(set(html_sessions + dxf_sessions)), reverse=True)
+        sessions = catalog.listing('sessions', order='desc')
+        all_sessions = [session['name'] for session in sessions]
+        html_sessions = [session['name'] for session in sessions if 'html' in session['types']]
+        dxf_sessions = [session['name'] for session in sessions if 'dxf' in session['types']]
         
         return jsonify({
             'success': True,
@@ -284,9 +709,30 @@ def download_session_file(session_id, file_type, filename):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admission')
+def admission_status():
+    """Memory budget, memory in use and the jobs running and waiting for memory."""
+    status = {'success': True, 'enabled': _admission is not None, 'jobs': get_job_manager().stats()}
+    if _admission is not None:
+        status.update(_admission.stats())
+    return jsonify(status)
+
+@app.route('/queue')
+def queue_status():
+    """Queued and running jobs and recent queue wait times (mean, p50, p95, max) per priority class."""
+    return jsonify(dict(get_job_manager().queue_stats(), success=True))
+
 @app.route('/health')
 def health():
-    return jsonify({'status': 'healthy', 'service': 'Unified DXF and HTML to PDF Converter'})
+    status = {'status': 'healthy', 'service': 'Unified DXF and HTML to PDF Converter'}
+    if _dxf_pool is not None:
+        status['dxf_worker_pool'] = _dxf_pool.stats()
+    if _admission is not None:
+        status['admission'] = _admission.stats()
+    if _job_manager is not None:
+        status['coalesced_requests'] = _job_manager.coalesced
+    return jsonify(status)
 
 if __name__ == '__main__':
+    get_job_manager()
     app.run(host='0.0.0.0', port=5000, debug=False)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Compare render time of STRUDS HTML reports with the native backend and with wkhtmltopdf."""
+
+from pathlib import Path
+import shutil
+import tempfile
+import time
+
+from html2pdf.converter import HTMLConverter
+from html2pdf.scanner import scan_html_files
+
+
+def render_time(converter, html_path):
+    """Render one file and return (elapsed seconds, backend used), or (None, None) if rendering failed."""
+    start = time.perf_counter()
+    pdf_path = converter.convert_file(html_path)
+    elapsed = time.perf_counter() - start
+    if not pdf_path or not pdf_path.exists():
+        return None, None
+    return elapsed, converter.backends_used.get(html_path.name)
+
+
+def benchmark_html_backends(input_folder="INPUT_DATA"):
+    """
+    Render every report with both backends and report the native speedup.
+
+    Returns:
+        Dictionary with the total 'native' and 'wkhtmltopdf' seconds over the
+        reports both backends rendered ('wkhtmltopdf' is None when it is not
+        installed) and the 'speedup'
+    """
+    print("📊 HTML BACKEND BENCHMARK (native reportlab vs wkhtmltopdf)")
+    print("="*80)
+
+    html_files = scan_html_files(Path(input_folder))
+    has_wkhtmltopdf = shutil.which('wkhtmltopdf') is not None
+    if not has_wkhtmltopdf:
+        print("⚠️  wkhtmltopdf not found - timing the native backend only")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="html2pdf_backends_"))
+    totals = {'native': 0.0, 'wkhtmltopdf': 0.0 if has_wkhtmltopdf else None}
+    try:
+        native = HTMLConverter(work_dir / "native", backend='native')
+        reference = HTMLConverter(work_dir / "wkhtmltopdf", backend='wkhtmltopdf') if has_wkhtmltopdf else None
+
+        print(f"{'Report':<28}{'Native':>10}{'wkhtmltopdf':>14}{'Speedup':>10}")
+        print("-"*80)
+        for html_file in html_files:
+            native_time, backend = render_time(native, html_file)
+            reference_time = render_time(reference, html_file)[0] if reference is not None else None
+
+            fmt = lambda t: f"{t:.2f}s" if t is not None else "n/a"
+            speedup = f"{reference_time / native_time:.1f}x" if native_time and reference_time else "n/a"
+            note = "" if backend == 'native' else "  (fell back to wkhtmltopdf)"
+            print(f"{html_file.name:<28}{fmt(native_time):>10}{fmt(reference_time):>14}{speedup:>10}{note}")
+
+            # Totals only over reports the native backend really rendered
+            if backend == 'native' and (reference is None or reference_time is not None):
+                totals['native'] += native_time
+                if reference is not None:
+                    totals['wkhtmltopdf'] += reference_time
+
+        print("-"*80)
+        totals['speedup'] = (totals['wkhtmltopdf'] / totals['native']
+                             if totals['wkhtmltopdf'] and totals['native'] else None)
+        fmt = lambda t: f"{t:.2f}s" if t is not None else "n/a"
+        speedup = f"{totals['speedup']:.1f}x" if totals['speedup'] else "n/a"
+        print(f"{'TOTAL':<28}{fmt(totals['native']):>10}{fmt(totals['wkhtmltopdf']):>14}{speedup:>10}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("="*80)
+    return totals
+
+
+if __name__ == "__main__":
+    benchmark_html_backends()
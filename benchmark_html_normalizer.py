@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Compare STRUDS HTML reports before and after normalisation (bytes and render time)."""
+
+from pathlib import Path
+import shutil
+import tempfile
+import time
+
+from html2pdf.converter import HTMLConverter
+from html2pdf.normalizer import normalize_html
+from html2pdf.scanner import scan_html_files
+
+
+def render_time(converter, html_path):
+    """Render one file and return elapsed seconds, or None if rendering failed."""
+    start = time.perf_counter()
+    pdf_path = converter.convert_file(html_path)
+    elapsed = time.perf_counter() - start
+    return elapsed if pdf_path and pdf_path.exists() else None
+
+
+def benchmark_html_normalizer(input_folder="INPUT_DATA"):
+    """Report bytes and render time before and after normalisation for each report."""
+    print("📊 STRUDS HTML NORMALISER BENCHMARK")
+    print("="*90)
+
+    html_files = scan_html_files(Path(input_folder))
+    can_render = shutil.which('wkhtmltopdf') is not None
+    if not can_render:
+        print("⚠️  wkhtmltopdf not found - reporting sizes only")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="html2pdf_bench_"))
+    try:
+        original = HTMLConverter(work_dir / "original", normalize_struds=False)
+        normalised = HTMLConverter(work_dir / "normalised", normalize_struds=True)
+
+        print(f"{'Report':<26}{'Bytes before':>14}{'Bytes after':>14}{'Saved':>8}"
+              f"{'Render before':>15}{'Render after':>14}")
+        print("-"*90)
+
+        total_before = total_after = 0
+        for html_file in html_files:
+            stats = normalize_html(html_file, work_dir / f"normalised_{html_file.name}")
+            total_before += stats.bytes_before
+            total_after += stats.bytes_after
+
+            before = after = None
+            if can_render:
+                before = render_time(original, html_file)
+                after = render_time(normalised, html_file)
+
+            fmt = lambda t: f"{t:.2f}s" if t is not None else "n/a"
+            print(f"{html_file.name:<26}{stats.bytes_before:>14,}{stats.bytes_after:>14,}"
+                  f"{stats.reduction_percent:>7.0f}%{fmt(before):>15}{fmt(after):>14}")
+
+        print("-"*90)
+        if total_before:
+            saved = (1 - total_after / total_before) * 100
+            print(f"{'TOTAL':<26}{total_before:>14,}{total_after:>14,}{saved:>7.0f}%")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("="*90)
+
+
+if __name__ == "__main__":
+    benchmark_html_normalizer()
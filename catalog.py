@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+File Catalog - indexed listing of inputs, outputs and sessions for the web UI
+
+Keeps one in-memory entry per file with its size, mtime and (for PDFs,
+computed on first request) page count. A directory is re-read only when
+its own mtime changes, so a page load costs a few stat calls instead of
+globbing every folder and statting every file.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+COLLECTIONS = ('inputs', 'outputs', 'sessions')
+SORT_KEYS = ('name', 'mtime', 'size')
+# Lower-case suffix -> input kind (file names are matched in any case)
+INPUT_SUFFIXES = {'.dxf': 'dxf', '.html': 'html', '.htm': 'html'}
+SESSION_TREES = {'html': "HTML_REPORTS", 'dxf': "DXF_DRAWINGS"}
+DEFAULT_PER_PAGE = 50
+MAX_PER_PAGE = 500
+# Files rewritten in place do not touch their directory's mtime; re-stat them this often
+RESTAT_SECONDS = 30.0
+
+
+def _page_count(path: Path) -> Optional[int]:
+    from PyPDF2 import PdfReader  # only needed once page counts are requested
+    
+    try:
+        return len(PdfReader(str(path)).pages)
+    except Exception:
+        return None
+
+
+class _Directory:
+    """Cached listing of one directory, refreshed when its mtime changes."""
+
+    def __init__(self, path: Path, kind_of):
+        self.path = path
+        self.kind_of = kind_of  # DirEntry -> kind string, or None to skip the entry
+        self.mtime_ns: Optional[int] = None
+        self.scanned_at = 0.0
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    def refresh(self, now: float) -> bool:
+        """Re-read the directory if it changed; returns True if the listing changed."""
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError:
+            changed = bool(self.entries)
+            self.entries, self.mtime_ns = {}, None
+            return changed
+        if mtime_ns == self.mtime_ns and now - self.scanned_at < RESTAT_SECONDS:
+            return False
+
+        entries = {}
+        with os.scandir(self.path) as scan:
+            for entry in scan:
+                if entry.name.startswith('.'):
+                    continue
+                kind = self.kind_of(entry)
+                if kind is None:
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                old = self.entries.get(entry.name)
+                item = {'name': entry.name, 'kind': kind, 'size': stat.st_size, 'mtime': stat.st_mtime}
+                if old and old['size'] == item['size'] and old['mtime'] == item['mtime']:
+                    item = old  # keeps the page count computed earlier
+                entries[entry.name] = item
+        changed = entries.keys() != self.entries.keys() or any(
+            entries[name] is not self.entries[name] for name in entries)
+        self.entries, self.mtime_ns, self.scanned_at = entries, mtime_ns, now
+        return changed
+
+
+class FileCatalog:
+    """
+    Incrementally updated catalog of the input folder, the output folder and
+    the session folders, with sorted, paginated queries.
+
+    Each collection has a generation number that increases whenever its
+    listing changes. Query ETags are derived from the returned page itself,
+    so they stay valid across restarts and between server processes.
+    """
+
+    def __init__(self, input_folder: str = "INPUT_DATA", output_folder: str = "OUTPUT_PDF"):
+        """
+        Args:
+            input_folder: Folder with DXF and HTML inputs
+            output_folder: Base output folder (PDFs and session trees)
+        """
+        self.input_folder = Path(input_folder)
+        self.output_folder = Path(output_folder)
+        self._lock = threading.Lock()
+        self.generations = {name: 0 for name in COLLECTIONS}
+        self._inputs = _Directory(self.input_folder, self._input_kind)
+        self._outputs = _Directory(self.output_folder, self._output_kind)
+        self._sessions = {kind: _Directory(self.output_folder / tree, self._session_kind)
+                          for kind, tree in SESSION_TREES.items()}
+
+    @staticmethod
+    def _input_kind(entry: os.DirEntry) -> Optional[str]:
+        kind = INPUT_SUFFIXES.get(os.path.splitext(entry.name)[1].lower())
+        return kind if kind and entry.is_file() else None
+
+    @staticmethod
+    def _output_kind(entry: os.DirEntry) -> Optional[str]:
+        return 'pdf' if entry.name.endswith('.pdf') and entry.is_file() else None
+
+    @staticmethod
+    def _session_kind(entry: os.DirEntry) -> Optional[str]:
+        return 'session' if entry.name.startswith('session_') and entry.is_dir() else None
+
+    def refresh(self) -> None:
+        """Bring every collection up to date (cheap when nothing changed)."""
+        now = time.time()
+        with self._lock:
+            if self._inputs.refresh(now):
+                self.generations['inputs'] += 1
+            if self._outputs.refresh(now):
+                self.generations['outputs'] += 1
+            sessions_changed = [d.refresh(now) for d in self._sessions.values()]
+            if any(sessions_changed):
+                self.generations['sessions'] += 1
+
+    def invalidate(self) -> None:
+        """Force a re-read on the next query (after uploads, deletions and conversions)."""
+        with self._lock:
+            for directory in [self._inputs, self._outputs, *self._sessions.values()]:
+                directory.mtime_ns = None
+
+    def _items(self, collection: str) -> List[Dict[str, Any]]:
+        if collection == 'inputs':
+            return list(self._inputs.entries.values())
+        if collection == 'outputs':
+            return list(self._outputs.entries.values())
+        # A session appears once, listing which pipelines produced output in it
+        sessions: Dict[str, Dict[str, Any]] = {}
+        for kind, directory in self._sessions.items():
+            for entry in directory.entries.values():
+                session = sessions.setdefault(entry['name'], {'name': entry['name'], 'kind': 'session',
+                                                              'size': 0, 'mtime': 0.0, 'types': []})
+                session['types'].append(kind)
+                session['mtime'] = max(session['mtime'], entry['mtime'])
+        return list(sessions.values())
+
+    @staticmethod
+    def _etag(collection: str, items: List[Dict[str, Any]], total: int, **query) -> str:
+        # Derived from what the client receives: the query, the total and each item's version
+        versions = [(item['name'], item['kind'], item['size'], item['mtime'], item.get('types'), item.get('pages'))
+                    for item in items]
+        key = f"{collection}:{sorted(query.items())}:{total}:{versions}"
+        return hashlib.sha1(key.encode()).hexdigest()[:16]
+
+    def _snapshot(self, collection: str, sort: str, order: str,
+                  kind: Optional[str]) -> Tuple[List[Dict[str, Any]], int]:
+        if collection not in COLLECTIONS:
+            raise ValueError(f"Unknown collection: {collection}")
+        sort = sort if sort in SORT_KEYS else 'name'
+        self.refresh()
+        with self._lock:
+            items, generation = self._items(collection), self.generations[collection]
+        if kind:
+            items = [item for item in items if item['kind'] == kind]
+        if sort == 'name':
+            items.sort(key=lambda item: item['name'].lower(), reverse=order == 'desc')
+        else:
+            items.sort(key=lambda item: (item[sort], item['name'].lower()), reverse=order == 'desc')
+        return items, generation
+
+    def listing(self, collection: str, sort: str = 'name', order: str = 'asc',
+                kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """All items of a collection, filtered by kind and sorted (no pagination)."""
+        return self._snapshot(collection, sort, order, kind)[0]
+
+    def names(self, collection: str, sort: str = 'name', order: str = 'asc',
+              kind: Optional[str] = None) -> List[str]:
+        """Names of all items of a collection."""
+        return [item['name'] for item in self.listing(collection, sort, order, kind)]
+
+    def query(self, collection: str, sort: str = 'name', order: str = 'asc', page: int = 1,
+              per_page: int = DEFAULT_PER_PAGE, kind: Optional[str] = None,
+              with_pages: bool = False) -> Dict[str, Any]:
+        """
+        Sorted, paginated listing of a collection.
+
+        Args:
+            collection: 'inputs', 'outputs' or 'sessions'
+            sort: 'name', 'mtime' or 'size'
+            order: 'asc' or 'desc'
+            page: 1-based page number
+            per_page: Items per page (at most MAX_PER_PAGE)
+            kind: Only items of this kind ('dxf', 'html', 'pdf')
+            with_pages: Add PDF page counts (computed once per file version)
+
+        Returns:
+            Dictionary with 'items', 'total', 'page', 'per_page' and 'etag'
+        """
+        page = max(1, page)
+        per_page = max(1, min(per_page, MAX_PER_PAGE))
+        items = self._snapshot(collection, sort, order, kind)[0]
+
+        selected = items[(page - 1) * per_page:page * per_page]
+        if with_pages and collection == 'outputs':
+            for item in selected:
+                if 'pages' not in item:
+                    item['pages'] = _page_count(self.output_folder / item['name'])
+        selected = [dict(item) for item in selected]
+        return {
+            'items': selected,
+            'total': len(items),
+            'page': page,
+            'per_page': per_page,
+            'etag': self._etag(collection, selected, len(items), sort=sort, order=order, page=page,
+                               per_page=per_page, kind=kind, with_pages=with_pages)
+        }
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Conversion Manifest - remembers which input produced which pages
+of the combined PDFs so unchanged inputs can be reused incrementally
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "conversion_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ConversionManifest:
+    """
+    Record of the last session's combined outputs, per pipeline ('html', 'dxf').
+
+    For every input it stores the content hash, the settings it was rendered
+    with, its per-file PDF (if any) and its [start, end) page range in the
+    combined PDF. A later session can splice those pages instead of
+    re-rendering the input.
+    """
+
+    def __init__(self, path: Path):
+        """
+        Args:
+            path: JSON file holding the manifest
+        """
+        self.path = Path(path)
+        self.data: Dict[str, Any] = {'version': MANIFEST_VERSION, 'pipelines': {}}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                if loaded.get('version') == MANIFEST_VERSION:
+                    self.data = loaded
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️  Ignoring unreadable manifest {self.path}: {e}")
+
+    def lookup(self, pipeline: str, filename: str, sha256: str, settings: str) -> Optional[Dict[str, Any]]:
+        """
+        Find reusable output for an input.
+
+        Args:
+            pipeline: 'html' or 'dxf'
+            filename: Input file name
+            sha256: Current hash of the input
+            settings: Rendering settings key the output must match
+
+        Returns:
+            Entry with 'combined_pdf', 'pages' and 'pdf', or None if the input
+            changed or the previous output is gone
+        """
+        record = self.data['pipelines'].get(pipeline)
+        if not record:
+            return None
+        entry = record['inputs'].get(filename)
+        if not entry or entry['sha256'] != sha256 or entry['settings'] != settings:
+            return None
+        if not Path(record['combined_pdf']).exists():
+            return None
+        if entry.get('pdf') and not Path(entry['pdf']).exists():
+            return None
+        return dict(entry, combined_pdf=record['combined_pdf'])
+
+    def record(self, pipeline: str, combined_pdf: Path, inputs: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Replace a pipeline's record with the outputs of this session.
+
+        Args:
+            pipeline: 'html' or 'dxf'
+            combined_pdf: Combined PDF written this session
+            inputs: filename -> {'sha256', 'settings', 'pages': [start, end], 'pdf'}
+        """
+        self.data['pipelines'][pipeline] = {
+            'combined_pdf': str(combined_pdf),
+            'inputs': inputs
+        }
+
+    def save(self) -> None:
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp_path, self.path)
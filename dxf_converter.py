@@ -1,22 +1,87 @@
-import ezdxf
-from ezdxf import recover
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-from ezdxf.addons.drawing import RenderContext, Frontend
-from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
-import numpy as np
+# ezdxf, matplotlib and PyPDF2 are imported where a drawing is rendered, so
+# importing this module (e.g. by the web app) stays fast
 from pathlib import Path
 import logging
+import math
+import time
+from collections import Counter
 from datetime import datetime
 
-logging.basicConfig(level=logging.INFO)
+from html2pdf import checkpoints, cost_model, progress
+
 logger = logging.getLogger(__name__)
 
+class PageCanvas:
+    """
+    Page composition for one drawing: a single figure with fixed page
+    geometry on which the drawing is rendered once; every page is a view of
+    it (new axis limits), saved as-is.
+    
+    Nothing is allocated per page and close() drops the figure's artists,
+    so memory is released after each document without forced collections.
+    """
+    
+    def __init__(self, doc, msp, width_mm, height_mm, margin_mm, dpi):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from ezdxf.addons.drawing import RenderContext, Frontend
+        from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
+        
+        self.dpi = dpi
+        # A standalone Figure on its own Agg canvas: no pyplot figure manager
+        # or other global state, so several threads can render at once
+        self.figure = Figure(figsize=(width_mm / 25.4, height_mm / 25.4), dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        # Fixed drawing area inside the page margins (no tight-bbox layout pass)
+        self.ax = self.figure.add_axes([margin_mm / width_mm, margin_mm / height_mm,
+                                        1 - 2 * margin_mm / width_mm, 1 - 2 * margin_mm / height_mm])
+        self.area_ratio = (width_mm - 2 * margin_mm) / (height_mm - 2 * margin_mm)
+        
+        Frontend(RenderContext(doc), MatplotlibBackend(self.ax, adjust_figure=False)).draw_layout(msp, finalize=True)
+        self.ax.set_aspect('equal', adjustable='datalim')
+        self.ax.axis('off')
+    
+    def render(self, region, margin_factor, outputs):
+        """Show region (plus a margin) and save the page to every PdfPages in outputs."""
+        rx_min, ry_min, rx_max, ry_max = region
+        region_width = rx_max - rx_min
+        region_height = ry_max - ry_min
+        
+        if region_width > 0 and region_height > 0:
+            # Widen the view to the drawing area's aspect ratio, so the region
+            # fills the page at equal x/y scale without matplotlib re-fitting it
+            view_width = region_width * (1 + 2 * margin_factor)
+            view_height = region_height * (1 + 2 * margin_factor)
+            if view_width / view_height < self.area_ratio:
+                view_width = view_height * self.area_ratio
+            else:
+                view_height = view_width / self.area_ratio
+            center_x = (rx_min + rx_max) / 2
+            center_y = (ry_min + ry_max) / 2
+            self.ax.set_xlim(center_x - view_width / 2, center_x + view_width / 2)
+            self.ax.set_ylim(center_y - view_height / 2, center_y + view_height / 2)
+        
+        for output in outputs:
+            if output is not None:
+                output.savefig(self.figure, dpi=self.dpi, facecolor='white', edgecolor='none')
+    
+    def close(self):
+        if self.figure is not None:
+            self.figure.clear()
+            self.figure = self.ax = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
 class DXFToPDFConverter:
     A4_WIDTH_MM = 297
     A4_HEIGHT_MM = 210
     MARGIN_MM = 10
     DPI = 300
+    CHECKPOINT_PAGES = 10  # pages per checkpointed batch inside persistent jobs
     
     # 3 SCALE OPTIONS CONFIGURATION
     SCALE_OPTIONS = {
@@ -62,15 +127,42 @@ class DXFToPDFConverter:
         self.detail_enhancement = scale_mode != 'standard'
         self.max_pages = self.scale_config['max_pages']
         
-        self.output_folder.mkdir(exist_ok=True)
-        self.log_folder.mkdir(exist_ok=True)
-        
         logger.info(f"🎯 DXF Converter initialized:")
         logger.info(f"   Scale mode: {self.scale_config['name']} ({self.scale_factor}x)")
         logger.info(f"   Description: {self.scale_config['description']}")
         logger.info(f"   Maximum pages: {self.max_pages}")
         logger.info(f"   Detail enhancement: {'ENABLED' if self.detail_enhancement else 'DISABLED'}")
     
+    def drawing_stats(self, doc, msp):
+        """
+        Entity statistics of a drawing's modelspace.
+        
+        'virtual_entities' counts what the renderer draws: modelspace
+        entities plus the contents of every inserted block (nested blocks
+        included).
+        """
+        by_type = Counter(entity.dxftype() for entity in msp)
+        block_sizes = {}
+        
+        def block_size(name):
+            if name not in block_sizes:
+                block_sizes[name] = 0  # guards against self-referencing blocks
+                block = doc.blocks.get(name)
+                size = 0
+                for entity in block if block is not None else []:
+                    size += block_size(entity.dxf.name) if entity.dxftype() == 'INSERT' else 1
+                block_sizes[name] = size
+            return block_sizes[name]
+        
+        inserted = sum(block_size(insert.dxf.name) for insert in msp.query('INSERT'))
+        return {
+            'entities': sum(by_type.values()),
+            'by_type': dict(by_type.most_common()),
+            'inserts': by_type.get('INSERT', 0),
+            'blocks_used': len(block_sizes),
+            'virtual_entities': sum(by_type.values()) - by_type.get('INSERT', 0) + inserted
+        }
+    
     def get_drawing_bounds(self, msp):
         min_x = min_y = float('inf')
         max_x = max_y = float('-inf')
@@ -126,8 +218,8 @@ class DXFToPDFConverter:
             effective_page_height = effective_page_width / a4_aspect
             
             # Calculate number of pages in both dimensions for grid-based splitting
-            pages_horizontal = max(1, int(np.ceil(total_width / effective_page_width)))
-            pages_vertical = max(1, int(np.ceil(total_height / effective_page_height)))
+            pages_horizontal = max(1, int(math.ceil(total_width / effective_page_width)))
+            pages_vertical = max(1, int(math.ceil(total_height / effective_page_height)))
             
             total_pages = pages_horizontal * pages_vertical
             total_pages = min(total_pages, self.max_pages)
@@ -172,7 +264,7 @@ class DXFToPDFConverter:
             if total_height <= page_height * 1.3:
                 return [(min_x, min_y, max_x, max_y)]
             
-            num_pages = int(np.ceil(total_height / page_height))
+            num_pages = int(math.ceil(total_height / page_height))
             num_pages = min(num_pages, 50)
             
             logger.info(f"Drawing size: {total_width:.1f} x {total_height:.1f}, splitting into {num_pages} page(s)")
@@ -191,20 +283,135 @@ class DXFToPDFConverter:
         
         return regions
     
-    def convert_dxf_to_pdf(self, dxf_path, pdf_path=None, max_pages=None):
+    def _pdf_info(self, dxf_path):
+        """Document information entries of a converted drawing."""
+        scale_info = f" - {self.scale_config['name']}" if self.detail_enhancement else ""
+        return {
+            'Title': f'{Path(dxf_path).stem}{scale_info} - A4 Landscape',
+            'Author': 'Multi-Scale DXF to PDF Converter',
+            'Subject': f'Architectural/Structural Drawing - {self.scale_config["name"]}',
+            'Keywords': f'DXF, PDF, A4, Landscape, Footing, Structural, Scale, {self.scale_mode}, {self.scale_factor}x'
+        }
+    
+    def _render_page(self, canvas, idx, region, region_count, page_total, outputs, file_name):
+        """Render one page region and save it to every open PdfPages in outputs."""
+        rx_min, ry_min, rx_max, ry_max = region
+        page_label = f"{idx + 1}/{region_count}"
+        
+        # OPTIMIZED progress reporting for large page counts
+        if self.detail_enhancement and region_count > 10:
+            # Report every 5th page for large conversions to reduce log spam
+            if idx % 5 == 0 or idx == region_count - 1:
+                logger.info(f"🖨️  Rendering pages {idx + 1}-{min(idx + 5, region_count)}/{region_count} - Progress: {((idx + 1) / region_count * 100):.0f}%")
+        else:
+            logger.info(f"🖨️  Rendering page {page_label} - Region: ({rx_min:.1f}, {ry_min:.1f}) to ({rx_max:.1f}, {ry_max:.1f})")
+        
+        # REDUCED margins for enlarged scale to show maximum detail
+        margin_factor = 0.02 if self.detail_enhancement else 0.05
+        canvas.render(region, margin_factor, outputs)
+        cost_model.sample_memory()
+        progress.emit('page', file=file_name, page=idx + 1, total=page_total)
+    
+    def _render_in_batches(self, journal, canvas, regions, region_count, pdf_path, dxf_path):
+        """
+        Render pages into part files of CHECKPOINT_PAGES pages, checkpointing
+        each finished part, then join the parts into pdf_path.
+        
+        Parts recorded by an earlier, interrupted run of the same job are
+        kept and rendering continues after the last of them.
+        """
+        from matplotlib.backends.backend_pdf import PdfPages
+        
+        file_name = Path(dxf_path).name
+        key = f"dxf_pages:{pdf_path}"
+        
+        # Finished parts must be contiguous from the first page and still on disk
+        parts = []
+        for part in journal.load(key) or []:
+            if part['start'] != (parts[-1]['end'] if parts else 0) or not Path(part['path']).exists():
+                break
+            parts.append(part)
+        first = parts[-1]['end'] if parts else 0
+        resumed = first
+        if first:
+            logger.info(f"♻️  Resuming {file_name} at page {first + 1}/{len(regions)}")
+            for idx in range(first):
+                progress.emit('page', file=file_name, page=idx + 1, total=len(regions))
+        
+        for batch_start in range(first, len(regions), self.CHECKPOINT_PAGES):
+            batch_end = min(batch_start + self.CHECKPOINT_PAGES, len(regions))
+            part_path = journal.directory / f"{Path(pdf_path).stem}.pages_{batch_start + 1:04d}.pdf"
+            with PdfPages(part_path) as part_pdf:
+                for idx in range(batch_start, batch_end):
+                    self._render_page(canvas, idx, regions[idx], region_count, len(regions),
+                                      [part_pdf], file_name)
+            parts.append({'start': batch_start, 'end': batch_end, 'path': str(part_path)})
+            journal.save(key, parts)
+            if batch_end < len(regions):
+                # Page boundary with everything so far checkpointed: may make way for urgent jobs
+                checkpoints.yield_point()
+        
+        self.join_parts(dxf_path, [part['path'] for part in parts], pdf_path)
+        return resumed
+    
+    def join_parts(self, dxf_path, part_paths, pdf_path):
+        """Join page-range PDFs of a drawing, in the given order, into pdf_path and delete them."""
+        from html2pdf.merger import StreamingPdfMerger
+        
+        info = dict(self._pdf_info(dxf_path), CreationDate=datetime.now().strftime("D:%Y%m%d%H%M%S"))
+        with StreamingPdfMerger(pdf_path, info=info) as merger:
+            for part_path in part_paths:
+                merger.append(part_path)
+        for part_path in part_paths:
+            Path(part_path).unlink(missing_ok=True)
+    
+    def convert_dxf_to_pdf(self, dxf_path, pdf_path=None, max_pages=None, combined_pdf=None,
+                           page_range=None):
+        """
+        Render a DXF drawing to an A4 landscape PDF.
+        
+        Args:
+            dxf_path: DXF file to convert
+            pdf_path: Output PDF (default: derived from the DXF name and scale mode)
+            max_pages: Page limit (default: the scale mode's limit)
+            combined_pdf: Optional open PdfPages that receives every page as well,
+                so a combined PDF is built without re-reading the per-file output
+            page_range: Optional (start, stop) of the pages to render, for a part
+                of a drawing split across workers (see join_parts)
+            
+        Returns:
+            Tuple of (success, output path or error message, page count); the
+            page count of a page_range is the number of pages rendered
+        """
+        import ezdxf
+        from ezdxf import recover
+        from matplotlib.backends.backend_pdf import PdfPages
+        
         if max_pages is None:
             max_pages = self.max_pages
             
         if pdf_path is None:
+            self.output_folder.mkdir(exist_ok=True)
             scale_suffix = self.scale_config['suffix']
             pdf_path = self.output_folder / f"{Path(dxf_path).stem}{scale_suffix}_A4_landscape.pdf"
         
         logger.info(f"🏗️  Converting {dxf_path} to {pdf_path}")
+        started = time.perf_counter()
+        file_name = Path(dxf_path).name
+        progress.emit('file_started', file=file_name)
         logger.info(f"🎯 Scale Mode: {self.scale_config['name']} ({self.scale_factor}x)")
         if self.detail_enhancement:
             logger.info(f"🔍 Detail Enhancement: {self.scale_config['description']}")
         
+        memory = cost_model.PeakMemory() if cost_model.active() is not None else None
+        preempted = False
         try:
+            journal = checkpoints.active()
+            done = journal.load(f"dxf_file:{pdf_path}") if journal is not None else None
+            if done and combined_pdf is None and Path(pdf_path).exists():
+                logger.info(f"♻️  {file_name} was converted before the restart ({done['pages']} pages)")
+                return True, str(pdf_path), done['pages']
+            
             try:
                 doc, auditor = recover.readfile(str(dxf_path))
             except IOError:
@@ -230,62 +437,44 @@ class DXFToPDFConverter:
             # ENHANCED DPI based on scale mode
             enhanced_dpi = int(self.DPI * self.scale_config['dpi_multiplier'])
             
-            fig_width_inch = self.A4_WIDTH_MM / 25.4
-            fig_height_inch = self.A4_HEIGHT_MM / 25.4
-            
-            with PdfPages(pdf_path) as pdf:
-                for idx, (rx_min, ry_min, rx_max, ry_max) in enumerate(regions[:max_pages]):
-                    progress = f"{idx + 1}/{len(regions)}"
-                    
-                    # OPTIMIZED progress reporting for large page counts
-                    if self.detail_enhancement and len(regions) > 10:
-                        # Report every 5th page for large conversions to reduce log spam
-                        if idx % 5 == 0 or idx == len(regions) - 1:
-                            logger.info(f"🖨️  Rendering pages {idx + 1}-{min(idx + 5, len(regions))}/{len(regions)} - Progress: {((idx + 1) / len(regions) * 100):.0f}%")
-                    else:
-                        logger.info(f"🖨️  Rendering page {progress} - Region: ({rx_min:.1f}, {ry_min:.1f}) to ({rx_max:.1f}, {ry_max:.1f})")
-                    
-                    fig = plt.figure(figsize=(fig_width_inch, fig_height_inch), dpi=enhanced_dpi)
-                    ax = fig.add_subplot(111)
-                    ax.set_aspect('equal')
-                    
-                    ctx = RenderContext(doc)
-                    out = MatplotlibBackend(ax)
-                    
-                    Frontend(ctx, out).draw_layout(msp, finalize=True)
-                    
-                    region_width = rx_max - rx_min
-                    region_height = ry_max - ry_min
-                    
-                    if region_width > 0 and region_height > 0:
-                        # REDUCED margins for enlarged scale to show maximum detail
-                        margin_factor = 0.02 if self.detail_enhancement else 0.05
-                        margin_x = region_width * margin_factor
-                        margin_y = region_height * margin_factor
+            page_regions = regions[:max_pages]
+            first_page = 0
+            if page_range is not None:
+                first_page = page_range[0]
+                page_regions = page_regions[page_range[0]:page_range[1]]
+            resumed = 0
+            with PageCanvas(doc, msp, self.A4_WIDTH_MM, self.A4_HEIGHT_MM, self.MARGIN_MM,
+                            enhanced_dpi) as canvas:
+                if journal is not None and combined_pdf is None and page_range is None:
+                    # Inside a persistent job: render in checkpointed batches so a
+                    # restart continues after the last finished batch
+                    resumed = self._render_in_batches(journal, canvas, page_regions, len(regions),
+                                                      pdf_path, dxf_path)
+                else:
+                    with PdfPages(pdf_path) as pdf:
+                        for idx, region in enumerate(page_regions, first_page):
+                            self._render_page(canvas, idx, region, len(regions), len(page_regions),
+                                              [pdf, combined_pdf], file_name)
                         
-                        ax.set_xlim(rx_min - margin_x, rx_max + margin_x)
-                        ax.set_ylim(ry_min - margin_y, ry_max + margin_y)
-                    
-                    ax.axis('off')
-                    
-                    # ENHANCED quality settings for enlarged scale
-                    pdf.savefig(fig, dpi=enhanced_dpi, bbox_inches='tight', 
-                              pad_inches=0.05 if self.detail_enhancement else 0.1,
-                              facecolor='white', edgecolor='none')
-                    plt.close(fig)
-                    
-                    # MEMORY cleanup for large conversions
-                    if self.detail_enhancement and idx % 10 == 0:
-                        import gc
-                        gc.collect()  # Force garbage collection every 10 pages
-                
-                d = pdf.infodict()
-                scale_info = f" - {self.scale_config['name']}" if self.detail_enhancement else ""
-                d['Title'] = f'{Path(dxf_path).stem}{scale_info} - A4 Landscape'
-                d['Author'] = 'Multi-Scale DXF to PDF Converter'
-                d['Subject'] = f'Architectural/Structural Drawing - {self.scale_config["name"]}'
-                d['Keywords'] = f'DXF, PDF, A4, Landscape, Footing, Structural, Scale, {self.scale_mode}, {self.scale_factor}x'
-                d['CreationDate'] = datetime.now()
+                        d = pdf.infodict()
+                        d.update(self._pdf_info(dxf_path))
+                        d['CreationDate'] = datetime.now()
+                if memory is not None:
+                    memory.sample()  # the canvas and the document are still alive
+            
+            if journal is not None and page_range is None:
+                journal.save(f"dxf_file:{pdf_path}", {'pages': len(regions)})
+            
+            # Calibrate the preflight cost model on complete (not resumed) renders
+            if cost_model.active() is not None and not resumed:
+                stats = dict(self.drawing_stats(doc, msp), pages=len(page_regions))
+                cost_model.observe('dxf', stats, time.perf_counter() - started, pdf_path,
+                                  memory.peak_mb if memory is not None else None)
+            
+            if page_range is not None:
+                logger.info(f"✅ Rendered pages {first_page + 1}-{first_page + len(page_regions)} "
+                            f"of {file_name}: {pdf_path}")
+                return True, str(pdf_path), len(page_regions)
             
             success_msg = f"✅ Successfully created {self.scale_config['name']} PDF with {len(regions)} page(s): {pdf_path}"
             if self.detail_enhancement:
@@ -296,11 +485,33 @@ class DXFToPDFConverter:
             logger.info(success_msg)
             return True, str(pdf_path), len(regions)
         
+        except checkpoints.Preempted:
+            # Not done: the job's rerun converts the rest of this file
+            preempted = True
+            raise
+        
         except Exception as e:
             logger.error(f"Error converting {dxf_path}: {str(e)}", exc_info=True)
-            return False, str(e), 0
+            return False, str(e) or type(e).__name__, 0
+        
+        finally:
+            if memory is not None:
+                memory.close()
+            if not preempted:
+                progress.emit('file_done', file=file_name)
     
-    def batch_convert(self, pattern="*.dxf"):
+    def batch_convert(self, pattern="*.dxf", limits=None):
+        """
+        Convert every DXF file of the input folder, in alphabetical order.
+        
+        Args:
+            pattern: Glob pattern of the files
+            limits: Optional isolation.ResourceLimits: convert each file in a
+                child process with these limits and log its resource usage
+            
+        Returns:
+            List of per-file results
+        """
         dxf_files = list(self.input_folder.glob(pattern))
         dxf_files.extend(self.input_folder.glob(pattern.replace('dxf', 'DXF')))
         dxf_files = list(set(dxf_files))
@@ -312,6 +523,7 @@ class DXFToPDFConverter:
         # ALPHABETICAL SORTING - case insensitive
         dxf_files.sort(key=lambda f: f.name.lower())
         
+        progress.expect_files(len(dxf_files))
         logger.info(f"Found {len(dxf_files)} DXF files to convert (ALPHABETICAL ORDER):")
         for i, dxf_file in enumerate(dxf_files, 1):
             logger.info(f"  {i:2d}. {dxf_file.name}")
@@ -319,6 +531,14 @@ class DXFToPDFConverter:
         results = []
         for i, dxf_file in enumerate(dxf_files, 1):
             logger.info(f"\n🔄 Processing DXF {i}/{len(dxf_files)}: {dxf_file.name}")
+            if limits is not None:
+                from isolation import convert_isolated
+                progress.emit('file_started', file=dxf_file.name)
+                result = convert_isolated(dxf_file, scale_mode=self.scale_mode,
+                                          output_folder=str(self.output_folder), limits=limits)
+                progress.emit('file_done', file=dxf_file.name, success=result['success'])
+                results.append(dict(result, input=str(dxf_file), timestamp=datetime.now().isoformat()))
+                continue
             success, output, pages = self.convert_dxf_to_pdf(dxf_file)
             results.append({
                 'input': str(dxf_file),
@@ -328,6 +548,12 @@ class DXFToPDFConverter:
                 'timestamp': datetime.now().isoformat()
             })
         
+        self.write_conversion_log(results)
+        return results
+    
+    def write_conversion_log(self, results):
+        """Write a batch's results (and, for isolated conversions, their resource usage) to the log folder."""
+        self.log_folder.mkdir(exist_ok=True)
         log_file = self.log_folder / f"conversion_log_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt"
         with open(log_file, 'w') as f:
             f.write(f"DXF to PDF Batch Conversion Log\n")
@@ -346,13 +572,20 @@ class DXFToPDFConverter:
                     f.write(f"  Pages: {result['pages']}\n")
                 else:
                     f.write(f"  Error: {result['output']}\n")
+                if 'usage' in result:
+                    usage = result['usage']
+                    f.write(f"  Status: {result['status']}\n")
+                    f.write(f"  Resources: CPU {usage.get('cpu_seconds', '?')}s "
+                            f"(user {usage.get('user_seconds', '?')}s, system {usage.get('system_seconds', '?')}s), "
+                            f"peak RSS {usage.get('max_rss_mb', '?')} MB, wall {usage['wall_seconds']}s\n")
                 f.write(f"\n")
         
         logger.info(f"Batch conversion complete. Log saved to {log_file}")
-        return results
+        return log_file
 
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
     converter = DXFToPDFConverter()
     results = converter.batch_convert()
     
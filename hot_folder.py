@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Hot Folder - converts new and changed files in INPUT_DATA automatically
+
+Polls the input folder, waits until dropped files have stopped changing,
+and runs an incremental UnifiedConverter session for the settled files, so
+only new or edited drawings and reports are rendered and the combined PDFs
+stay up to date.
+"""
+
+import argparse
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from conversion_manifest import file_sha256
+from unified_converter import COMBINE_MODES, INPUT_PATTERNS, UnifiedConverter
+
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "hot_folder_index.json"
+POLL_SECONDS = 2.0
+SETTLE_SECONDS = 5.0    # a file must keep its size and mtime this long before it is converted
+MAX_DELAY_SECONDS = 60.0  # settled changes wait at most this long for other files to settle
+
+
+class HotFolderWatcher:
+    """
+    Polling watcher with a persistent (path, size, mtime, hash) index.
+
+    A file counts as changed when its size or mtime differs from the index
+    and, once it has settled, its content hash does too (touching a file
+    does not trigger a conversion). Deleted files also trigger a session,
+    so they drop out of the combined PDFs.
+    """
+
+    def __init__(self, input_folder: str = "INPUT_DATA", output_folder: str = "OUTPUT_PDF",
+                 poll_seconds: float = POLL_SECONDS, settle_seconds: float = SETTLE_SECONDS,
+                 max_delay_seconds: float = MAX_DELAY_SECONDS, **converter_options):
+        """
+        Args:
+            input_folder: Folder the drafters drop files into
+            output_folder: Base output folder of the conversion sessions
+            poll_seconds: Time between scans
+            settle_seconds: Quiet time that marks a file as completely written
+            max_delay_seconds: Longest time settled changes wait for unsettled ones
+            converter_options: UnifiedConverter settings (html_backend, combine_mode, ...)
+        """
+        self.input_folder = Path(input_folder)
+        self.output_folder = Path(output_folder)
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.converter_options = converter_options
+        self.index_path = self.output_folder / INDEX_NAME
+        self.index: Dict[str, Dict[str, Any]] = self._load_index()
+        # filename -> (size, mtime, time it was first seen with them)
+        self._pending: Dict[str, tuple] = {}
+        self._changes_since: Optional[float] = None
+        self.sessions: List[Dict[str, Any]] = []
+
+    def _load_index(self) -> Dict[str, Dict[str, Any]]:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  Ignoring unreadable index {self.index_path}: {e}")
+            return {}
+
+    def _save_index(self) -> None:
+        self.output_folder.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.index_path.with_name(self.index_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def _list_inputs(self) -> Dict[str, os.stat_result]:
+        suffixes = {pattern.lstrip('*').lower() for patterns in INPUT_PATTERNS.values() for pattern in patterns}
+        files = {}
+        if not self.input_folder.is_dir():
+            return files
+        with os.scandir(self.input_folder) as scan:
+            for entry in scan:
+                if entry.name.startswith('.') or os.path.splitext(entry.name)[1].lower() not in suffixes:
+                    continue
+                try:
+                    files[entry.name] = entry.stat()
+                except OSError:
+                    continue  # removed while scanning
+        return files
+
+    def poll(self, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Scan once and convert if settled changes are due.
+
+        Returns:
+            Results of the conversion session, or None if nothing was converted
+        """
+        now = time.time() if now is None else now
+        current = self._list_inputs()
+        changed, unsettled = [], []
+
+        for name, stat in current.items():
+            known = self.index.get(name)
+            if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime:
+                self._pending.pop(name, None)
+                continue
+            signature = (stat.st_size, stat.st_mtime)
+            pending = self._pending.get(name)
+            if pending is None or pending[:2] != signature:
+                self._pending[name] = signature + (now,)
+                unsettled.append(name)
+            elif now - pending[2] < self.settle_seconds:
+                unsettled.append(name)
+            else:
+                changed.append(name)
+
+        removed = [name for name in self.index if name not in current]
+        for name in list(self._pending):
+            if name not in current:
+                del self._pending[name]
+
+        # Settled files whose content is unchanged (touched, copied over) only update the index
+        for name in list(changed):
+            stat = current[name]
+            sha256 = file_sha256(self.input_folder / name)
+            known = self.index.get(name)
+            self._pending.pop(name, None)
+            if known and known['sha256'] == sha256:
+                known.update(size=stat.st_size, mtime=stat.st_mtime)
+                changed.remove(name)
+            else:
+                self.index[name] = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': sha256,
+                                    'pending': True}
+
+        due = [name for name, entry in self.index.items() if entry.get('pending')]
+        if not due and not removed:
+            self._changes_since = None
+            return None
+        if self._changes_since is None:
+            self._changes_since = now
+        if unsettled and now - self._changes_since < self.max_delay_seconds:
+            logger.info(f"⏳ Waiting for {len(unsettled)} file(s) still being written")
+            return None
+
+        for name in removed:
+            del self.index[name]
+        self._changes_since = None
+        return self._convert(due, removed, unsettled)
+
+    def _convert(self, changed: List[str], removed: List[str], unsettled: List[str]) -> Dict[str, Any]:
+        logger.info(f"🔥 Hot folder: {len(changed)} new/changed, {len(removed)} removed file(s)")
+        for name in changed:
+            logger.info(f"   ✏️  {name}")
+        for name in removed:
+            logger.info(f"   🗑️  {name}")
+
+        # Files still being written sit this session out; unchanged ones are
+        # reused from the previous session by the incremental converter
+        settled = sorted((name for name in self.index if name not in unsettled), key=str.lower)
+        html_suffixes = {pattern.lstrip('*').lower() for pattern in INPUT_PATTERNS['html']}
+        input_files = {
+            'html': [name for name in settled if Path(name).suffix.lower() in html_suffixes],
+            'dxf': [name for name in settled if Path(name).suffix.lower() not in html_suffixes]
+        }
+        if not input_files['html'] and not input_files['dxf']:
+            self._save_index()
+            return {'success': True, 'changed': changed, 'removed': removed, 'summary': {}}
+
+        converter = UnifiedConverter(str(self.input_folder), str(self.output_folder),
+                                     incremental=True, **self.converter_options)
+        results = converter.convert_all_files(input_files)
+        for name in changed:
+            self.index[name].pop('pending', None)
+        self._save_index()
+
+        results['changed'], results['removed'] = changed, removed
+        self.sessions.append(results)
+        return results
+
+    def run(self, stop_after: Optional[float] = None) -> None:
+        """Poll until interrupted (or for stop_after seconds)."""
+        logger.info(f"👀 Watching {self.input_folder} every {self.poll_seconds:.0f}s "
+                    f"({len(self.index)} file(s) indexed)")
+        started = time.time()
+        try:
+            while stop_after is None or time.time() - started < stop_after:
+                try:
+                    self.poll()
+                except Exception as e:
+                    logger.error(f"❌ Hot folder conversion failed: {e}", exc_info=True)
+                time.sleep(self.poll_seconds)
+        except KeyboardInterrupt:
+            logger.info("👋 Hot folder watcher stopped")
+
+
+def main():
+    """Run the hot-folder watcher from the command line."""
+    parser = argparse.ArgumentParser(description='Convert new and changed files in the input folder automatically')
+    parser.add_argument('--input', default=os.environ.get('UPLOAD_FOLDER', 'INPUT_DATA'),
+                        help='Folder to watch (default: INPUT_DATA)')
+    parser.add_argument('--output', default=os.environ.get('OUTPUT_FOLDER', 'OUTPUT_PDF'),
+                        help='Base output folder (default: OUTPUT_PDF)')
+    parser.add_argument('--interval', type=float, default=POLL_SECONDS,
+                        help=f'Seconds between scans (default: {POLL_SECONDS:.0f})')
+    parser.add_argument('--settle', type=float, default=SETTLE_SECONDS,
+                        help=f'Seconds a file must stay unchanged before conversion (default: {SETTLE_SECONDS:.0f})')
+    parser.add_argument('--backend', default=os.environ.get('HTML_BACKEND', 'wkhtmltopdf'),
+                        choices=['wkhtmltopdf', 'native'], help='HTML rendering backend')
+    parser.add_argument('--profile', default=os.environ.get('HTML_OUTPUT_PROFILE', 'quality'),
+                        choices=['quality', 'compact'], help='Combined HTML report profile')
+    parser.add_argument('--combine-mode', default=os.environ.get('DXF_COMBINE_MODE', 'merge'),
+                        choices=list(COMBINE_MODES), help='How the combined DXF PDF is built')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    watcher = HotFolderWatcher(args.input, args.output, poll_seconds=args.interval,
+                               settle_seconds=args.settle, html_backend=args.backend,
+                               html_output_profile=args.profile, combine_mode=args.combine_mode)
+    watcher.run()
+
+
+if __name__ == "__main__":
+    main()
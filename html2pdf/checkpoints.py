@@ -0,0 +1,92 @@
+"""Checkpoints that let an interrupted conversion job resume where it stopped."""
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+import contextvars
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+_current_journal: contextvars.ContextVar = contextvars.ContextVar('checkpoint_journal', default=None)
+
+
+class Preempted(BaseException):
+    """
+    Raised at a yield point when the job should make way for more urgent work.
+
+    A BaseException, so converters' generic error handling does not turn it
+    into a failed conversion; the job manager re-queues the job, which later
+    resumes from its checkpoints.
+    """
+
+
+class CheckpointJournal:
+    """
+    Checkpoints of one job: small JSON-ready records by key plus a directory
+    for intermediate files that must survive a restart.
+
+    Converters look the journal up with active() and skip work whose
+    checkpoint (and files) still exist. With a store, every save() is
+    persisted before it returns; without one the journal only lives in memory.
+    """
+
+    def __init__(self, job_id: str, directory: Path, store=None, saved: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            job_id: Job the checkpoints belong to
+            directory: Where the job keeps intermediate files (created on first use)
+            store: Object with save_checkpoint(job_id, key, data), e.g. a JobStore
+            saved: Checkpoints recorded before a restart
+        """
+        self.job_id = job_id
+        self._directory = Path(directory)
+        self._store = store
+        self._saved: Dict[str, Any] = dict(saved or {})
+        self._lock = threading.Lock()
+        # Set by the job manager: returns True when the job should yield
+        self.should_yield: Optional[Callable[[], bool]] = None
+
+    @property
+    def directory(self) -> Path:
+        self._directory.mkdir(parents=True, exist_ok=True)
+        return self._directory
+
+    def load(self, key: str) -> Any:
+        """Checkpoint stored under key, or None."""
+        with self._lock:
+            return self._saved.get(key)
+
+    def save(self, key: str, data: Any) -> None:
+        """Record a checkpoint (replacing any previous one under key)."""
+        with self._lock:
+            self._saved[key] = data
+            if self._store is not None:
+                self._store.save_checkpoint(self.job_id, key, data)
+
+
+@contextmanager
+def bind(journal: Optional[CheckpointJournal]):
+    """Make journal the active one for this context (and threads started with its copy)."""
+    token = _current_journal.set(journal)
+    try:
+        yield journal
+    finally:
+        _current_journal.reset(token)
+
+
+def active() -> Optional[CheckpointJournal]:
+    """Journal of the job running in this context, if any."""
+    return _current_journal.get()
+
+
+def yield_point() -> None:
+    """
+    Mark a point where the running job can stop without losing work (its
+    progress so far is checkpointed). Raises Preempted if the job manager
+    wants the worker for a more urgent job.
+    """
+    journal = _current_journal.get()
+    if journal is not None and journal.should_yield is not None and journal.should_yield():
+        logger.info(f"⏸️  Job {journal.job_id} yields to more urgent work")
+        raise Preempted(journal.job_id)
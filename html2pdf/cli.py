@@ -5,11 +5,13 @@ import sys
 from pathlib import Path
 from datetime import datetime
 
-from .models import ConversionResult, ConverterConfig
+from .models import ConversionResult, ConverterConfig, OptimizationStats
 from .scanner import scan_html_files
 from .converter import HTMLConverter
 from .merger import merge_pdfs
+from .optimizer import OUTPUT_PROFILES, optimize_pdf
 from .reporter import report_results
+from .scratch import ScratchArea, purge_stale
 
 
 def setup_logging():
@@ -61,6 +63,32 @@ def parse_arguments() -> argparse.Namespace:
         help='Page orientation (default: Portrait)'
     )
     
+    parser.add_argument(
+        '--backend',
+        type=str,
+        default='wkhtmltopdf',
+        choices=['wkhtmltopdf', 'native'],
+        help='Rendering backend; native lays STRUDS reports out with reportlab and '
+             'falls back to wkhtmltopdf for other HTML (default: wkhtmltopdf)'
+    )
+    
+    parser.add_argument(
+        '--timeout',
+        type=float,
+        default=120,
+        help='Seconds to wait for one HTML file before killing wkhtmltopdf and '
+             'retrying once with a cheaper profile (default: 120)'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        type=str,
+        default='quality',
+        choices=list(OUTPUT_PROFILES),
+        help='Output profile; compact compresses streams, shares identical fonts/images '
+             'and downsamples images above 150 dpi (default: quality)'
+    )
+    
     args = parser.parse_args()
     
     # Validate source directory
@@ -82,6 +110,7 @@ def main():
     """Entry point for the CLI application."""
     setup_logging()
     logger = logging.getLogger(__name__)
+    scratch = None
     
     try:
         # Parse arguments
@@ -111,7 +140,11 @@ def main():
             source_dir=args.source_dir,
             output_file=args.output
         )
-        converter = HTMLConverter(config.temp_dir, args.page_size, args.orientation)
+        purge_stale(config.temp_dir)
+        scratch = ScratchArea(config.temp_dir)
+        scratch.create()
+        converter = HTMLConverter(scratch.path, args.page_size, args.orientation, backend=args.backend,
+                                  timeout=args.timeout)
         
         # Convert HTML files to PDFs
         successful_pdfs, failed_conversions = converter.convert_batch(html_files)
@@ -130,8 +163,16 @@ def main():
             converter.cleanup()
             sys.exit(1)
         
+        # Optimise each report before merging, so memory stays bounded by the
+        # largest report; the merge then shares identical resources across them
+        profile_settings = OUTPUT_PROFILES[args.profile]
+        original_bytes = sum(pdf.stat().st_size for pdf in successful_pdfs)
+        if profile_settings:
+            for pdf in successful_pdfs:
+                optimize_pdf(pdf, **profile_settings)
+        
         # Merge PDFs
-        merge_success = merge_pdfs(successful_pdfs, args.output)
+        merge_success = merge_pdfs(successful_pdfs, args.output, dedupe=bool(profile_settings))
         
         if not merge_success:
             logger.error("Failed to merge PDFs")
@@ -149,6 +190,11 @@ def main():
         # Clean up temporary files
         converter.cleanup()
         
+        if profile_settings:
+            stats = OptimizationStats(original_bytes=original_bytes, optimized_bytes=args.output.stat().st_size)
+            print(f"\nOptimised output: {stats.original_bytes:,} -> {stats.optimized_bytes:,} bytes "
+                  f"({stats.reduction_percent:.0f}% smaller)")
+        
         # Report results
         result = ConversionResult(
             total_files=len(html_files),
@@ -168,6 +214,9 @@ def main():
         logger.error(f"Unexpected error: {e}", exc_info=True)
         print(f"\n✗ Error: {e}")
         sys.exit(1)
+    finally:
+        if scratch:
+            scratch.remove()
 
 
 if __name__ == '__main__':
@@ -1,16 +1,31 @@
 """HTML to PDF converter module."""
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 import logging
-import pdfkit
+import shutil
+import time
+
+from . import checkpoints, cost_model, progress
+from .models import RenderReport
+from .native_renderer import UnsupportedHTMLError, render_report
+from .normalizer import detect_encoding, inject_stylesheet, is_struds_report, normalize_html
+from .watchdog import DEFAULT_MEMORY_LIMIT_MB, DEFAULT_TIMEOUT_SECONDS, render_with_watchdog
 
 logger = logging.getLogger(__name__)
 
+# Rendering backends: 'native' lays STRUDS reports out with reportlab and
+# falls back to wkhtmltopdf for anything it does not recognise
+BACKENDS = ('wkhtmltopdf', 'native')
+
 
 class HTMLConverter:
     """Converts HTML files to PDF format with enhanced elegance and maximum page usage."""
     
-    def __init__(self, temp_dir: Path, page_size: str = 'A4', orientation: str = 'Portrait'):
+    def __init__(self, temp_dir: Path, page_size: str = 'A4', orientation: str = 'Portrait',
+                 normalize_struds: bool = True, backend: str = 'wkhtmltopdf',
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                 memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB,
+                 wkhtmltopdf: Optional[str] = None):
         """
         Initialize converter with temporary directory for intermediate PDFs.
         
@@ -18,9 +33,25 @@ class HTMLConverter:
             temp_dir: Path to temporary directory for storing intermediate PDFs
             page_size: PDF page size (A4, A3, Letter, etc.)
             orientation: Page orientation (Portrait or Landscape)
+            normalize_struds: Rewrite STRUDS reports into compact HTML before rendering
+            backend: Rendering backend ('wkhtmltopdf' or 'native')
+            timeout: Wall-clock limit per wkhtmltopdf run in seconds
+            memory_limit_mb: Address-space limit per wkhtmltopdf run in MB (None for no limit)
+            wkhtmltopdf: Path to the wkhtmltopdf binary (default: found on PATH)
         """
         self.temp_dir = temp_dir
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        self.page_size = page_size
+        self.orientation = orientation
+        self.normalize_struds = normalize_struds
+        self.normalization_stats = {}
+        self.backend = backend if backend in BACKENDS else 'wkhtmltopdf'
+        self.backends_used = {}
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.wkhtmltopdf = wkhtmltopdf
+        self.render_reports = {}
+        self._created_pdfs = []
         
         # Configure wkhtmltopdf options for MAXIMUM page usage with ONLY 10mm margins
         self.options = {
@@ -78,9 +109,6 @@ class HTMLConverter:
         enhanced_path = self.temp_dir / f"enhanced_{html_path.name}"
         
         try:
-            with open(html_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
             # ULTRA ELEGANT CSS for PDF rendering with MAXIMUM page usage and ONLY 10mm margins
             pdf_css = """
             <style type="text/css" media="print,screen">
@@ -260,17 +288,17 @@ class HTMLConverter:
             </style>
             """
             
-            # Insert CSS before closing head tag or at the beginning if no head
-            if '</head>' in content:
-                content = content.replace('</head>', f'{pdf_css}</head>')
-            elif '<head>' in content:
-                content = content.replace('<head>', f'<head>{pdf_css}')
-            else:
-                # Add head section if it doesn't exist
-                if '<html>' in content:
-                    content = content.replace('<html>', f'<html><head>{pdf_css}</head>')
-                else:
-                    content = f'<html><head>{pdf_css}</head><body>{content}</body></html>'
+            if self.normalize_struds and is_struds_report(html_path):
+                # Compact STRUDS markup so the stylesheet restyles far fewer nodes
+                stats = normalize_html(html_path, enhanced_path, extra_css=pdf_css)
+                self.normalization_stats[html_path.name] = stats
+                return enhanced_path
+            
+            with open(html_path, 'r', encoding=detect_encoding(html_path)) as f:
+                content = f.read()
+            
+            # Insert CSS into the head section (tag case does not matter)
+            content = inject_stylesheet(content, pdf_css)
             
             with open(enhanced_path, 'w', encoding='utf-8') as f:
                 f.write(content)
@@ -291,36 +319,109 @@ class HTMLConverter:
         Returns:
             Path to generated PDF, or None if conversion failed
         """
+        start = time.perf_counter()
+        report = RenderReport(file=html_path.name, status='failed')
+        self.render_reports[html_path.name] = report
         try:
-            # Generate output PDF path in temp directory
-            pdf_filename = html_path.stem + '.pdf'
+            # Generate output PDF path in temp directory (suffix kept so a.htm and a.html differ)
+            pdf_filename = f"{html_path.stem}{html_path.suffix.replace('.', '_')}.pdf"
             pdf_path = self.temp_dir / pdf_filename
+            self._created_pdfs.append(pdf_path)
+            
+            if self._restore_checkpoint(html_path, pdf_path, report):
+                return pdf_path
+            
+            if self.backend == 'native':
+                try:
+                    # Measured only so that a DXF render overlapping it is not
+                    # credited with its memory
+                    with cost_model.PeakMemory():
+                        cells = render_report(html_path, pdf_path, self.page_size, self.orientation)
+                    self.backends_used[html_path.name] = 'native'
+                    report.backend = 'native'
+                    report.status = 'ok'
+                    report.duration_seconds = round(time.perf_counter() - start, 3)
+                    logger.info(f"Successfully converted {html_path.name} natively ({cells} table cells)")
+                    self._save_checkpoint(html_path, pdf_path, report)
+                    self._observe_cost(html_path, pdf_path, report)
+                    return pdf_path
+                except UnsupportedHTMLError as e:
+                    logger.info(f"{html_path.name} not handled natively ({e}), using wkhtmltopdf")
+                except Exception as e:
+                    logger.warning(f"Native rendering failed for {html_path.name}: {e}, using wkhtmltopdf")
             
             logger.info(f"Converting {html_path.name} to PDF with enhanced styling...")
             
             # Enhance HTML for better PDF rendering
             enhanced_html = self.enhance_html_for_pdf(html_path)
             
-            # Convert enhanced HTML to PDF
-            pdfkit.from_file(str(enhanced_html), str(pdf_path), options=self.options)
+            # Convert enhanced HTML to PDF in a watched subprocess (degraded retry on hang)
+            report.attempts = render_with_watchdog(enhanced_html, pdf_path, self.options,
+                                                   self.timeout, self.memory_limit_mb, self.wkhtmltopdf)
+            last = report.attempts[-1]
             
             # Clean up enhanced HTML file
             if enhanced_html != html_path and enhanced_html.exists():
                 enhanced_html.unlink()
             
-            logger.info(f"Successfully converted {html_path.name}")
+            report.duration_seconds = round(time.perf_counter() - start, 3)
+            if last['status'] != 'ok':
+                report.status = 'timeout' if last['status'] == 'timeout' else 'failed'
+                report.error = last.get('error')
+                logger.warning(f"Failed to convert {html_path.name}: {report.error}")
+                return None
+            
+            report.status = 'ok' if last['profile'] == 'normal' else 'degraded'
+            self.backends_used[html_path.name] = 'wkhtmltopdf'
+            logger.info(f"Successfully converted {html_path.name}"
+                        + (" with degraded profile" if report.status == 'degraded' else ""))
+            self._save_checkpoint(html_path, pdf_path, report)
+            self._observe_cost(html_path, pdf_path, report)
             return pdf_path
             
         except Exception as e:
+            report.error = str(e)
+            report.duration_seconds = round(time.perf_counter() - start, 3)
             logger.warning(f"Failed to convert {html_path.name}: {e}")
             return None
     
-    def convert_batch(self, html_files: List[Path]) -> Tuple[List[Path], List[Tuple[Path, str]]]:
+    def _observe_cost(self, html_path: Path, pdf_path: Path, report: RenderReport) -> None:
+        """Report the render to the preflight cost model, if one is collecting."""
+        if cost_model.active() is not None and report.status == 'ok':
+            stats = dict(cost_model.html_stats(html_path), backend=report.backend)
+            cost_model.observe('html', stats, report.duration_seconds, pdf_path)
+    
+    def _save_checkpoint(self, html_path: Path, pdf_path: Path, report: RenderReport) -> None:
+        """Keep a copy of a converted file outside the scratch area when running in a persistent job."""
+        journal = checkpoints.active()
+        if journal is None:
+            return
+        saved_pdf = journal.directory / f"html_{pdf_path.name}"
+        shutil.copy2(pdf_path, saved_pdf)
+        journal.save(f"html_file:{html_path}", {'pdf': str(saved_pdf), 'backend': report.backend,
+                                                'status': report.status})
+    
+    def _restore_checkpoint(self, html_path: Path, pdf_path: Path, report: RenderReport) -> bool:
+        """Reuse the PDF of a file converted before a restart of the current job."""
+        journal = checkpoints.active()
+        saved = journal.load(f"html_file:{html_path}") if journal is not None else None
+        if not saved or not Path(saved['pdf']).exists():
+            return False
+        shutil.copy2(saved['pdf'], pdf_path)
+        report.backend, report.status = saved['backend'], saved['status']
+        self.backends_used[html_path.name] = saved['backend']
+        logger.info(f"♻️  {html_path.name} was converted before the restart")
+        return True
+    
+    def convert_batch(self, html_files: List[Path],
+                      on_converted: Optional[Callable[[int, Optional[Path]], None]] = None
+                      ) -> Tuple[List[Path], List[Tuple[Path, str]]]:
         """
         Convert multiple HTML files to PDFs.
         
         Args:
             html_files: List of HTML file paths
+            on_converted: Called with (index, pdf_path or None) as each file finishes
             
         Returns:
             Tuple of (successful_pdfs, failed_conversions)
@@ -328,27 +429,37 @@ class HTMLConverter:
         """
         successful_pdfs = []
         failed_conversions = []
+        progress.expect_files(len(html_files))
         
-        for html_file in html_files:
+        for index, html_file in enumerate(html_files):
+            pdf_path = None
+            progress.emit('file_started', file=html_file.name)
             try:
                 pdf_path = self.convert_file(html_file)
                 if pdf_path and pdf_path.exists():
                     successful_pdfs.append(pdf_path)
                 else:
-                    failed_conversions.append((html_file, "Conversion failed - no output generated"))
+                    pdf_path = None
+                    report = self.render_reports.get(html_file.name)
+                    error = report.error if report and report.error else "Conversion failed - no output generated"
+                    failed_conversions.append((html_file, error))
             except Exception as e:
                 error_msg = str(e)
                 failed_conversions.append((html_file, error_msg))
                 logger.error(f"Error converting {html_file}: {error_msg}")
+            
+            progress.emit('file_done', file=html_file.name, success=pdf_path is not None)
+            if on_converted:
+                on_converted(index, pdf_path)
         
         return successful_pdfs, failed_conversions
     
     def cleanup(self):
-        """Clean up temporary files."""
+        """Clean up the temporary PDFs created by this converter."""
         try:
-            if self.temp_dir.exists():
-                for file in self.temp_dir.glob('*.pdf'):
-                    file.unlink()
-                logger.info("Cleaned up temporary files")
+            for file in self._created_pdfs:
+                file.unlink(missing_ok=True)
+            self._created_pdfs = []
+            logger.info("Cleaned up temporary files")
         except Exception as e:
             logger.warning(f"Failed to clean up temporary files: {e}")
\ No newline at end of file
@@ -0,0 +1,228 @@
+"""Render-cost model: predicts time, memory and output size from file statistics."""
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+TARGETS = ('seconds', 'peak_mb', 'output_bytes')
+MAX_OBSERVATIONS = 500  # per kind; the oldest are dropped first
+MIN_FIT_OBSERVATIONS = 3
+
+# Uncalibrated (intercept, slope) per kind and target, applied to work_units()
+DEFAULT_COEFFICIENTS = {
+    'dxf': {'seconds': (0.5, 5e-4), 'peak_mb': (40.0, 0.02), 'output_bytes': (2000.0, 350.0)},
+    'html': {'seconds': (0.2, 1e-5), 'peak_mb': (30.0, 5e-5), 'output_bytes': (2000.0, 0.5)}
+}
+
+_active_model = None
+_measurements: List["PeakMemory"] = []  # conversions of this process being measured
+_measurements_lock = threading.Lock()
+
+
+def work_units(kind: str, stats: Dict[str, Any], target: str) -> float:
+    """
+    The quantity a target grows with.
+
+    A drawing is rendered once and then written out once per page, so its
+    render time follows entities * (pages + 1), its output entities * pages
+    and its memory the entity count. HTML cost follows the file size.
+    """
+    if kind == 'dxf':
+        entities = stats.get('virtual_entities', 0)
+        pages = stats.get('pages', 1)
+        return {'seconds': entities * (pages + 1), 'output_bytes': entities * pages}.get(target, entities)
+    return stats.get('bytes', 0)
+
+
+def html_stats(html_path: Path) -> Dict[str, Any]:
+    """Size, table and row counts of an HTML file (one streaming pass, no parsing)."""
+    from .normalizer import CHUNK_SIZE, is_struds_report
+    
+    tags = {'tables': b'<table', 'rows': b'<tr', 'images': b'<img'}
+    counts = dict.fromkeys(tags, 0)
+    overlap = max(len(tag) for tag in tags.values()) - 1
+    tail = b''
+    with open(html_path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            window = tail + chunk.lower()
+            for name, tag in tags.items():
+                # Matches ending inside the carried-over tail were counted already
+                counts[name] += window.count(tag) - tail.count(tag)
+            tail = window[-overlap:]
+    return dict(counts, bytes=Path(html_path).stat().st_size, struds=is_struds_report(Path(html_path)))
+
+
+def rss_mb() -> Optional[float]:
+    """Resident memory of this process in MB (None where /proc is unavailable)."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PeakMemory:
+    """
+    Peak resident memory one conversion added to the process.
+
+    RSS is sampled at the start, by sample_memory() (called once per
+    rendered page) and at close(). The process is shared, so the peak is only
+    attributed to the conversion if no other measured conversion overlapped it.
+    """
+
+    def __init__(self):
+        self.baseline = rss_mb()
+        self.highest = self.baseline
+        self.overlapped = False
+        with _measurements_lock:
+            for other in _measurements:
+                other.overlapped = True
+            self.overlapped = bool(_measurements)
+            _measurements.append(self)
+
+    def close(self) -> None:
+        """Take the last sample and stop measuring."""
+        self.sample()
+        with _measurements_lock:
+            if self in _measurements:
+                _measurements.remove(self)
+
+    def __enter__(self) -> "PeakMemory":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def sample(self) -> None:
+        current = rss_mb()
+        if current is not None and self.highest is not None:
+            self.highest = max(self.highest, current)
+
+    @property
+    def peak_mb(self) -> Optional[float]:
+        """Growth over the baseline at the highest sample; None if unknown or overlapped."""
+        if self.overlapped or self.baseline is None or self.highest is None:
+            return None
+        return max(0.0, self.highest - self.baseline)
+
+
+def sample_memory() -> None:
+    """Sample RSS for the conversions being measured (cheap when there are none)."""
+    if _measurements:
+        for measurement in list(_measurements):
+            measurement.sample()
+
+
+class CostModel:
+    """
+    Linear cost model per input kind and target, calibrated on past runs.
+
+    Each observation stores the statistics of a converted file and what the
+    conversion cost. With MIN_FIT_OBSERVATIONS or more, a least-squares line
+    is fitted over work_units(); with fewer, the default slope is scaled to
+    the observations. Observations are persisted to a JSON file.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Args:
+            path: JSON file for the observations (None keeps them in memory)
+        """
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self.observations: Dict[str, List[Dict[str, Any]]] = {'dxf': [], 'html': []}
+        if self.path and self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    loaded = json.load(f)
+                for kind in self.observations:
+                    self.observations[kind] = loaded.get(kind, [])[-MAX_OBSERVATIONS:]
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️  Ignoring unreadable cost model {self.path}: {e}")
+
+    def observe(self, kind: str, stats: Dict[str, Any], seconds: float, output_bytes: int,
+                peak_mb: Optional[float] = None) -> None:
+        """Record what converting a file with these statistics cost."""
+        record = {'stats': stats, 'seconds': round(seconds, 4), 'output_bytes': output_bytes}
+        if peak_mb is not None:
+            record['peak_mb'] = round(peak_mb, 1)
+        with self._lock:
+            observations = self.observations.setdefault(kind, [])
+            observations.append(record)
+            del observations[:-MAX_OBSERVATIONS]
+            self._save()
+
+    def _save(self) -> None:
+        if self.path is None:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.observations, f)
+        os.replace(tmp_path, self.path)
+
+    def _coefficients(self, kind: str, target: str) -> tuple:
+        intercept, slope = DEFAULT_COEFFICIENTS[kind][target]
+        with self._lock:
+            points = [(work_units(kind, o['stats'], target), o[target])
+                      for o in self.observations.get(kind, []) if o.get(target) is not None]
+        if not points:
+            return intercept, slope, 0
+
+        n = len(points)
+        mean_x = sum(x for x, _ in points) / n
+        mean_y = sum(y for _, y in points) / n
+        spread = sum((x - mean_x) ** 2 for x, _ in points)
+        if n >= MIN_FIT_OBSERVATIONS and spread > 0:
+            fitted = sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+            if fitted > 0:
+                return max(0.0, mean_y - fitted * mean_x), fitted, n
+        # Too few or too similar runs for a line: scale the default to match them
+        predicted = intercept + slope * mean_x
+        return intercept * mean_y / predicted, slope * mean_y / predicted, n
+
+    def predict(self, kind: str, stats: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Predicted cost of converting a file.
+
+        Returns:
+            Dictionary with 'seconds', 'peak_mb', 'output_bytes' and, per
+            target, the number of observations it was calibrated on
+        """
+        prediction: Dict[str, Any] = {'calibrated_on': {}}
+        for target in TARGETS:
+            intercept, slope, n = self._coefficients(kind, target)
+            value = intercept + slope * work_units(kind, stats, target)
+            prediction[target] = int(value) if target == 'output_bytes' else round(value, 2)
+            prediction['calibrated_on'][target] = n
+        return prediction
+
+
+def set_model(model: Optional[CostModel]) -> None:
+    """Make model the one conversions in this process report their costs to."""
+    global _active_model
+    _active_model = model
+
+
+def active() -> Optional[CostModel]:
+    """Model conversions report to, if any."""
+    return _active_model
+
+
+def observe(kind: str, stats: Dict[str, Any], seconds: float, output_path,
+            peak_mb: Optional[float] = None) -> None:
+    """Report a finished conversion to the active model (no-op without one)."""
+    model = _active_model
+    if model is None:
+        return
+    try:
+        model.observe(kind, stats, seconds, Path(output_path).stat().st_size, peak_mb)
+    except Exception as e:
+        logger.warning(f"⚠️  Could not record conversion cost: {e}")
@@ -1,20 +1,409 @@
 """PDF merger module."""
+from array import array
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import gc
+import hashlib
 import logging
-from PyPDF2 import PdfMerger
+import os
+import queue
+import threading
+
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (ArrayObject, Destination, DictionaryObject, IndirectObject, NameObject,
+                            NullObject, NumberObject, StreamObject, TextStringObject)
+
+from .optimizer import fingerprint, shareable
 
 logger = logging.getLogger(__name__)
 
+PDF_HEADER = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"
+COLLECT_AFTER_BYTES = 1024 * 1024  # sources at least this large are freed right after copying
+
+
+def _references(obj) -> Iterator[IndirectObject]:
+    """References held directly by an object (without following them)."""
+    if isinstance(obj, IndirectObject):
+        yield obj
+    elif isinstance(obj, DictionaryObject):
+        for value in obj.values():
+            yield from _references(value)
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            yield from _references(item)
+
+
+class StreamingPdfMerger:
+    """
+    Memory-bounded PDF merger that writes pages to the output as they are copied.
+    
+    Each source is opened, its pages and the objects they reference are
+    renumbered and written straight to the output file, and the source is
+    released before the next one is read. Only the xref offsets, the page
+    list and the outline titles stay in memory, so peak memory depends on
+    the largest single input rather than on the number of inputs.
+    
+    With dedupe, fonts, images and other shared resources identical to one
+    already written are not written again: a table of their fingerprints
+    (one digest per distinct resource, page contents excluded) maps them to
+    the existing copy.
+    
+    Usage:
+        with StreamingPdfMerger(output_path) as merger:
+            for pdf in pdf_files:
+                merger.append(pdf)
+    """
+
+    def __init__(self, output_path: Path, info: Optional[Dict[str, str]] = None, dedupe: bool = False):
+        """
+        Args:
+            output_path: Path for the merged PDF
+            info: Document information entries, e.g. {'Title': ...}
+            dedupe: Share resources identical to ones of earlier inputs
+        """
+        self.output_path = Path(output_path)
+        self.info = info or {}
+        self.dedupe = dedupe
+        self._shared: Dict[bytes, int] = {}  # fingerprint digest -> output object number
+        self.deduplicated = 0
+        self.deduplicated_bytes = 0  # stream data not written again
+        self._stream = open(self.output_path, 'wb')
+        self._stream.write(PDF_HEADER)
+        # Compact integer arrays: one entry per output object / page
+        self._offsets = array('q')
+        self._pages_id = self._allocate()
+        self._kids = array('q')
+        self._outline: List[dict] = []
+        self.page_count = 0
+
+    def _allocate(self) -> int:
+        """Reserve the next object number in the output."""
+        self._offsets.append(-1)
+        return len(self._offsets)
+
+    def _write_object(self, idnum: int, obj) -> None:
+        """Write one object at the current end of the output."""
+        self._offsets[idnum - 1] = self._stream.tell()
+        self._stream.write(b"%d 0 obj\n" % idnum)
+        obj.write_to_stream(self._stream, None)
+        self._stream.write(b"\nendobj\n")
+
+    def append(self, pdf_path: Union[Path, str], pages: Optional[range] = None) -> int:
+        """
+        Copy the pages of one PDF (with the objects they use) into the output.
+        
+        Args:
+            pdf_path: Source PDF
+            pages: Page indices to copy (default: all pages)
+        
+        Returns:
+            Number of pages copied
+        """
+        with open(pdf_path, 'rb') as f:
+            source_bytes = os.fstat(f.fileno()).st_size
+            reader = PdfReader(f)
+            if reader.is_encrypted:
+                reader.decrypt('')
+            
+            # Map source object numbers to output numbers; pages are mapped up
+            # front so links and outline entries pointing at them resolve to
+            # the copies instead of dragging in the source page tree
+            mapping: Dict[int, int] = {}
+            pending: List[int] = []
+            all_pages = list(reader.pages)
+            pages = all_pages if pages is None else [all_pages[i] for i in pages]
+            page_ids = []
+            for page in pages:
+                page_id = self._allocate()
+                page_ids.append(page_id)
+                if page.indirect_reference is not None:
+                    mapping[page.indirect_reference.idnum] = page_id
+
+            # References to pages outside the copied range are dropped rather
+            # than pulling those pages (and their page tree) into the output
+            skipped_pages = {page.indirect_reference.idnum for page in all_pages
+                             if page.indirect_reference is not None} - set(mapping)
+            # Page contents are rarely shared; keeping them out bounds the fingerprint table
+            unshared = {ref.idnum for page in pages for ref in _references(page.get('/Contents'))}
+            
+            def share(source_id: int) -> bool:
+                """Map a shareable object to an identical copy already written, or register it."""
+                obj = reader.get_object(source_id)
+                if source_id in unshared or not shareable(obj):
+                    return False
+                unshared.add(source_id)  # guards against reference cycles while resolving
+                references = list(_references(obj))
+                if any(ref.idnum in skipped_pages for ref in references):
+                    return False
+                # Resolve what it references first, so identical copies get identical keys
+                for ref in references:
+                    remap(ref)
+                if source_id in mapping:  # reached again through a reference cycle
+                    return True
+                key = hashlib.sha1(fingerprint(obj, mapping)).digest()
+                if key in self._shared:
+                    mapping[source_id] = self._shared[key]
+                    self.deduplicated += 1
+                    if isinstance(obj, StreamObject):
+                        self.deduplicated_bytes += len(obj._data)
+                else:
+                    mapping[source_id] = self._shared[key] = self._allocate()
+                    pending.append(source_id)
+                return True
+            
+            def remap(obj):
+                if isinstance(obj, IndirectObject):
+                    if obj.idnum in skipped_pages:
+                        return NullObject()
+                    if obj.idnum not in mapping and not (self.dedupe and share(obj.idnum)):
+                        mapping[obj.idnum] = self._allocate()
+                        pending.append(obj.idnum)
+                    return IndirectObject(mapping[obj.idnum], 0, None)
+                if isinstance(obj, StreamObject):
+                    copy = obj.__class__()
+                    copy._data = obj._data
+                    for key, value in obj.items():
+                        copy[NameObject(key)] = remap(value)
+                    return copy
+                if isinstance(obj, DictionaryObject):
+                    return DictionaryObject({NameObject(k): remap(v) for k, v in obj.items()})
+                if isinstance(obj, ArrayObject):
+                    return ArrayObject(remap(item) for item in obj)
+                return obj
+            
+            for page, page_id in zip(pages, page_ids):
+                copy = DictionaryObject({NameObject(k): remap(v) for k, v in page.items()
+                                         if k not in ('/Parent', '/StructParents')})
+                copy[NameObject('/Parent')] = IndirectObject(self._pages_id, 0, None)
+                self._write_object(page_id, copy)
+                
+                # Flush everything this page referenced before moving on
+                while pending:
+                    source_id = pending.pop()
+                    obj = reader.get_object(source_id)
+                    self._write_object(mapping[source_id], remap(obj) if obj is not None else NullObject())
+            
+            self._outline.extend(self._copy_outline(reader.outline, mapping))
+            del reader, pages, all_pages
+        if source_bytes >= COLLECT_AFTER_BYTES:
+            # A reader and its objects reference each other: free a large source now
+            # rather than carry it until the cyclic collector happens to run
+            gc.collect()
+        
+        self._kids.extend(page_ids)
+        self.page_count += len(page_ids)
+        return len(page_ids)
+
+    def _copy_outline(self, items: list, mapping: Dict[int, int]) -> List[dict]:
+        """Keep a source outline as titles and remapped destinations."""
+        entries: List[dict] = []
+        for item in items:
+            if isinstance(item, list):
+                if entries:
+                    entries[-1]['children'] = self._copy_outline(item, mapping)
+                continue
+            if not isinstance(item, Destination):
+                continue
+            dest = item.dest_array
+            page = dest[0]
+            if not isinstance(page, IndirectObject) or page.idnum not in mapping:
+                continue
+            dest[0] = IndirectObject(mapping[page.idnum], 0, None)
+            entries.append({'title': str(item.title), 'dest': dest, 'children': []})
+        return entries
+
+    def _write_outline(self, entries: List[dict], parent_id: int) -> List[int]:
+        """Write outline items under parent_id and return their object numbers."""
+        ids = [self._allocate() for _ in entries]
+        for i, (entry, item_id) in enumerate(zip(entries, ids)):
+            child_ids = self._write_outline(entry['children'], item_id)
+            item = DictionaryObject({
+                NameObject('/Title'): TextStringObject(entry['title']),
+                NameObject('/Parent'): IndirectObject(parent_id, 0, None),
+                NameObject('/Dest'): entry['dest'],
+            })
+            if i > 0:
+                item[NameObject('/Prev')] = IndirectObject(ids[i - 1], 0, None)
+            if i + 1 < len(ids):
+                item[NameObject('/Next')] = IndirectObject(ids[i + 1], 0, None)
+            if child_ids:
+                item[NameObject('/First')] = IndirectObject(child_ids[0], 0, None)
+                item[NameObject('/Last')] = IndirectObject(child_ids[-1], 0, None)
+                item[NameObject('/Count')] = NumberObject(len(child_ids))
+            self._write_object(item_id, item)
+        return ids
+
+    def close(self) -> None:
+        """Write the page tree, outline, catalog, xref table and trailer."""
+        if self._stream.closed:
+            return
+        
+        # Page tree written directly: a /Kids array of PdfObjects would cost
+        # far more memory than the pages it lists
+        self._offsets[self._pages_id - 1] = self._stream.tell()
+        self._stream.write(b"%d 0 obj\n<< /Type /Pages /Count %d /Kids [" % (self._pages_id, len(self._kids)))
+        for start in range(0, len(self._kids), 1024):
+            self._stream.write(b" ".join(b"%d 0 R" % kid for kid in self._kids[start:start + 1024]) + b"\n")
+        self._stream.write(b"] >>\nendobj\n")
+        
+        catalog_id = self._allocate()
+        catalog = DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): IndirectObject(self._pages_id, 0, None),
+        })
+        if self._outline:
+            outlines_id = self._allocate()
+            top_ids = self._write_outline(self._outline, outlines_id)
+            self._write_object(outlines_id, DictionaryObject({
+                NameObject('/Type'): NameObject('/Outlines'),
+                NameObject('/First'): IndirectObject(top_ids[0], 0, None),
+                NameObject('/Last'): IndirectObject(top_ids[-1], 0, None),
+                NameObject('/Count'): NumberObject(len(top_ids)),
+            }))
+            catalog[NameObject('/Outlines')] = IndirectObject(outlines_id, 0, None)
+        self._write_object(catalog_id, catalog)
+        
+        trailer_info = b""
+        if self.info:
+            info_id = self._allocate()
+            self._write_object(info_id, DictionaryObject({
+                NameObject(f'/{key}'): TextStringObject(value) for key, value in self.info.items()
+            }))
+            trailer_info = b" /Info %d 0 R" % info_id
+        
+        xref_offset = self._stream.tell()
+        self._stream.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(self._offsets) + 1))
+        for offset in self._offsets:
+            # Objects reserved but never written (unreadable references) become free entries
+            self._stream.write(b"%010d 00000 n \n" % offset if offset >= 0
+                               else b"0000000000 65535 f \n")
+        self._stream.write(b"trailer\n<< /Size %d /Root %d 0 R%s >>\nstartxref\n%d\n%%%%EOF\n"
+                           % (len(self._offsets) + 1, catalog_id, trailer_info, xref_offset))
+        self._stream.close()
+
+    def abort(self) -> None:
+        """Close and delete a partially written output."""
+        if not self._stream.closed:
+            self._stream.close()
+        self.output_path.unlink(missing_ok=True)
 
-def merge_pdfs(pdf_files: List[Path], output_path: Path) -> bool:
+    def __enter__(self) -> "StreamingPdfMerger":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class PipelinedMerger:
+    """
+    Builds a combined PDF while the per-file PDFs are still being produced.
+    
+    Producers report each finished file with submit(index, path) in any
+    order; a consumer thread appends it as soon as it and every file before
+    it in the sequence are done. Failed files are submitted with path None
+    so the sequence can move past them. finish() waits for the tail of the
+    sequence and closes the output.
+    """
+    
+    def __init__(self, output_path: Path, total: int, dedupe: bool = False):
+        """
+        Args:
+            output_path: Path for the combined PDF
+            total: Number of files in the sequence
+            dedupe: Share resources identical across files (see StreamingPdfMerger)
+        """
+        self.output_path = Path(output_path)
+        self.total = total
+        self.merged_files: List[Path] = []
+        self.page_ranges: Dict[int, Tuple[int, int]] = {}  # index -> [start, end) in the output
+        self._aborted = False
+        self._queue: "queue.Queue" = queue.Queue()
+        self._merger = StreamingPdfMerger(self.output_path, dedupe=dedupe)
+        self._thread = threading.Thread(target=self._consume, name="pdf-merge", daemon=True)
+        self._thread.start()
+    
+    @property
+    def deduplicated_bytes(self) -> int:
+        """Stream data shared with earlier files instead of being written again."""
+        return self._merger.deduplicated_bytes
+    
+    def submit(self, index: int, pdf_path: Optional[Path], pages: Optional[range] = None) -> None:
+        """
+        Report that file number index (0-based) has finished.
+        
+        Args:
+            index: Position of the file in the combined output order
+            pdf_path: Per-file PDF, or None if the file failed
+            pages: Page indices of pdf_path to use (default: all pages)
+        """
+        self._queue.put((index, (pdf_path, pages)))
+    
+    def _consume(self) -> None:
+        ready: Dict[int, tuple] = {}
+        next_index = 0
+        while next_index < self.total:
+            index, item = self._queue.get()
+            if index is None:  # finish() called with files still missing
+                break
+            ready[index] = item
+            while next_index in ready:
+                pdf_path, pages = ready.pop(next_index)
+                next_index += 1
+                if pdf_path is None or self._aborted:
+                    continue
+                try:
+                    start = self._merger.page_count
+                    self._merger.append(pdf_path, pages)
+                    self.page_ranges[next_index - 1] = (start, self._merger.page_count)
+                    self.merged_files.append(pdf_path)
+                    logger.debug(f"Added {pdf_path.name} to merger")
+                except Exception as e:
+                    logger.warning(f"Failed to add {pdf_path.name}: {e}")
+    
+    def finish(self) -> bool:
+        """
+        Wait for the consumer to append the remaining files and close the output.
+        
+        Returns:
+            True if at least one file was merged, False otherwise (no output is left behind)
+        """
+        self._queue.put((None, None))
+        self._thread.join()
+        if not self.merged_files:
+            self._merger.abort()
+            return False
+        try:
+            self._merger.close()
+        except Exception as e:
+            logger.error(f"Failed to merge PDFs: {e}")
+            self._merger.abort()
+            return False
+        logger.info(f"Successfully merged {len(self.merged_files)} PDFs to {self.output_path}")
+        return True
+    
+    def abort(self) -> None:
+        """Stop merging and delete the partial output."""
+        self._aborted = True
+        self._queue.put((None, None))
+        self._thread.join()
+        self._merger.abort()
+
+
+def merge_pdfs(pdf_files: List[Path], output_path: Path, dedupe: bool = False) -> bool:
     """
     Merge multiple PDF files into single output file.
     
+    Pages are streamed to the output one source at a time, so memory use
+    stays flat however many files are merged.
+    
     Args:
         pdf_files: List of PDF file paths in desired order
         output_path: Path for output merged PDF
-        
+        dedupe: Share fonts, images and other resources identical across files
+    
     Returns:
         True if merge successful, False otherwise
     """
@@ -25,26 +414,21 @@ def merge_pdfs(pdf_files: List[Path], output_path: Path) -> bool:
     try:
         logger.info(f"Merging {len(pdf_files)} PDF files...")
         
-        merger = PdfMerger()
-        
-        for pdf_file in pdf_files:
-            if not pdf_file.exists():
-                logger.warning(f"PDF file not found: {pdf_file}")
-                continue
-            
-            try:
-                merger.append(str(pdf_file))
-                logger.debug(f"Added {pdf_file.name} to merger")
-            except Exception as e:
-                logger.warning(f"Failed to add {pdf_file.name}: {e}")
-        
-        # Write merged PDF
-        merger.write(str(output_path))
-        merger.close()
+        with StreamingPdfMerger(output_path, dedupe=dedupe) as merger:
+            for pdf_file in pdf_files:
+                if not pdf_file.exists():
+                    logger.warning(f"PDF file not found: {pdf_file}")
+                    continue
+                
+                try:
+                    merger.append(pdf_file)
+                    logger.debug(f"Added {pdf_file.name} to merger")
+                except Exception as e:
+                    logger.warning(f"Failed to add {pdf_file.name}: {e}")
         
         logger.info(f"Successfully merged PDFs to {output_path}")
         return True
-        
+    
     except Exception as e:
         logger.error(f"Failed to merge PDFs: {e}")
-        return False
\ No newline at end of file
+        return False
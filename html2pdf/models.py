@@ -37,4 +37,56 @@ class ConverterConfig:
         'javascript-delay': 1000,
         'load-error-handling': 'ignore',
         'load-media-error-handling': 'ignore'
-    })
\ No newline at end of file
+    })
+
+@dataclass
+class TableCell:
+    """Single cell of a parsed report table (text uses reportlab paragraph markup)."""
+    markup: str
+    plain_text: str
+    header: bool = False
+    colspan: int = 1
+    rowspan: int = 1
+    align: Optional[str] = None
+    uniform: bool = False  # plain text with only cell-wide bold/colour/size styling
+    bold: bool = False
+    color: Optional[str] = None
+    font_size: Optional[float] = None
+
+
+@dataclass
+class ReportBlock:
+    """Block-level element of a parsed tabular report."""
+    kind: str  # 'text', 'heading', 'rule' or 'table'
+    markup: str = ''
+    level: int = 0
+    align: Optional[str] = None
+    rows: List[List[TableCell]] = field(default_factory=list)
+
+
+@dataclass
+class RenderReport:
+    """Outcome of rendering one HTML file, including any degraded retry."""
+    file: str
+    status: str  # 'ok', 'degraded', 'timeout' or 'failed'
+    backend: str = 'wkhtmltopdf'
+    attempts: List[Dict[str, Any]] = field(default_factory=list)
+    duration_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class OptimizationStats:
+    """Byte counts and work done by the size-optimised output profile."""
+    original_bytes: int
+    optimized_bytes: int = 0
+    streams_compressed: int = 0
+    objects_deduplicated: int = 0
+    images_downsampled: int = 0
+    
+    @property
+    def reduction_percent(self) -> float:
+        """Percentage of bytes saved."""
+        if not self.original_bytes:
+            return 0.0
+        return (1 - self.optimized_bytes / self.original_bytes) * 100
@@ -0,0 +1,613 @@
+"""Native reportlab renderer for STRUDS tabular reports.
+
+STRUDS reports are structured table data, so they can be laid out directly with
+reportlab instead of going through wkhtmltopdf. The HTML is tokenised in chunks
+with a single compiled regex (much faster than html.parser on multi-megabyte
+reports) into a list of ReportBlock objects (headings, text, rules and tables) which are
+then turned into platypus flowables. Tables repeat their header rows on every
+page. Anything the parser does not understand raises UnsupportedHTMLError so the
+caller can fall back to wkhtmltopdf.
+"""
+from functools import lru_cache
+from html import unescape
+from pathlib import Path
+from typing import List, Optional, Tuple
+from xml.sax.saxutils import escape
+import logging
+import re
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
+from reportlab.lib.pagesizes import A3, A4, A5, LEGAL, LETTER, landscape, portrait
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.platypus import LongTable, Paragraph, SimpleDocTemplate, Spacer, TableStyle
+from reportlab.platypus.flowables import HRFlowable
+
+from .models import ReportBlock, TableCell
+from .normalizer import CHUNK_SIZE, detect_encoding, is_struds_report
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZES = {
+    'A3': A3,
+    'A4': A4,
+    'A5': A5,
+    'Letter': LETTER,
+    'Legal': LEGAL
+}
+
+MARGIN = 10 * mm
+BASE_FONT = 'Helvetica'
+BOLD_FONT = 'Helvetica-Bold'
+CELL_FONT_SIZE = 7.5
+CELL_PADDING = 2
+
+# Legacy <FONT SIZE=n> values in points, relative to the cell font size
+FONT_SIZE_POINTS = {1: 5.5, 2: 6.5, 3: 7.5, 4: 9, 5: 11, 6: 13, 7: 16}
+HEADING_SIZES = {1: 14, 2: 12, 3: 11, 4: 10, 5: 9, 6: 8}
+FONT_FACES = {'symbol': 'Symbol', 'courier': 'Courier', 'courier new': 'Courier',
+              'times': 'Times-Roman', 'times new roman': 'Times-Roman'}
+ALIGNMENTS = {'left': TA_LEFT, 'center': TA_CENTER, 'right': TA_RIGHT}
+
+# HTML -> reportlab inline markup
+INLINE_TAGS = {'b': 'b', 'strong': 'b', 'i': 'i', 'em': 'i', 'u': 'u',
+               'sub': 'sub', 'sup': 'super', 'font': 'font'}
+BLOCK_TAGS = {'p', 'div', 'center', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'hr', 'table', 'ul', 'ol', 'li'}
+UNSUPPORTED_TAGS = {'script', 'iframe', 'object', 'embed', 'form', 'input', 'select',
+                    'textarea', 'svg', 'canvas', 'video', 'audio', 'frameset', 'frame'}
+SKIPPED_TAGS = {'title', 'style', 'head'}
+
+_HEX_COLOR_RE = re.compile(r'^#?[0-9a-fA-F]{6}$')
+_WHITESPACE_RE = re.compile(r'[ \t\r\n\f]+')
+_TOKEN_RE = re.compile(
+    r'<!--.*?-->|<[!?][^>]*>|<(/?)([A-Za-z][\w:-]*)([^>]*)>|([^<]+)|<', re.DOTALL)
+_ATTR_RE = re.compile(r'([A-Za-z_:][-\w:.]*)\s*(?:=\s*("[^"]*"|\'[^\']*\'|[^\s>]+))?')
+
+
+class UnsupportedHTMLError(Exception):
+    """Raised when a document cannot be rendered by the native backend."""
+
+
+def _parse_attrs(text: str) -> dict:
+    """Parse an attribute string into a dict with lowercase names."""
+    attrs = {}
+    for name, value in _ATTR_RE.findall(text.rstrip('/')):
+        if value[:1] in ('"', "'"):
+            value = value[1:-1]
+        attrs[name.lower()] = unescape(value)
+    return attrs
+
+
+@lru_cache(maxsize=65536)
+def _text_width(text: str, font: str, size: float) -> float:
+    # Report tables repeat the same short values ("0.000", "= 2 - #12") many times
+    return stringWidth(text, font, size)
+
+
+def _font_markup(attrs: dict) -> Tuple[str, Optional[str], Optional[float], bool]:
+    """
+    Build a reportlab ``<font>`` tag from HTML FONT attributes.
+
+    Returns:
+        Tuple of (opening tag, colour, size in points, whether the tag can be
+        expressed as a table cell style, i.e. has no font face)
+    """
+    parts = []
+    color = None
+    points = None
+    simple = True
+    for name, value in attrs.items():
+        if not value:
+            continue
+        value = value.strip()
+        if name == 'color':
+            if _HEX_COLOR_RE.match(value):
+                value = '#' + value.lstrip('#')
+            elif colors.getAllNamedColors().get(value.lower()) is None:
+                continue
+            color = value if value.startswith('#') else value.lower()
+            parts.append(f'color="{color}"')
+        elif name == 'face':
+            face = FONT_FACES.get(value.split(',')[0].strip().lower())
+            if face:
+                simple = False
+                parts.append(f'face="{face}"')
+        elif name == 'size':
+            try:
+                size = int(value)
+            except ValueError:
+                continue
+            if value[0] in '+-':
+                size = 3 + size
+            points = FONT_SIZE_POINTS[max(1, min(7, size))]
+            parts.append(f'size="{points}"')
+    opening = '<font ' + ' '.join(parts) + '>' if parts else '<font>'
+    return opening, color, points, simple
+
+
+class _MarkupBuffer:
+    """Accumulates reportlab paragraph markup with a balanced inline tag stack.
+
+    It also tracks whether the content is "uniform": plain text (and line
+    breaks) wrapped only in leading bold/colour/size tags. Uniform table cells are
+    drawn as plain strings with a cell style instead of a Paragraph.
+    """
+
+    def __init__(self, inherited=None):
+        self.parts: List[str] = []
+        self.plain: List[str] = []
+        self.stack: List[Tuple[str, str]] = list(inherited or [])
+        for _, opening in self.stack:
+            self.parts.append(opening)
+        self.uniform = not self.stack
+        self.bold = False
+        self.color: Optional[str] = None
+        self.font_size: Optional[float] = None
+        self._text_seen = False
+        self._closed = False
+
+    def open(self, tag: str, opening: str, color: Optional[str] = None,
+             font_size: Optional[float] = None, simple: bool = True) -> None:
+        if self._text_seen or not simple or tag not in ('b', 'font'):
+            self.uniform = False
+        elif tag == 'b':
+            self.bold = True
+        else:
+            self.color = color or self.color
+            self.font_size = font_size or self.font_size
+        self.stack.append((tag, opening))
+        self.parts.append(opening)
+
+    def close(self, tag: str) -> None:
+        names = [name for name, _ in self.stack]
+        if tag not in names:
+            return
+        index = len(names) - 1 - names[::-1].index(tag)
+        self._closed = True
+        reopen = self.stack[index + 1:]
+        for name, _ in reversed(self.stack[index:]):
+            self.parts.append(f'</{name}>')
+        del self.stack[index:]
+        for name, opening in reopen:
+            self.open(name, opening)
+
+    def text(self, data: str) -> None:
+        if data.strip():
+            if self._closed:
+                self.uniform = False
+            self._text_seen = True
+        self.parts.append(escape(data))
+        self.plain.append(data)
+
+    def line_break(self) -> None:
+        self.parts.append('<br/>')
+        self.plain.append('\n')
+
+    def has_content(self) -> bool:
+        return any(p.strip() for p in self.plain)
+
+    def finish(self) -> Tuple[str, str]:
+        """Return (markup, plain text) with all open tags closed."""
+        closing = ''.join(f'</{name}>' for name, _ in reversed(self.stack))
+        markup = (''.join(self.parts) + closing).strip()
+        plain = ''.join(self.plain).strip()
+        return markup, plain
+
+
+class _ReportParser:
+    """Parse STRUDS HTML into a flat list of ReportBlock objects."""
+
+    def __init__(self):
+        self._pending = ''
+        self.blocks: List[ReportBlock] = []
+        self._inline_stack: List[Tuple[str, str]] = []
+        self._buffer = _MarkupBuffer()
+        self._heading: Optional[int] = None
+        self._align: Optional[str] = None
+        self._skip_depth = 0
+
+        self._table: Optional[ReportBlock] = None
+        self._row: Optional[List[TableCell]] = None
+        self._cell: Optional[Tuple[str, dict]] = None
+
+    # ----- text blocks ----------------------------------------------------
+
+    def _flush_text(self) -> None:
+        if self._cell is not None:
+            return
+        self._inline_stack = list(self._buffer.stack)
+        if self._buffer.has_content():
+            markup, _ = self._buffer.finish()
+            if self._heading:
+                self.blocks.append(ReportBlock('heading', markup, level=self._heading, align=self._align))
+            else:
+                self.blocks.append(ReportBlock('text', markup, align=self._align))
+        self._buffer = _MarkupBuffer(self._inline_stack)
+
+    # ----- tables ---------------------------------------------------------
+
+    def _start_table(self) -> None:
+        if self._cell is not None:
+            raise UnsupportedHTMLError("Nested tables are not supported")
+        self._end_table()
+        self._flush_text()
+        self._table = ReportBlock('table')
+
+    def _end_table(self) -> None:
+        if self._table is None:
+            return
+        self._end_row()
+        if self._table.rows:
+            self.blocks.append(self._table)
+        self._table = None
+        self._buffer = _MarkupBuffer(self._inline_stack)
+
+    def _start_row(self) -> None:
+        if self._table is None:
+            self._start_table()
+        self._end_row()
+        self._row = []
+
+    def _end_row(self) -> None:
+        self._end_cell()
+        if self._row:
+            self._table.rows.append(self._row)
+        self._row = None
+
+    def _start_cell(self, tag: str, attrs: dict) -> None:
+        if self._row is None:
+            self._start_row()
+        self._end_cell()
+        self._cell = (tag, attrs)
+        self._buffer = _MarkupBuffer()
+
+    def _end_cell(self) -> None:
+        if self._cell is None:
+            return
+        tag, attrs = self._cell
+        markup, plain = self._buffer.finish()
+        self._row.append(TableCell(
+            markup=markup,
+            plain_text=plain,
+            header=tag == 'th',
+            colspan=_span(attrs.get('colspan')),
+            rowspan=_span(attrs.get('rowspan')),
+            align=(attrs.get('align') or '').lower() or None,
+            uniform=self._buffer.uniform,
+            bold=self._buffer.bold,
+            color=self._buffer.color,
+            font_size=self._buffer.font_size
+        ))
+        self._cell = None
+        self._buffer = _MarkupBuffer()
+
+    # ----- tokenizer -------------------------------------------------------
+
+    def feed(self, chunk: str) -> None:
+        """Tokenise a chunk, keeping any trailing partial tag for the next call."""
+        data = self._pending + chunk
+        cut = data.rfind('<')
+        if cut == -1 or data.find('>', cut) != -1:
+            cut = len(data)
+        self._pending = data[cut:]
+        self._tokenize(data[:cut])
+
+    def _tokenize(self, data: str) -> None:
+        for match in _TOKEN_RE.finditer(data):
+            closing, tag, attrs, text = match.groups()
+            if tag:
+                tag = tag.lower()
+                if closing:
+                    self.handle_endtag(tag)
+                else:
+                    self.handle_starttag(tag, _parse_attrs(attrs) if attrs.strip() else {})
+            elif text:
+                self.handle_data(unescape(text))
+            elif match.group(0) == '<':
+                self.handle_data('<')
+
+    # ----- token handlers ---------------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        if tag in UNSUPPORTED_TAGS:
+            raise UnsupportedHTMLError(f"Unsupported element <{tag}>")
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+            return
+
+        if tag == 'table':
+            self._start_table()
+        elif tag == 'tr':
+            self._start_row()
+        elif tag in ('td', 'th'):
+            self._start_cell(tag, attrs)
+        elif tag == 'font':
+            opening, color, points, simple = _font_markup(attrs)
+            self._buffer.open('font', opening, color, points, simple)
+        elif tag in INLINE_TAGS:
+            self._buffer.open(INLINE_TAGS[tag], f'<{INLINE_TAGS[tag]}>')
+        elif tag == 'br':
+            self._buffer.line_break()
+        elif tag in BLOCK_TAGS and self._cell is None:
+            if self._table is not None:
+                # Block content between rows is rendered after the table
+                self._end_table()
+            self._flush_text()
+            if tag == 'hr':
+                self.blocks.append(ReportBlock('rule'))
+            elif tag[0] == 'h' and tag[1:].isdigit():
+                self._heading = int(tag[1:])
+            elif tag == 'center':
+                self._align = 'center'
+            elif tag == 'p':
+                align = attrs.get('align')
+                if align:
+                    self._align = align.lower()
+
+    def handle_endtag(self, tag):
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+
+        if tag == 'table':
+            self._end_table()
+        elif tag == 'tr':
+            self._end_row()
+        elif tag in ('td', 'th'):
+            self._end_cell()
+        elif tag in INLINE_TAGS:
+            self._buffer.close(INLINE_TAGS[tag])
+        elif tag in BLOCK_TAGS and self._cell is None:
+            self._flush_text()
+            if tag[0] == 'h' and tag[1:].isdigit():
+                self._heading = None
+            elif tag in ('center', 'p'):
+                self._align = None
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        if self._table is not None and self._cell is None:
+            if data.strip():
+                # Stray text inside a table is foster-parented before it
+                self.blocks.append(ReportBlock('text', escape(data.strip())))
+            return
+        text = _WHITESPACE_RE.sub(' ', data)
+        if text:
+            self._buffer.text(text)
+
+    def finish(self) -> List[ReportBlock]:
+        self._tokenize(self._pending)
+        self._pending = ''
+        self._end_table()
+        self._flush_text()
+        return self.blocks
+
+
+def _span(value: Optional[str]) -> int:
+    try:
+        return max(1, int(value))
+    except (TypeError, ValueError):
+        return 1
+
+
+def parse_report(html_path: Path) -> List[ReportBlock]:
+    """
+    Parse a STRUDS report into block and table models.
+
+    Args:
+        html_path: Path to HTML report
+
+    Returns:
+        List of ReportBlock objects in document order
+
+    Raises:
+        UnsupportedHTMLError: If the document is not a recognised STRUDS report
+    """
+    if not is_struds_report(html_path):
+        raise UnsupportedHTMLError("Not a STRUDS report")
+
+    parser = _ReportParser()
+    with open(html_path, 'r', encoding=detect_encoding(html_path), errors='replace') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+    blocks = parser.finish()
+
+    if not any(block.kind == 'table' for block in blocks):
+        raise UnsupportedHTMLError("No tables found")
+    return blocks
+
+
+class NativeReportRenderer:
+    """Lays out parsed STRUDS reports directly with reportlab."""
+
+    def __init__(self, page_size: str = 'A4', orientation: str = 'Portrait'):
+        """
+        Initialize renderer page geometry and paragraph styles.
+
+        Args:
+            page_size: PDF page size (A4, A3, Letter, etc.)
+            orientation: Page orientation (Portrait or Landscape)
+        """
+        size = PAGE_SIZES.get(page_size, A4)
+        self.page_size = landscape(size) if orientation.lower() == 'landscape' else portrait(size)
+        self.frame_width = self.page_size[0] - 2 * MARGIN
+
+        self.text_style = ParagraphStyle('report_text', fontName=BASE_FONT, fontSize=8, leading=10,
+                                         textColor=colors.HexColor('#2c3e50'), spaceBefore=1, spaceAfter=1)
+        self.cell_style = ParagraphStyle('report_cell', fontName=BASE_FONT, fontSize=CELL_FONT_SIZE,
+                                         leading=CELL_FONT_SIZE + 1.5, textColor=colors.HexColor('#2c3e50'))
+        self.header_style = ParagraphStyle('report_header', parent=self.cell_style, fontName=BOLD_FONT)
+        self.heading_styles = {
+            level: ParagraphStyle(f'report_h{level}', parent=self.text_style, fontName=BOLD_FONT,
+                                  fontSize=size, leading=size * 1.25, spaceBefore=6, spaceAfter=3)
+            for level, size in HEADING_SIZES.items()
+        }
+
+    def render(self, html_path: Path, pdf_path: Path) -> int:
+        """
+        Render a STRUDS report to PDF.
+
+        Args:
+            html_path: Path to HTML report
+            pdf_path: Path for the output PDF
+
+        Returns:
+            Number of table cells rendered
+
+        Raises:
+            UnsupportedHTMLError: If the document is not a recognised STRUDS report
+        """
+        blocks = parse_report(html_path)
+
+        story = []
+        cells = 0
+        for block in blocks:
+            if block.kind == 'table':
+                story.append(self._build_table(block))
+                story.append(Spacer(1, 3))
+                cells += sum(len(row) for row in block.rows)
+            elif block.kind == 'rule':
+                story.append(HRFlowable(width='100%', thickness=0.5, color=colors.HexColor('#bdc3c7'),
+                                        spaceBefore=2, spaceAfter=2))
+            else:
+                style = self.heading_styles[block.level] if block.kind == 'heading' else self.text_style
+                if block.align in ALIGNMENTS:
+                    style = ParagraphStyle(f'{style.name}_{block.align}', parent=style,
+                                           alignment=ALIGNMENTS[block.align])
+                story.append(self._paragraph(block.markup, style))
+
+        doc = SimpleDocTemplate(str(pdf_path), pagesize=self.page_size,
+                                leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN,
+                                title=html_path.stem, author='STRUDS Native Report Renderer')
+        doc.build(story)
+        return cells
+
+    def _paragraph(self, markup: str, style: ParagraphStyle) -> Paragraph:
+        try:
+            return Paragraph(markup, style)
+        except ValueError:
+            # Fall back to plain text if the inline markup is rejected
+            plain = re.sub(r'<[^>]+>', '', markup)
+            return Paragraph(plain, style)
+
+    def _build_table(self, block: ReportBlock) -> LongTable:
+        """Place cells on a grid honouring row/col spans and build a LongTable."""
+        grid: List[List[Optional[TableCell]]] = []
+        spans = []
+        occupied = set()
+
+        for r, row in enumerate(block.rows):
+            grid_row: List[Optional[TableCell]] = []
+            c = 0
+            for cell in row:
+                while (r, c) in occupied:
+                    c += 1
+                for dr in range(cell.rowspan):
+                    for dc in range(cell.colspan):
+                        occupied.add((r + dr, c + dc))
+                if cell.rowspan > 1 or cell.colspan > 1:
+                    spans.append((c, r, cell.colspan, cell.rowspan))
+                while len(grid_row) <= c:
+                    grid_row.append(None)
+                grid_row[c] = cell
+                c += cell.colspan
+            grid.append(grid_row)
+
+        n_rows = len(grid)
+        n_cols = max([len(row) for row in grid] + [c + 1 for (r, c) in occupied if r < n_rows])
+        col_widths = self._column_widths(grid, n_cols)
+
+        commands = [
+            ('FONTNAME', (0, 0), (-1, -1), BASE_FONT),
+            ('FONTSIZE', (0, 0), (-1, -1), CELL_FONT_SIZE),
+            ('LEADING', (0, 0), (-1, -1), CELL_FONT_SIZE + 1.5),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.HexColor('#2c3e50')),
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('GRID', (0, 0), (-1, -1), 0.25, colors.HexColor('#bdc3c7')),
+            ('LEFTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+            ('RIGHTPADDING', (0, 0), (-1, -1), CELL_PADDING),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ]
+        for c, r, colspan, rowspan in spans:
+            end_r = min(n_rows - 1, r + rowspan - 1)
+            commands.append(('SPAN', (c, r), (min(n_cols - 1, c + colspan - 1), end_r)))
+
+        data = []
+        for r, grid_row in enumerate(grid):
+            row_data = []
+            for c in range(n_cols):
+                cell = grid_row[c] if c < len(grid_row) else None
+                if cell is None:
+                    row_data.append('')
+                    continue
+                width = sum(col_widths[c:c + cell.colspan]) - 2 * CELL_PADDING
+                row_data.append(self._cell_content(cell, width))
+                if cell.header:
+                    commands.append(('BACKGROUND', (c, r), (c, r), colors.HexColor('#ecf0f1')))
+                if cell.header or cell.bold:
+                    commands.append(('FONTNAME', (c, r), (c, r), BOLD_FONT))
+                if cell.color:
+                    commands.append(('TEXTCOLOR', (c, r), (c, r), colors.toColor(cell.color, colors.black)))
+                if cell.font_size:
+                    commands.append(('FONTSIZE', (c, r), (c, r), cell.font_size))
+                    commands.append(('LEADING', (c, r), (c, r), cell.font_size + 1.5))
+                if cell.align in ('center', 'right'):
+                    commands.append(('ALIGN', (c, r), (c, r), cell.align.upper()))
+            data.append(row_data)
+
+        # Leading rows made only of <th> cells repeat on every page
+        repeat_rows = 0
+        for row in block.rows:
+            if row and all(cell.header for cell in row) and len(row) > 1:
+                repeat_rows += 1
+            else:
+                break
+        repeat_rows = min(repeat_rows, max(0, n_rows - 1))
+
+        table = LongTable(data, colWidths=col_widths, repeatRows=repeat_rows, hAlign='LEFT')
+        table.setStyle(TableStyle(commands))
+        return table
+
+    def _column_widths(self, grid, n_cols: int) -> List[float]:
+        """Distribute the frame width proportionally to each column's natural width."""
+        natural = [0.0] * n_cols
+        for grid_row in grid:
+            for c, cell in enumerate(grid_row):
+                if cell is None or cell.colspan > 1:
+                    continue
+                longest = max((len(line) for line in cell.plain_text.split('\n')), default=0)
+                natural[c] = max(natural[c], min(longest, 60))
+        natural = [max(n, 3) for n in natural]
+        total = sum(natural)
+        return [self.frame_width * n / total for n in natural]
+
+    def _cell_content(self, cell: TableCell, width: float):
+        """Use a plain string when the text fits, otherwise a wrapping Paragraph."""
+        if cell.uniform:
+            font = BOLD_FONT if cell.header or cell.bold else BASE_FONT
+            size = cell.font_size or CELL_FONT_SIZE
+            lines = [line.strip() for line in cell.plain_text.split('\n')]
+            if all(_text_width(line, font, size) <= width for line in lines):
+                return '\n'.join(lines)
+        style = self.header_style if cell.header else self.cell_style
+        return self._paragraph(cell.markup, style)
+
+
+def render_report(html_path: Path, pdf_path: Path, page_size: str = 'A4', orientation: str = 'Portrait') -> int:
+    """
+    Render a STRUDS report with the native reportlab backend.
+
+    Returns:
+        Number of table cells rendered
+
+    Raises:
+        UnsupportedHTMLError: If the document is not a recognised STRUDS report
+    """
+    return NativeReportRenderer(page_size, orientation).render(html_path, pdf_path)
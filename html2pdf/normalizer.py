@@ -0,0 +1,542 @@
+"""Streaming normaliser for STRUDS HTML reports.
+
+STRUDS exports wrap almost every table cell as
+``<TD><B><FONT FACE = VERDANA COLOR = ... SIZE = 2>...</FONT></B></TD>`` and use
+uppercase tags throughout. This module rewrites such reports into compact HTML
+where the per-cell wrappers are folded into class attributes on the cell and
+the FONT presentation attributes become a small generated stylesheet.
+"""
+from dataclasses import dataclass
+from html import escape
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import List, Optional, Tuple, Dict, Any
+import codecs
+import logging
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+
+# Legacy <FONT SIZE=n> values mapped to CSS keywords
+FONT_SIZES = {
+    1: 'x-small',
+    2: 'small',
+    3: 'medium',
+    4: 'large',
+    5: 'x-large',
+    6: 'xx-large',
+    7: 'xxx-large'
+}
+
+# Inline wrappers that can be folded into the enclosing cell
+WRAPPER_TAGS = {'b', 'u', 'i', 'font'}
+WRAPPER_STYLES = {
+    'b': 'font-weight: bold !important;',
+    'u': 'text-decoration: underline !important;',
+    'i': 'font-style: italic !important;'
+}
+
+# Elements allowed inside a cell that is still eligible for folding
+CELL_INLINE_TAGS = WRAPPER_TAGS | {'br', 'sub', 'sup'}
+CELL_TAGS = {'td', 'th'}
+# Tags that implicitly close an open cell
+CELL_CLOSERS = {'td', 'th', 'tr', 'table', 'tbody', 'thead', 'tfoot'}
+HEAD_TAGS = {'title', 'meta', 'link', 'style', 'base'}
+DOCUMENT_TAGS = {'html', 'head', 'body'}
+
+_HEAD_CLOSE_RE = re.compile(r'</head\s*>', re.IGNORECASE)
+_HEAD_OPEN_RE = re.compile(r'<head(\s[^>]*)?>', re.IGNORECASE)
+_HTML_OPEN_RE = re.compile(r'<html(\s[^>]*)?>', re.IGNORECASE)
+_LEGACY_MARKUP_RE = re.compile(rb'<FONT\s+FACE', re.IGNORECASE)
+_WHITESPACE_RE = re.compile(r'\s+')
+_HEX_COLOR_RE = re.compile(r'^[0-9a-fA-F]{3}([0-9a-fA-F]{3})?$')
+
+
+@dataclass
+class NormalizationStats:
+    """Size statistics for one normalised report."""
+    source: Path
+    output: Path
+    encoding: str
+    bytes_before: int
+    bytes_after: int
+    elements_before: int
+    elements_after: int
+    font_classes: int
+    folded_cells: int
+    duration_seconds: float
+
+    @property
+    def reduction_percent(self) -> float:
+        """Percentage of bytes removed by normalisation."""
+        if not self.bytes_before:
+            return 0.0
+        return (1 - self.bytes_after / self.bytes_before) * 100
+
+
+def inject_stylesheet(content: str, css: str) -> str:
+    """
+    Insert a stylesheet into an HTML document regardless of tag case.
+
+    Args:
+        content: HTML document text
+        css: Complete ``<style>`` block to insert
+
+    Returns:
+        HTML text with the stylesheet placed inside the head section
+    """
+    match = _HEAD_CLOSE_RE.search(content)
+    if match:
+        return content[:match.start()] + css + content[match.start():]
+
+    match = _HEAD_OPEN_RE.search(content)
+    if match:
+        return content[:match.end()] + css + content[match.end():]
+
+    match = _HTML_OPEN_RE.search(content)
+    if match:
+        return content[:match.end()] + f'<head>{css}</head>' + content[match.end():]
+
+    return f'<html><head>{css}</head><body>{content}</body></html>'
+
+
+def is_struds_report(html_path: Path, sniff_bytes: int = 8192) -> bool:
+    """
+    Check whether an HTML file uses STRUDS legacy FONT-tag markup.
+
+    Args:
+        html_path: Path to HTML file
+        sniff_bytes: Number of leading bytes to inspect
+
+    Returns:
+        True if the file looks like a STRUDS report
+    """
+    try:
+        with open(html_path, 'rb') as f:
+            head = f.read(sniff_bytes)
+    except OSError:
+        return False
+    return bool(_LEGACY_MARKUP_RE.search(head))
+
+
+def detect_encoding(html_path: Path) -> str:
+    """
+    Detect whether a file is valid UTF-8, falling back to cp1252.
+
+    STRUDS writes Windows-1252 text (e.g. ``kN/m²``), which the strict UTF-8
+    read in ``enhance_html_for_pdf`` cannot decode.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    try:
+        with open(html_path, 'rb') as f:
+            while True:
+                chunk = f.read(CHUNK_SIZE)
+                if not chunk:
+                    decoder.decode(b'', final=True)
+                    break
+                decoder.decode(chunk)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'cp1252'
+
+
+def _font_declarations(attrs: List[Tuple[str, Optional[str]]]) -> Tuple[str, ...]:
+    """Convert FONT attributes into CSS declarations."""
+    declarations = []
+    for name, value in attrs:
+        if value is None:
+            continue
+        value = value.strip()
+        if name == 'face' and value:
+            families = [f.strip() for f in value.split(',') if f.strip()]
+            declarations.append('font-family: ' + ', '.join(
+                f"'{f}'" if ' ' in f else f for f in families) + ', sans-serif !important;')
+        elif name == 'color' and value:
+            color = f'#{value}' if _HEX_COLOR_RE.match(value) else value.lower()
+            declarations.append(f'color: {color} !important;')
+        elif name == 'size' and value:
+            try:
+                size = int(value)
+            except ValueError:
+                continue
+            if value[0] in '+-':
+                size = 3 + size
+            size = max(1, min(7, size))
+            declarations.append(f'font-size: {FONT_SIZES[size]} !important;')
+    return tuple(declarations)
+
+
+class _StrudsNormalizer(HTMLParser):
+    """HTMLParser that rewrites STRUDS markup into compact, class-based HTML."""
+
+    def __init__(self, body_out):
+        super().__init__(convert_charrefs=False)
+        self.body_out = body_out
+        self.head_parts: List[str] = []
+        self.font_classes: Dict[Tuple[str, ...], str] = {}
+        self.elements_before = 0
+        self.elements_after = 0
+        self.folded_cells = 0
+        self.used_wrappers = set()
+
+        self._explicit_head = False
+        self._head_element: Optional[str] = None
+        self._raw_text_tag: Optional[str] = None
+        self._cell: Optional[Tuple[str, List[Tuple[str, Optional[str]]]]] = None
+        self._cell_events: List[Tuple[str, Any]] = []
+        self._pending_cell_end: Optional[str] = None
+        self._span_depth = 0
+
+    # ----- output helpers -------------------------------------------------
+
+    @property
+    def _in_head(self) -> bool:
+        return self._explicit_head or self._head_element is not None
+
+    def _write(self, text: str) -> None:
+        if self._in_head:
+            self.head_parts.append(text)
+        else:
+            self.body_out.write(text)
+
+    def _start_tag(self, tag: str, attrs: List[Tuple[str, Optional[str]]], extra_classes=()) -> str:
+        self.elements_after += 1
+        parts = [tag]
+        classes = list(extra_classes)
+        for name, value in attrs:
+            if name == 'class' and value:
+                classes = value.split() + classes
+                continue
+            if value is None:
+                parts.append(name)
+            else:
+                parts.append(f'{name}="{escape(value, quote=True)}"')
+        if classes:
+            parts.append(f'class="{" ".join(classes)}"')
+        return '<' + ' '.join(parts) + '>'
+
+    def _font_class(self, attrs: List[Tuple[str, Optional[str]]]) -> Optional[str]:
+        declarations = _font_declarations(attrs)
+        if not declarations:
+            return None
+        if declarations not in self.font_classes:
+            self.font_classes[declarations] = f'f{len(self.font_classes) + 1}'
+        return self.font_classes[declarations]
+
+    def _emit_start(self, tag: str, attrs, raw: str) -> None:
+        if tag == 'font':
+            font_class = self._font_class(attrs)
+            self._span_depth += 1
+            self._write(self._start_tag('span', [], [font_class] if font_class else []))
+        elif tag in WRAPPER_TAGS or tag in CELL_INLINE_TAGS or raw is None:
+            self._write(self._start_tag(tag, attrs))
+        elif tag.isalnum() and tag.isascii():
+            self._write(self._start_tag(tag, attrs))
+        else:
+            # Unknown pseudo-tags (e.g. "<PERMISSIBLE") are kept verbatim
+            self.elements_after += 1
+            self._write(raw)
+
+    def _emit_end(self, tag: str) -> None:
+        if tag == 'font':
+            if self._span_depth:
+                self._span_depth -= 1
+                self._write('</span>')
+        else:
+            self._write(f'</{tag}>')
+
+    def _emit_text(self, data: str) -> None:
+        if self._raw_text_tag:
+            self._write(data)
+        else:
+            self._write(_WHITESPACE_RE.sub(' ', data))
+
+    # ----- cell folding ---------------------------------------------------
+
+    def _open_cell(self, tag: str, attrs) -> None:
+        self._cell = (tag, attrs)
+        self._cell_events = []
+
+    def _abort_cell(self) -> None:
+        """Emit a buffered cell unchanged because it cannot be folded."""
+        tag, attrs = self._cell
+        events = self._cell_events
+        self._cell = None
+        self._cell_events = []
+        self._write(self._start_tag(tag, attrs))
+        if events and events[0][0] == 'text':
+            events[0] = ('text', events[0][1].lstrip())
+        self._replay(events)
+
+    def _end_cell(self, tag: str) -> None:
+        # The cell end tag is only written if the next token needs it
+        self._pending_cell_end = tag
+
+    def _flush_pending_end(self, tag: Optional[str] = None, is_start: bool = False) -> None:
+        """Write a deferred ``</td>`` unless the next token makes it optional."""
+        if self._pending_cell_end is None:
+            return
+        implied = (is_start and tag in ('td', 'th', 'tr')) or \
+                  (not is_start and tag in ('tr', 'table', 'tbody', 'thead', 'tfoot'))
+        if not implied:
+            self._write(f'</{self._pending_cell_end}>')
+        self._pending_cell_end = None
+
+    @staticmethod
+    def _trim(events):
+        """Strip whitespace at the edges of a cell, which is never rendered."""
+        events = list(events)
+        if events and events[0][0] == 'text':
+            events[0] = ('text', events[0][1].lstrip())
+        if events and events[-1][0] == 'text':
+            events[-1] = ('text', events[-1][1].rstrip())
+        return [e for e in events if not (e[0] == 'text' and not e[1])]
+
+    def _replay(self, events) -> None:
+        for kind, payload in events:
+            if kind == 'start':
+                self._emit_start(*payload)
+            elif kind == 'end':
+                self._emit_end(payload)
+            elif kind == 'text':
+                self._emit_text(payload)
+            else:
+                self._write(payload)
+
+    def _close_cell(self) -> None:
+        """Fold leading inline wrappers of the buffered cell into cell classes."""
+        tag, attrs = self._cell
+        events = self._cell_events
+        self._cell = None
+        self._cell_events = []
+
+        # Leading wrapper start tags before any visible text
+        wrappers = []
+        index = 0
+        while index < len(events):
+            kind, payload = events[index]
+            if kind == 'start' and payload[0] in WRAPPER_TAGS:
+                wrappers.append(payload)
+            elif not (kind == 'text' and not payload.strip()):
+                break
+            index += 1
+
+        # Trailing close tags of those wrappers (STRUDS does not always nest them)
+        end = len(events)
+        open_wrappers = [w[0] for w in wrappers]
+        while end > index and open_wrappers:
+            kind, payload = events[end - 1]
+            if kind == 'end' and payload in open_wrappers:
+                open_wrappers.remove(payload)
+            elif not (kind == 'text' and not payload.strip()):
+                break
+            end -= 1
+
+        middle = events[index:end]
+        wrapper_names = {w[0] for w in wrappers}
+        closes_early = any(kind == 'end' and payload in wrapper_names for kind, payload in middle)
+
+        if not wrappers or closes_early:
+            self._write(self._start_tag(tag, attrs))
+            self._replay(self._trim(events))
+            self._end_cell(tag)
+            return
+
+        classes = []
+        for wrapper_tag, wrapper_attrs, _ in wrappers:
+            if wrapper_tag == 'font':
+                font_class = self._font_class(wrapper_attrs)
+                if font_class and font_class not in classes:
+                    classes.append(font_class)
+            elif wrapper_tag not in classes:
+                self.used_wrappers.add(wrapper_tag)
+                classes.append(wrapper_tag)
+
+        self.folded_cells += 1
+        self._write(self._start_tag(tag, attrs, classes))
+        self._replay(self._trim(middle))
+        self._end_cell(tag)
+
+    # ----- HTMLParser callbacks -------------------------------------------
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_pending_end(tag, is_start=True)
+        self.elements_before += 1
+        raw = self.get_starttag_text()
+
+        if self._cell is not None:
+            if tag in CELL_INLINE_TAGS:
+                self._cell_events.append(('start', (tag, attrs, raw)))
+                return
+            if tag in CELL_CLOSERS:
+                self._close_cell()
+            else:
+                self._abort_cell()
+
+        if tag in DOCUMENT_TAGS:
+            self._explicit_head = tag == 'head'
+            return
+        if tag in HEAD_TAGS:
+            self._head_element = tag
+        if tag in ('style', 'script'):
+            self._raw_text_tag = tag
+
+        if tag in CELL_TAGS:
+            self._open_cell(tag, attrs)
+            return
+
+        self._emit_start(tag, attrs, raw)
+        if tag in ('meta', 'link', 'base'):
+            # Void head elements have no end tag
+            self._head_element = None
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        self._flush_pending_end(tag)
+        if self._cell is not None:
+            if tag in CELL_TAGS or tag in CELL_CLOSERS:
+                self._close_cell()
+                if tag in CELL_TAGS:
+                    return
+            elif tag in CELL_INLINE_TAGS:
+                self._cell_events.append(('end', tag))
+                return
+            else:
+                self._abort_cell()
+
+        if tag in DOCUMENT_TAGS:
+            self._explicit_head = False
+            return
+        if tag == self._raw_text_tag:
+            self._raw_text_tag = None
+
+        self._emit_end(tag)
+        if tag == self._head_element:
+            self._head_element = None
+
+    def handle_data(self, data):
+        if self._pending_cell_end is not None and not data.strip():
+            # Whitespace between table cells is not rendered
+            return
+        self._flush_pending_end()
+        if self._cell is not None:
+            self._cell_events.append(('text', data))
+        else:
+            self._emit_text(data)
+
+    def handle_entityref(self, name):
+        self._handle_raw(f'&{name};')
+
+    def handle_charref(self, name):
+        self._handle_raw(f'&#{name};')
+
+    def handle_comment(self, data):
+        # Comments carry no rendering information
+        pass
+
+    def handle_decl(self, decl):
+        pass
+
+    def handle_pi(self, data):
+        pass
+
+    def unknown_decl(self, data):
+        pass
+
+    def _handle_raw(self, text: str) -> None:
+        self._flush_pending_end()
+        if self._cell is not None:
+            self._cell_events.append(('raw', text))
+        else:
+            self._write(text)
+
+    def finish(self) -> None:
+        """Flush any cell left open at end of input."""
+        self.close()
+        if self._cell is not None:
+            self._close_cell()
+        self._flush_pending_end()
+        while self._span_depth:
+            self._emit_end('font')
+
+    def stylesheet(self) -> str:
+        """Build the class-based stylesheet replacing the FONT attributes."""
+        rules = []
+        for wrapper_tag in sorted(self.used_wrappers):
+            rules.append(f'.{wrapper_tag} {{ {WRAPPER_STYLES[wrapper_tag]} }}')
+        for declarations, class_name in self.font_classes.items():
+            rules.append(f'.{class_name} {{ {" ".join(declarations)} }}')
+        if not rules:
+            return ''
+        return '<style type="text/css">\n' + '\n'.join(rules) + '\n</style>'
+
+
+def normalize_html(html_path: Path, output_path: Path, extra_css: str = '') -> NormalizationStats:
+    """
+    Rewrite a STRUDS HTML report into compact, class-based HTML.
+
+    The source is read and parsed in chunks; only the current table cell is
+    buffered, so memory use is independent of report size.
+
+    Args:
+        html_path: Path to original HTML report
+        output_path: Path for the normalised UTF-8 HTML file
+        extra_css: Additional ``<style>`` block to place in the head
+
+    Returns:
+        NormalizationStats describing the rewrite
+    """
+    start = time.perf_counter()
+    encoding = detect_encoding(html_path)
+    body_path = output_path.with_name(output_path.name + '.body')
+
+    try:
+        with open(html_path, 'r', encoding=encoding, errors='replace') as src, \
+                open(body_path, 'w', encoding='utf-8') as body_out:
+            parser = _StrudsNormalizer(body_out)
+            while True:
+                chunk = src.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+            parser.finish()
+
+        with open(output_path, 'w', encoding='utf-8') as out:
+            out.write('<!DOCTYPE html>\n<html><head><meta charset="utf-8">')
+            out.write(''.join(parser.head_parts))
+            out.write(extra_css)
+            out.write(parser.stylesheet())
+            out.write('</head><body>')
+            with open(body_path, 'r', encoding='utf-8') as body_in:
+                while True:
+                    chunk = body_in.read(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+            out.write('</body></html>\n')
+    finally:
+        if body_path.exists():
+            body_path.unlink()
+
+    stats = NormalizationStats(
+        source=html_path,
+        output=output_path,
+        encoding=encoding,
+        bytes_before=html_path.stat().st_size,
+        bytes_after=output_path.stat().st_size,
+        elements_before=parser.elements_before,
+        elements_after=parser.elements_after,
+        font_classes=len(parser.font_classes),
+        folded_cells=parser.folded_cells,
+        duration_seconds=time.perf_counter() - start
+    )
+
+    logger.info(f"Normalised {html_path.name}: {stats.bytes_before} -> {stats.bytes_after} bytes "
+                f"({stats.reduction_percent:.0f}% smaller, {stats.elements_before} -> "
+                f"{stats.elements_after} elements)")
+    return stats
@@ -0,0 +1,289 @@
+"""Size-optimised output profile for combined PDFs."""
+from pathlib import Path
+from typing import Dict, Any, Optional
+import gc
+import hashlib
+import io
+import logging
+import os
+import zlib
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import (ArrayObject, DictionaryObject, EncodedStreamObject, IndirectObject,
+                            NameObject, NullObject, NumberObject, StreamObject)
+
+from .models import OptimizationStats
+
+logger = logging.getLogger(__name__)
+
+# Output profiles: 'quality' writes the merged PDF untouched, 'compact'
+# compresses streams, shares identical fonts/images and downsamples images.
+# The service and the CLI apply 'compact' to each per-report PDF before the
+# streaming merge, which shares identical resources across reports, so memory
+# stays bounded by the largest report; optimize_pdf() on a whole combined PDF
+# loads all of it.
+OUTPUT_PROFILES: Dict[str, Optional[Dict[str, Any]]] = {
+    'quality': None,
+    'compact': {'target_dpi': 150},
+}
+
+# Shared resources worth de-duplicating across the merged per-report PDFs;
+# page and page-tree dictionaries must stay distinct
+DEDUP_TYPES = ('/Font', '/FontDescriptor', '/Encoding', '/ExtGState', '/XObject')
+
+MIN_DOWNSAMPLE_RATIO = 1.2  # do not bother re-encoding images for small gains
+
+# Filter chains that can be losslessly replaced by a single FlateDecode
+RECODABLE_FILTERS = ('/ASCII85Decode', '/ASCIIHexDecode', '/FlateDecode', '/LZWDecode')
+
+
+def fingerprint(obj, canonical: Dict[int, int]) -> bytes:
+    """Content key for an object, with references mapped to their canonical copies."""
+    if isinstance(obj, IndirectObject):
+        return b'R%d' % canonical.get(obj.idnum, obj.idnum)
+    if isinstance(obj, DictionaryObject):
+        parts = [b'<<']
+        for key in sorted(obj):
+            if key == '/Length':
+                continue
+            parts.append(key.encode('latin-1') + fingerprint(obj[key], canonical))
+        if isinstance(obj, StreamObject):
+            parts.append(b'stream' + hashlib.sha1(obj._data).digest())
+        parts.append(b'>>')
+        return b' '.join(parts)
+    if isinstance(obj, ArrayObject):
+        return b'[' + b' '.join(fingerprint(item, canonical) for item in obj) + b']'
+    return repr(obj).encode('utf-8', 'backslashreplace')
+
+
+def shareable(obj) -> bool:
+    """Whether an object may be shared with an identical copy."""
+    if isinstance(obj, StreamObject):
+        return True
+    return isinstance(obj, DictionaryObject) and obj.get('/Type') in DEDUP_TYPES
+
+
+def _replace_references(obj, canonical: Dict[int, int], writer: PdfWriter):
+    """Point references to duplicate objects at the kept copy (in place where possible)."""
+    if isinstance(obj, IndirectObject):
+        target = canonical.get(obj.idnum)
+        return IndirectObject(target, 0, writer) if target else obj
+    if isinstance(obj, DictionaryObject):
+        for key, value in list(obj.items()):
+            obj[key] = _replace_references(value, canonical, writer)
+    elif isinstance(obj, ArrayObject):
+        for i, value in enumerate(obj):
+            obj[i] = _replace_references(value, canonical, writer)
+    return obj
+
+
+def deduplicate_objects(writer: PdfWriter) -> int:
+    """
+    Share identical fonts, font files, images and other resources between pages.
+    
+    Fingerprinting repeats until no new duplicates appear, so a font dictionary
+    becomes shareable once its font file has been merged.
+    
+    Returns:
+        Number of duplicate objects removed
+    """
+    objects = writer._objects
+    canonical: Dict[int, int] = {}
+    
+    while True:
+        seen: Dict[bytes, int] = {}
+        merged = 0
+        for idnum, obj in enumerate(objects, 1):
+            if idnum in canonical or not shareable(obj):
+                continue
+            key = fingerprint(obj, canonical)
+            if key in seen:
+                canonical[idnum] = seen[key]
+                merged += 1
+            else:
+                seen[key] = idnum
+        if not merged:
+            break
+    
+    if canonical:
+        for idnum, obj in enumerate(objects, 1):
+            if idnum not in canonical:
+                _replace_references(obj, canonical, writer)
+        for idnum in canonical:
+            objects[idnum - 1] = NullObject()
+    return len(canonical)
+
+
+def _encode_flate(stream: StreamObject, data: bytes, extra: Optional[Dict[str, Any]] = None) -> EncodedStreamObject:
+    """Build a FlateDecode stream that keeps the original dictionary entries."""
+    encoded = EncodedStreamObject()
+    encoded.update({k: v for k, v in stream.items() if k not in ('/Length', '/Filter', '/DecodeParms')})
+    encoded.update(extra or {})
+    encoded[NameObject('/Filter')] = NameObject('/FlateDecode')
+    encoded._data = zlib.compress(data, 9)
+    return encoded
+
+
+def _filters(stream: StreamObject) -> list:
+    """Filter chain of a stream as a list of names."""
+    filters = stream.get('/Filter')
+    return [filters] if isinstance(filters, str) else list(filters or [])
+
+
+def compress_streams(writer: PdfWriter) -> int:
+    """
+    Flate-compress streams stored without a filter or behind ASCII/LZW encodings.
+    
+    Returns:
+        Number of streams compressed
+    """
+    compressed = 0
+    for i, obj in enumerate(writer._objects):
+        if not isinstance(obj, StreamObject) or len(obj._data) <= 64:
+            continue
+        filters = _filters(obj)
+        if filters == ['/FlateDecode'] or not all(f in RECODABLE_FILTERS for f in filters):
+            continue
+        try:
+            data = obj.get_data() if filters else obj._data
+        except Exception as e:
+            logger.debug(f"Leaving stream {i + 1} as is: {e}")
+            continue
+        encoded = _encode_flate(obj, data)
+        if len(encoded._data) < len(obj._data):
+            encoded.indirect_reference = IndirectObject(i + 1, 0, writer)
+            writer._objects[i] = encoded
+            compressed += 1
+    return compressed
+
+
+def _downsample_image(image: StreamObject, page_width_in: float, target_dpi: int) -> Optional[StreamObject]:
+    """
+    Re-encode an image XObject at target_dpi, if it is certainly sharper than that.
+    
+    An image cannot usefully be wider than its page, so pixels per page inch is
+    a lower bound for its rendered resolution; only images whose lower bound
+    exceeds the target are downsampled.
+    """
+    from PIL import Image
+    
+    width, height = int(image.get('/Width', 0)), int(image.get('/Height', 0))
+    if not width or not height or page_width_in <= 0:
+        return None
+    if width / page_width_in < target_dpi * MIN_DOWNSAMPLE_RATIO:
+        return None
+    
+    filters = _filters(image)
+    
+    new_size = (max(1, int(page_width_in * target_dpi)),
+                max(1, round(height * page_width_in * target_dpi / width)))
+    
+    if filters == ['/DCTDecode']:
+        picture = Image.open(io.BytesIO(image._data))
+        picture.draft(picture.mode, new_size)
+        buffer = io.BytesIO()
+        picture.resize(new_size, Image.LANCZOS).save(buffer, 'JPEG', quality=85, optimize=True)
+        resized = EncodedStreamObject()
+        resized.update({k: v for k, v in image.items() if k != '/Length'})
+        resized._data = buffer.getvalue()
+    elif all(f in RECODABLE_FILTERS for f in filters) and image.get('/BitsPerComponent') == 8:
+        mode = {'/DeviceRGB': 'RGB', '/DeviceGray': 'L'}.get(image.get('/ColorSpace'))
+        if mode is None:
+            return None
+        raw = image.get_data() if filters else image._data
+        picture = Image.frombytes(mode, (width, height), raw)
+        resized = _encode_flate(image, picture.resize(new_size, Image.LANCZOS).tobytes())
+    else:
+        return None
+    
+    resized[NameObject('/Width')] = NumberObject(new_size[0])
+    resized[NameObject('/Height')] = NumberObject(new_size[1])
+    return resized if len(resized._data) < len(image._data) else None
+
+
+def downsample_images(writer: PdfWriter, target_dpi: int) -> int:
+    """
+    Downsample images drawn on each page above target_dpi.
+    
+    Returns:
+        Number of images re-encoded
+    """
+    done = set()
+    downsampled = 0
+    for page in writer.pages:
+        page_width_in = float(page.mediabox.width) / 72
+        resources = page.get('/Resources')
+        xobjects = resources.get_object().get('/XObject') if resources else None
+        if not xobjects:
+            continue
+        refs = list(xobjects.get_object().values())
+        while refs:
+            ref = refs.pop()
+            if not isinstance(ref, IndirectObject) or ref.idnum in done:
+                continue
+            done.add(ref.idnum)
+            image = ref.get_object()
+            if image.get('/Subtype') != '/Image':
+                continue
+            if image.get('/SMask') is not None:
+                refs.append(image['/SMask'])
+            try:
+                resized = _downsample_image(image, page_width_in, target_dpi)
+            except Exception as e:
+                logger.debug(f"Skipping image {ref.idnum}: {e}")
+                continue
+            if resized is not None:
+                resized.indirect_reference = IndirectObject(ref.idnum, 0, writer)
+                writer._objects[ref.idnum - 1] = resized
+                downsampled += 1
+    return downsampled
+
+
+def optimize_pdf(input_path: Path, output_path: Optional[Path] = None,
+                 target_dpi: Optional[int] = 150) -> OptimizationStats:
+    """
+    Rewrite a PDF with compressed streams, shared duplicate resources and downsampled images.
+    
+    Args:
+        input_path: PDF to optimise
+        output_path: Where to write the result (default: replace input_path)
+        target_dpi: Downsample images sharper than this (None to keep images)
+        
+    Returns:
+        OptimizationStats with original and optimised byte counts
+    """
+    input_path = Path(input_path)
+    output_path = Path(output_path or input_path)
+    stats = OptimizationStats(original_bytes=input_path.stat().st_size)
+    
+    writer = PdfWriter()
+    with open(input_path, 'rb') as f:
+        # append() keeps the outline of the merged reports
+        writer.append(PdfReader(f))
+        
+        # Deduplicate first so each shared image is downsampled only once
+        stats.objects_deduplicated = deduplicate_objects(writer)
+        if target_dpi:
+            stats.images_downsampled = downsample_images(writer, target_dpi)
+        stats.streams_compressed = compress_streams(writer)
+        
+        tmp_path = output_path.with_name(output_path.name + '.optimizing')
+        with open(tmp_path, 'wb') as out:
+            writer.write(out)
+    # The writer's objects reference each other; free the document before the next one
+    del writer
+    gc.collect()
+    
+    # Keep whichever file is smaller; the original is already compact sometimes
+    stats.optimized_bytes = tmp_path.stat().st_size
+    if stats.optimized_bytes < stats.original_bytes:
+        os.replace(tmp_path, output_path)
+    else:
+        stats.optimized_bytes = stats.original_bytes
+        tmp_path.unlink()
+        if output_path != input_path:
+            output_path.write_bytes(input_path.read_bytes())
+    
+    logger.info(f"🗜️  Optimised {output_path.name}: {stats.original_bytes:,} -> "
+                f"{stats.optimized_bytes:,} bytes ({stats.reduction_percent:.0f}% smaller)")
+    return stats
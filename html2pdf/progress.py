@@ -0,0 +1,176 @@
+"""
+Progress event bus between the converters and the web clients.
+
+Converters call emit() at interesting points (file started, page rendered,
+merge started, ...). The event goes to the channel of the job that runs in
+the current context, or nowhere if the code runs outside a job, so the
+per-page cost is one context-variable lookup. Clients read a channel's
+events by sequence number; nothing is registered per client, so a client
+that disconnects leaves nothing behind.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+HISTORY_LIMIT = 500         # events kept per job for late or reconnecting clients
+MAX_CLOSED_CHANNELS = 200   # finished jobs whose events stay readable
+FINAL_EVENTS = ('done', 'failed')
+
+_current_channel: contextvars.ContextVar = contextvars.ContextVar('progress_channel', default=None)
+
+
+class ProgressChannel:
+    """
+    Ordered events of one job, with overall progress and ETA.
+
+    Progress is counted in files: expect_files() adds to the total, each
+    'page' event credits a page's share of its file and 'file_done' credits
+    the rest, so concurrent pipelines of one job add up correctly. A job
+    that is preempted and runs again calls reset_progress() first, as the
+    rerun announces and reports its files anew.
+    """
+
+    def __init__(self, job_id: str, history: int = HISTORY_LIMIT):
+        """
+        Args:
+            job_id: Job the events belong to
+            history: Number of most recent events kept
+        """
+        self.job_id = job_id
+        self.events: deque = deque(maxlen=history)
+        self.seq = 0
+        self.closed = False
+        self.started = time.monotonic()
+        self.counted_since = self.started  # start of the run progress and ETA refer to
+        self.files_total = 0
+        self.files_done = 0.0
+        self._credited: Dict[str, float] = {}
+        self._cond = threading.Condition()
+
+    def expect_files(self, count: int) -> None:
+        with self._cond:
+            self.files_total += count
+
+    def reset_progress(self) -> None:
+        """Forget the counted files before the job runs again; the events are kept."""
+        with self._cond:
+            self.files_total = 0
+            self.files_done = 0.0
+            self._credited.clear()
+            self.counted_since = time.monotonic()
+
+    def publish(self, kind: str, data: Dict[str, Any]) -> None:
+        """Append an event and wake the readers."""
+        with self._cond:
+            if self.closed:
+                return
+            name = data.get('file')
+            if kind == 'page' and name and data.get('total'):
+                share = 1.0 / data['total']
+                self._credited[name] = self._credited.get(name, 0.0) + share
+                self.files_done += share
+            elif kind == 'file_done' and name:
+                self.files_done += 1.0 - self._credited.pop(name, 0.0)
+
+            event = dict(data, kind=kind, seq=self.seq + 1,
+                         elapsed_seconds=round(time.monotonic() - self.started, 2))
+            if self.files_total:
+                fraction = min(1.0, self.files_done / self.files_total)
+                event['progress'] = round(fraction, 4)
+                if fraction > 0:
+                    counted = time.monotonic() - self.counted_since
+                    event['eta_seconds'] = round(counted * (1 - fraction) / fraction, 1)
+            if kind in FINAL_EVENTS:
+                self.closed = True
+            self.seq += 1
+            self.events.append(event)
+            self._cond.notify_all()
+
+    def read(self, after: int = 0, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Events with a sequence number above after, waiting up to timeout for one.
+
+        Returns:
+            The new events (empty on timeout or if the channel closed with nothing new)
+        """
+        with self._cond:
+            if self.seq <= after and not self.closed:
+                self._cond.wait(timeout)
+            return [event for event in self.events if event['seq'] > after]
+
+
+class ProgressBus:
+    """Progress channels of all current and recently finished jobs."""
+
+    def __init__(self, max_closed: int = MAX_CLOSED_CHANNELS):
+        self.max_closed = max_closed
+        self._channels: "OrderedDict[str, ProgressChannel]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, job_id: str) -> ProgressChannel:
+        """Create the channel of a job."""
+        channel = ProgressChannel(job_id)
+        with self._lock:
+            self._channels[job_id] = channel
+            closed = [key for key, c in self._channels.items() if c.closed]
+            for key in closed[:max(0, len(closed) - self.max_closed)]:
+                del self._channels[key]
+        return channel
+
+    def get(self, job_id: str) -> Optional[ProgressChannel]:
+        with self._lock:
+            return self._channels.get(job_id)
+
+    def stream(self, job_id: str, after: int = 0, heartbeat: float = 15.0) -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Yield a job's events from sequence number after on, until its final event.
+
+        None is yielded when nothing happened for heartbeat seconds, so the
+        caller can keep the connection alive (and notice a gone client).
+        """
+        channel = self.get(job_id)
+        if channel is None:
+            return
+        while True:
+            events = channel.read(after, timeout=heartbeat)
+            if not events:
+                if channel.closed:
+                    return
+                yield None
+                continue
+            for event in events:
+                after = event['seq']
+                yield event
+                if event['kind'] in FINAL_EVENTS:
+                    return
+
+
+@contextmanager
+def bind(channel: Optional[ProgressChannel]):
+    """Send the events emitted in this context (and threads started with its copy) to channel."""
+    token = _current_channel.set(channel)
+    try:
+        yield channel
+    finally:
+        _current_channel.reset(token)
+
+
+def emit(kind: str, **data) -> None:
+    """Publish a progress event for the job running in this context, if any."""
+    channel = _current_channel.get()
+    if channel is not None:
+        channel.publish(kind, data)
+
+
+def expect_files(count: int) -> None:
+    """Announce that count more files will be converted by the current job."""
+    channel = _current_channel.get()
+    if channel is not None:
+        channel.expect_files(count)
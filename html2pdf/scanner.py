@@ -2,6 +2,7 @@
 from pathlib import Path
 from typing import List
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 
@@ -28,9 +29,9 @@ def scan_html_files(source_dir: Path) -> List[Path]:
     
     try:
         # Find all .html and .htm files
-        html_files = []
-        for pattern in ['*.html', '*.htm']:
-            html_files.extend(source_dir.glob(pattern))
+        with os.scandir(source_dir) as scan:
+            html_files = [Path(entry.path) for entry in scan
+                          if entry.name.endswith(('.html', '.htm')) and not entry.name.startswith('.')]
         
         # Sort alphabetically by filename
         html_files.sort(key=lambda p: p.name.lower())
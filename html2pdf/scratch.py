@@ -0,0 +1,107 @@
+"""Per-job scratch directories for intermediate HTML/PDF files."""
+from pathlib import Path
+from typing import Optional
+import logging
+import os
+import shutil
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+SCRATCH_PREFIX = "job_"
+OWNER_FILE = ".owner"
+
+# Scratch areas older than this are removed even if their owner pid looks alive
+# (pids get reused after a restart)
+STALE_AFTER_SECONDS = 6 * 60 * 60
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check whether a process with the given pid exists."""
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class ScratchArea:
+    """
+    Private scratch directory for one conversion job.
+    
+    Used as a context manager: the directory is created on entry and removed
+    with everything in it on exit, whether or not the job succeeded. Each
+    directory records its owning pid so areas left behind by a crashed
+    process can be found and removed by purge_stale().
+    """
+    
+    def __init__(self, root: Path, job_id: Optional[str] = None):
+        """
+        Args:
+            root: Shared parent directory (e.g. temp_html2pdf)
+            job_id: Identifier used in the directory name (default: random)
+        """
+        self.root = Path(root)
+        self.job_id = job_id or uuid.uuid4().hex[:12]
+        self.path = self.root / f"{SCRATCH_PREFIX}{self.job_id}"
+    
+    def create(self) -> Path:
+        """Create the scratch directory and return its path."""
+        self.path.mkdir(parents=True, exist_ok=False)
+        (self.path / OWNER_FILE).write_text(str(os.getpid()))
+        return self.path
+    
+    def remove(self) -> None:
+        """Remove the scratch directory and its contents."""
+        shutil.rmtree(self.path, ignore_errors=True)
+    
+    def __enter__(self) -> "ScratchArea":
+        self.create()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.remove()
+
+
+def purge_stale(root: Path, max_age_seconds: float = STALE_AFTER_SECONDS) -> int:
+    """
+    Remove scratch areas left behind by dead processes or older than max_age_seconds.
+    
+    Args:
+        root: Shared parent directory of scratch areas
+        max_age_seconds: Age after which an area is removed regardless of owner
+        
+    Returns:
+        Number of scratch areas removed
+    """
+    root = Path(root)
+    if not root.exists():
+        return 0
+    
+    removed = 0
+    now = time.time()
+    for area in root.glob(f"{SCRATCH_PREFIX}*"):
+        if not area.is_dir():
+            continue
+        try:
+            owner = int((area / OWNER_FILE).read_text().strip())
+        except (OSError, ValueError):
+            owner = None
+        try:
+            age = now - area.stat().st_mtime
+        except OSError:
+            continue
+        
+        # Areas without an owner file may still be in the middle of create()
+        if (owner is not None and not _pid_alive(owner)) or age > max_age_seconds:
+            shutil.rmtree(area, ignore_errors=True)
+            removed += 1
+    
+    if removed:
+        logger.info(f"🧹 Removed {removed} stale scratch area(s) from {root}")
+    return removed
@@ -1,22 +1,53 @@
 """HTML to PDF service for Flask integration."""
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import logging
+from dataclasses import asdict
 from datetime import datetime
 
+from . import progress
 from .models import ConversionResult, ConverterConfig
 from .scanner import scan_html_files
 from .converter import HTMLConverter
-from .merger import merge_pdfs
+from .merger import PipelinedMerger
+from .optimizer import OUTPUT_PROFILES, optimize_pdf
+from .scratch import ScratchArea, purge_stale
+from .watchdog import DEFAULT_MEMORY_LIMIT_MB, DEFAULT_TIMEOUT_SECONDS
 
 logger = logging.getLogger(__name__)
 
 
+def _claim_output_name(folder: Path, stem: str) -> str:
+    """
+    Reserve the first free name stem.pdf, stem_2.pdf, ... in folder.
+    
+    The file is created empty so a job started in the same second picks the
+    next name instead of overwriting this one.
+    
+    Args:
+        folder: Output directory
+        stem: Name without the .pdf suffix
+        
+    Returns:
+        The reserved filename
+    """
+    number = 1
+    while True:
+        name = f'{stem}.pdf' if number == 1 else f'{stem}_{number}.pdf'
+        try:
+            with open(folder / name, 'x'):
+                return name
+        except FileExistsError:
+            number += 1
+
+
 class HTMLToPDFService:
     """Service class for HTML to PDF conversion in Flask app."""
     
     def __init__(self, input_folder: str = "INPUT_DATA", output_folder: str = "OUTPUT_PDF", 
-                 page_size: str = "A4", orientation: str = "Portrait"):
+                 page_size: str = "A4", orientation: str = "Portrait", backend: str = "wkhtmltopdf",
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS, output_profile: str = "quality",
+                 memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB):
         """
         Initialize the HTML to PDF service with enhanced styling.
         
@@ -25,17 +56,29 @@ class HTMLToPDFService:
             output_folder: Directory for output PDF files
             page_size: PDF page size (A4, A3, Letter, etc.)
             orientation: Page orientation (Portrait or Landscape)
+            backend: Rendering backend ('wkhtmltopdf' or 'native' with wkhtmltopdf fallback)
+            timeout: Wall-clock limit per HTML file in seconds before the degraded retry
+            output_profile: 'quality' (untouched merge) or 'compact' (compressed,
+                deduplicated and downsampled combined PDF)
+            memory_limit_mb: Address-space limit of each wkhtmltopdf process (None for no limit)
         """
         self.input_folder = Path(input_folder)
         self.output_folder = Path(output_folder)
         self.temp_dir = Path("temp_html2pdf")
         self.page_size = page_size
         self.orientation = orientation
+        self.backend = backend
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.output_profile = output_profile if output_profile in OUTPUT_PROFILES else 'quality'
         
         # Ensure directories exist
         self.input_folder.mkdir(exist_ok=True)
         self.output_folder.mkdir(exist_ok=True)
         self.temp_dir.mkdir(exist_ok=True)
+        
+        # Scratch areas of jobs that died with a previous process
+        purge_stale(self.temp_dir)
     
     def scan_html_files(self) -> List[Path]:
         """
@@ -50,17 +93,29 @@ class HTMLToPDFService:
             logger.error(f"Error scanning HTML files: {e}")
             return []
     
-    def convert_html_to_pdf(self, html_files: Optional[List[str]] = None, output_filename: Optional[str] = None) -> Dict[str, Any]:
+    @property
+    def settings_key(self) -> str:
+        """Rendering settings that determine the pages produced for an input."""
+        return f"{self.backend}|{self.page_size}|{self.orientation}|{self.output_profile}"
+    
+    def convert_html_to_pdf(self, html_files: Optional[List[str]] = None, output_filename: Optional[str] = None,
+                            reuse: Optional[Dict[str, Tuple[Path, range]]] = None) -> Dict[str, Any]:
         """
         Convert HTML files to a single combined PDF.
         
         Args:
             html_files: List of HTML filenames to convert (if None, converts all)
-            output_filename: Name for output PDF file (if None, generates timestamp-based name)
+            output_filename: Name for output PDF file (if None, combined_html_YYYYMMDD_HHMMSS.pdf,
+                with _2, _3, ... appended if that name is already taken)
+            reuse: filename -> (previous combined PDF, page range) for inputs whose
+                pages are spliced in instead of being re-rendered
             
         Returns:
-            Dictionary with conversion results
+            Dictionary with conversion results, including each file's
+            [start, end) page range in the combined PDF
         """
+        reuse = reuse or {}
+        claimed = None
         try:
             # Get HTML files to convert
             if html_files:
@@ -81,54 +136,108 @@ class HTMLToPDFService:
             # Generate output filename
             if not output_filename:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                output_filename = f'combined_html_{timestamp}.pdf'
+                output_filename = claimed = _claim_output_name(self.output_folder, f'combined_html_{timestamp}')
             
             output_path = self.output_folder / output_filename
             
-            # Initialize converter with enhanced settings
-            converter = HTMLConverter(self.temp_dir, self.page_size, self.orientation)
+            # Each job works in its own scratch area so concurrent jobs never
+            # overwrite or delete each other's intermediates
+            with ScratchArea(self.temp_dir) as scratch:
+                # Initialize converter with enhanced settings
+                converter = HTMLConverter(scratch.path, self.page_size, self.orientation,
+                                          backend=self.backend, timeout=self.timeout,
+                                          memory_limit_mb=self.memory_limit_mb)
+            
+                # Convert HTML files to PDFs; each finished PDF is appended to the
+                # combined output while the next file converts. Reused inputs are
+                # ready immediately and only have their old pages copied.
+                profile_settings = OUTPUT_PROFILES[self.output_profile]
+                merger = PipelinedMerger(output_path, len(files_to_convert), dedupe=bool(profile_settings))
+                source_stats = []
+                
+                def on_converted(i, pdf_path):
+                    if profile_settings and pdf_path is not None:
+                        # One report at a time, so memory stays bounded by the largest report;
+                        # the merger shares identical resources across reports
+                        try:
+                            source_stats.append(optimize_pdf(pdf_path, **profile_settings))
+                        except Exception as e:
+                            logger.warning(f"⚠️  Merging {pdf_path.name} unoptimised: {e}")
+                    merger.submit(positions[i], pdf_path)
+                
+                positions = []
+                for index, html_file in enumerate(files_to_convert):
+                    if html_file.name in reuse:
+                        merger.submit(index, *reuse[html_file.name])
+                    else:
+                        positions.append(index)
+                try:
+                    successful_pdfs, failed_conversions = converter.convert_batch(
+                        [files_to_convert[i] for i in positions],
+                        on_converted=on_converted)
+                except Exception:
+                    merger.abort()
+                    raise
+                renders = [asdict(report) for report in converter.render_reports.values()]
+                reused = [f.name for f in files_to_convert if f.name in reuse]
             
-            # Convert HTML files to PDFs
-            successful_pdfs, failed_conversions = converter.convert_batch(files_to_convert)
+                if not successful_pdfs and not reused:
+                    merger.abort()
+                    converter.cleanup()
+                    return {
+                        'success': False,
+                        'error': 'No HTML files were successfully converted',
+                        'total': len(files_to_convert),
+                        'successful': 0,
+                        'failed': len(failed_conversions),
+                        'failures': [{'file': str(f[0].name), 'error': f[1]} for f in failed_conversions],
+                        'renders': renders
+                    }
             
-            if not successful_pdfs:
+                # Wait for the merge to catch up with the last file
+                progress.emit('merge_started', output=output_filename)
+                merge_success = merger.finish()
+            
+                # Clean up temporary files
                 converter.cleanup()
-                return {
-                    'success': False,
-                    'error': 'No HTML files were successfully converted',
-                    'total': len(files_to_convert),
-                    'successful': 0,
-                    'failed': len(failed_conversions),
-                    'failures': [{'file': str(f[0].name), 'error': f[1]} for f in failed_conversions]
-                }
             
-            # Merge PDFs
-            merge_success = merge_pdfs(successful_pdfs, output_path)
+                if not merge_success:
+                    return {
+                        'success': False,
+                        'error': 'Failed to merge PDFs',
+                        'total': len(files_to_convert),
+                        'successful': len(successful_pdfs),
+                        'failed': len(failed_conversions),
+                        'renders': renders
+                    }
             
-            # Clean up temporary files
-            converter.cleanup()
+                original_bytes = optimized_bytes = output_path.stat().st_size
+                if profile_settings:
+                    # What the profile saved: per report, plus resources shared across reports
+                    original_bytes += sum(stats.original_bytes - stats.optimized_bytes for stats in source_stats)
+                    original_bytes += merger.deduplicated_bytes
             
-            if not merge_success:
                 return {
-                    'success': False,
-                    'error': 'Failed to merge PDFs',
+                    'success': True,
+                    'output_file': output_filename,
+                    'output_path': str(output_path),
                     'total': len(files_to_convert),
-                    'successful': len(successful_pdfs),
-                    'failed': len(failed_conversions)
+                    'successful': len(successful_pdfs) + len(reused),
+                    'failed': len(failed_conversions),
+                    'failures': [{'file': str(f[0].name), 'error': f[1]} for f in failed_conversions] if failed_conversions else [],
+                    'reused': reused,
+                    'page_ranges': {files_to_convert[i].name: list(r) for i, r in merger.page_ranges.items()},
+                    'backends': converter.backends_used,
+                    'renders': renders,
+                    'output_profile': self.output_profile,
+                    'original_bytes': original_bytes,
+                    'optimized_bytes': optimized_bytes
                 }
             
-            return {
-                'success': True,
-                'output_file': output_filename,
-                'output_path': str(output_path),
-                'total': len(files_to_convert),
-                'successful': len(successful_pdfs),
-                'failed': len(failed_conversions),
-                'failures': [{'file': str(f[0].name), 'error': f[1]} for f in failed_conversions] if failed_conversions else []
-            }
-            
         except Exception as e:
             logger.error(f"Error in HTML to PDF conversion: {e}")
+            if claimed:
+                (self.output_folder / claimed).unlink(missing_ok=True)
             return {
                 'success': False,
                 'error': str(e),
@@ -0,0 +1,176 @@
+"""Wall-clock and memory limits for renderer subprocesses."""
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+import logging
+import os
+import signal
+import subprocess
+import time
+
+import pdfkit
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits, the timeout still applies
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Default per-document limits for one wkhtmltopdf process
+DEFAULT_TIMEOUT_SECONDS = 120
+DEFAULT_MEMORY_LIMIT_MB = 4096
+
+# Cheaper wkhtmltopdf profile used for the single retry after a hung or
+# crashed render: lower DPI, JavaScript off, PDF compression on
+DEGRADED_OPTIONS = {
+    'dpi': 150,
+    'image-dpi': 150,
+    'image-quality': 75,
+    'disable-javascript': '',
+    'lowquality': '',
+}
+DEGRADED_DROPPED = ('enable-javascript', 'javascript-delay', 'no-pdf-compression')
+
+
+class RenderTimeout(Exception):
+    """Raised when a renderer exceeds its wall-clock limit and is killed."""
+
+
+class RenderCrashed(Exception):
+    """Raised when a renderer dies from a signal (e.g. memory limit hit)."""
+
+
+def degraded_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Derive the cheaper retry profile from a wkhtmltopdf option set.
+    
+    Args:
+        options: Normal wkhtmltopdf options
+        
+    Returns:
+        New options dictionary with the degraded overrides applied
+    """
+    degraded = {k: v for k, v in options.items() if k not in DEGRADED_DROPPED}
+    degraded.update(DEGRADED_OPTIONS)
+    return degraded
+
+
+def _limit_memory(process: subprocess.Popen, memory_limit_mb: Optional[int]) -> None:
+    """
+    Cap a started renderer's address space, if supported.
+    
+    Set from the parent with prlimit() right after the spawn: a preexec_fn is
+    unsafe here, as renders run from request, job-worker and pool threads.
+    """
+    if not memory_limit_mb or resource is None or not hasattr(resource, 'prlimit'):
+        return
+    limit = memory_limit_mb * 1024 * 1024
+    try:
+        resource.prlimit(process.pid, resource.RLIMIT_AS, (limit, limit))
+    except ProcessLookupError:
+        pass  # already exited
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️  Could not limit renderer memory to {memory_limit_mb} MB: {e}")
+
+
+def _kill_process_group(process: subprocess.Popen) -> None:
+    """Kill the renderer and anything it spawned."""
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+    process.wait()
+
+
+def run_with_limits(command: List[str], timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                    memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB) -> str:
+    """
+    Run a renderer command in its own process group with wall-clock and memory limits.
+    
+    Args:
+        command: Command line to execute
+        timeout: Wall-clock limit in seconds
+        memory_limit_mb: Address-space limit in MB (None for no limit)
+        
+    Returns:
+        Captured stderr output
+        
+    Raises:
+        RenderTimeout: The process group was killed after exceeding the timeout
+        RenderCrashed: The process was terminated by a signal
+        IOError: The process exited with an error status other than 1
+    """
+    process = subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=(os.name == 'posix')
+    )
+    _limit_memory(process, memory_limit_mb)
+    try:
+        _, stderr = process.communicate(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        _kill_process_group(process)
+        process.communicate()
+        raise RenderTimeout(f"Timed out after {timeout:g}s")
+    
+    stderr = stderr.decode('utf-8', errors='replace')
+    if process.returncode < 0:
+        raise RenderCrashed(f"Renderer killed by signal {-process.returncode}")
+    # wkhtmltopdf exits with 1 when it ignored load errors but still wrote the PDF
+    if process.returncode not in (0, 1):
+        raise IOError(f"wkhtmltopdf exited with code {process.returncode}: {stderr.strip()[-500:]}")
+    return stderr
+
+
+def render_with_watchdog(html_path: Path, pdf_path: Path, options: Dict[str, Any],
+                         timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                         memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB,
+                         wkhtmltopdf: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Render HTML with wkhtmltopdf, retrying once with the degraded profile after a hang or crash.
+    
+    Args:
+        html_path: HTML file to render
+        pdf_path: Output PDF path
+        options: wkhtmltopdf options for the first attempt
+        timeout: Wall-clock limit per attempt in seconds
+        memory_limit_mb: Address-space limit per attempt in MB
+        wkhtmltopdf: Path to the wkhtmltopdf binary (default: found on PATH)
+        
+    Returns:
+        List of attempt records (profile, status, duration_seconds, error);
+        the render succeeded if the last record has status 'ok'
+    """
+    configuration = pdfkit.configuration(wkhtmltopdf=wkhtmltopdf) if wkhtmltopdf else None
+    attempts = []
+    
+    for profile, profile_options in (('normal', options), ('degraded', degraded_options(options))):
+        start = time.perf_counter()
+        attempt = {'profile': profile, 'status': 'ok'}
+        try:
+            command = pdfkit.PDFKit(str(html_path), 'file', options=dict(profile_options),
+                                    configuration=configuration).command(str(pdf_path))
+            run_with_limits(command, timeout, memory_limit_mb)
+            if not pdf_path.exists() or pdf_path.stat().st_size == 0:
+                raise IOError("wkhtmltopdf produced no output")
+        except (RenderTimeout, RenderCrashed) as e:
+            attempt['status'] = 'timeout' if isinstance(e, RenderTimeout) else 'crashed'
+            attempt['error'] = str(e)
+            logger.warning(f"⏱️  {html_path.name}: {profile} render {attempt['status']} ({e})")
+            pdf_path.unlink(missing_ok=True)
+        except Exception as e:
+            attempt['status'] = 'failed'
+            attempt['error'] = str(e)
+        attempt['duration_seconds'] = round(time.perf_counter() - start, 3)
+        attempts.append(attempt)
+        
+        # Only hangs and crashes are worth a cheaper second attempt
+        if attempt['status'] in ('ok', 'failed'):
+            break
+    
+    return attempts
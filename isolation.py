@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Isolated DXF conversion - one child process per drawing, with resource limits
+
+A pathological drawing can make ezdxf or matplotlib take unbounded memory
+or CPU. In this mode each convert_dxf_to_pdf runs in a fresh Python process
+with a CPU-time limit (RLIMIT_CPU), an address-space limit (RLIMIT_AS) and
+a wall-clock timeout, so hitting a limit only ends that child. The result
+comes back as a dictionary together with the child's resource usage.
+
+Run as a module, it is the child: python -m isolation <request.json>
+"""
+
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import resource
+except ImportError:  # Windows: no rlimits or rusage, the timeout still applies
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CPU_SECONDS = 600
+DEFAULT_MEMORY_LIMIT_MB = 4096
+DEFAULT_TIMEOUT_SECONDS = 900
+POLL_SECONDS = 0.05
+LOG_TAIL_CHARS = 2000
+# Error messages of allocations refused under the address-space limit
+MEMORY_ERROR_MARKERS = ('MemoryError', 'Unable to allocate', 'Cannot allocate memory',
+                        'failed to map segment')
+
+
+@dataclass
+class ResourceLimits:
+    """Limits of one isolated conversion (None: no limit)."""
+    cpu_seconds: Optional[int] = DEFAULT_CPU_SECONDS
+    memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB
+    timeout_seconds: Optional[float] = DEFAULT_TIMEOUT_SECONDS
+
+
+def _apply_limits(limits: ResourceLimits) -> None:
+    """
+    Set this process's rlimits, if supported.
+
+    Called by the child itself before it imports the converter, not through
+    Popen's preexec_fn, which can deadlock when the parent has other threads
+    (the web server's and the job workers').
+    """
+    if resource is None:
+        return
+    if limits.cpu_seconds:
+        # SIGXCPU at the soft limit, SIGKILL one second later
+        resource.setrlimit(resource.RLIMIT_CPU, (limits.cpu_seconds, limits.cpu_seconds + 1))
+    if limits.memory_limit_mb:
+        limit = limits.memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def _usage(rusage, wall_seconds: float) -> Dict[str, Any]:
+    usage = {'wall_seconds': round(wall_seconds, 3)}
+    if rusage is not None:
+        usage.update({
+            'user_seconds': round(rusage.ru_utime, 3),
+            'system_seconds': round(rusage.ru_stime, 3),
+            'cpu_seconds': round(rusage.ru_utime + rusage.ru_stime, 3),
+            'max_rss_mb': round(rusage.ru_maxrss / 1024, 1)  # KB on Linux
+        })
+    return usage
+
+
+def _classify(signum: Optional[int], output: str, usage: Dict[str, Any], limits: ResourceLimits) -> str:
+    """Which limit (if any) ended a failed conversion."""
+    if signum is not None and signum == getattr(signal, 'SIGXCPU', None):
+        return 'cpu_limit'
+    if signum == getattr(signal, 'SIGKILL', None) and limits.cpu_seconds and \
+            usage.get('cpu_seconds', 0) >= limits.cpu_seconds:
+        return 'cpu_limit'
+    if any(marker in output for marker in MEMORY_ERROR_MARKERS):
+        return 'memory_limit'
+    return 'crashed' if signum is not None else 'failed'
+
+
+def convert_isolated(dxf_path, pdf_path=None, scale_mode: str = 'standard', output_folder: str = "OUTPUT_PDF",
+                     max_pages: Optional[int] = None, limits: Optional[ResourceLimits] = None) -> Dict[str, Any]:
+    """
+    Convert one DXF drawing in a child process with resource limits.
+
+    Args:
+        dxf_path: DXF file to convert
+        pdf_path: Output PDF (default: derived from the DXF name and scale mode)
+        scale_mode: Scale mode of the conversion
+        output_folder: Folder of the default output PDF
+        max_pages: Page limit (default: the scale mode's limit)
+        limits: CPU, memory and wall-clock limits (default: ResourceLimits())
+
+    Returns:
+        Dictionary with 'success', 'output' (path or error), 'pages',
+        'status' ('ok', 'failed', 'cpu_limit', 'memory_limit', 'timeout' or
+        'crashed'), 'usage' (CPU seconds, peak RSS and wall time of the child)
+        and the 'limits' it ran under
+    """
+    limits = limits or ResourceLimits()
+    started = time.perf_counter()
+    with tempfile.TemporaryDirectory(prefix='dxf_isolated_') as tmp:
+        request_path = Path(tmp) / 'request.json'
+        result_path = Path(tmp) / 'result.json'
+        log_path = Path(tmp) / 'child.log'
+        with open(request_path, 'w', encoding='utf-8') as f:
+            json.dump({'dxf_path': str(dxf_path), 'pdf_path': str(pdf_path) if pdf_path else None,
+                       'scale_mode': scale_mode, 'output_folder': output_folder, 'max_pages': max_pages,
+                       'result_path': str(result_path), 'limits': asdict(limits)}, f)
+
+        # One BLAS thread: thread pools reserve address space the limit would count
+        env = dict(os.environ, OPENBLAS_NUM_THREADS='1', OMP_NUM_THREADS='1', MPLBACKEND='Agg')
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(Path(__file__).resolve().parent),
+                                                          os.environ.get('PYTHONPATH')]))
+        with open(log_path, 'wb') as log:
+            process = subprocess.Popen([sys.executable, '-m', 'isolation', str(request_path)],
+                                       stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT, env=env,
+                                       start_new_session=(os.name == 'posix'))
+            _, rusage, timed_out = _wait(process, limits.timeout_seconds)
+        usage = _usage(rusage, time.perf_counter() - started)
+
+        result = {'success': False, 'output': '', 'pages': 0}
+        if result_path.exists():
+            try:
+                with open(result_path, 'r', encoding='utf-8') as f:
+                    result.update(json.load(f))
+            except ValueError:  # the child died while writing it
+                pass
+        signum = -process.returncode if process.returncode < 0 else None
+        if timed_out:
+            result.update(success=False, status='timeout',
+                          output=f"Timed out after {limits.timeout_seconds:g}s")
+        elif result['success']:
+            result['status'] = 'ok'
+        else:
+            tail = log_path.read_text(encoding='utf-8', errors='replace')[-LOG_TAIL_CHARS:]
+            result['status'] = _classify(signum, result['output'] or tail, usage, limits)
+            if not result['output']:
+                result['output'] = (f"Conversion process killed by signal {signum}" if signum
+                                    else f"Conversion process exited with code {process.returncode}")
+
+    result['usage'] = usage
+    result['limits'] = asdict(limits)
+    level = logging.INFO if result['success'] else logging.WARNING
+    logger.log(level, f"🧪 {Path(dxf_path).name}: {result['status']} in {result['usage']['wall_seconds']}s "
+                      f"(CPU {result['usage'].get('cpu_seconds', '?')}s, "
+                      f"peak {result['usage'].get('max_rss_mb', '?')} MB)")
+    return result
+
+
+def _wait(process: subprocess.Popen, timeout: Optional[float]):
+    """Wait for the child, killing its process group after timeout; returns (status, rusage, timed_out)."""
+    deadline = time.monotonic() + timeout if timeout else None
+    timed_out = False
+    while True:
+        if resource is not None and hasattr(os, 'wait4'):
+            pid, status, rusage = os.wait4(process.pid, os.WNOHANG)
+            if pid:
+                # Reaped here (for its rusage), so tell Popen the exit status
+                process.returncode = os.waitstatus_to_exitcode(status)
+                return status, rusage, timed_out
+        elif process.poll() is not None:
+            return process.returncode, None, timed_out
+        if deadline is not None and time.monotonic() > deadline and not timed_out:
+            timed_out = True
+            try:
+                if os.name == 'posix':
+                    os.killpg(process.pid, signal.SIGKILL)
+                else:
+                    process.kill()
+            except (ProcessLookupError, PermissionError):
+                pass
+        time.sleep(POLL_SECONDS)
+
+
+def _child(request_path: str) -> int:
+    """Child process: run the conversion and write its result for the parent."""
+    with open(request_path, 'r', encoding='utf-8') as f:
+        request = json.load(f)
+    _apply_limits(ResourceLimits(**request['limits']))
+
+    try:
+        from dxf_converter import DXFToPDFConverter
+        converter = DXFToPDFConverter(output_folder=request['output_folder'], scale_mode=request['scale_mode'])
+        success, output, pages = converter.convert_dxf_to_pdf(request['dxf_path'], request['pdf_path'],
+                                                              max_pages=request['max_pages'])
+    except Exception as e:  # e.g. the libraries could not be loaded within the limits
+        success, output, pages = False, f"{type(e).__name__}: {e}", 0
+    with open(request['result_path'], 'w', encoding='utf-8') as f:
+        json.dump({'success': success, 'output': output, 'pages': pages}, f)
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(_child(sys.argv[1]))
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Job Store - SQLite persistence for conversion jobs and their checkpoints
+
+Every job is written when it is queued and whenever its state changes, and
+every checkpoint as soon as it is taken, so a restarted server can resume
+interrupted jobs from their last completed file or page batch.
+"""
+
+import json
+import logging
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from html2pdf.checkpoints import CheckpointJournal
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "job_store.sqlite3"
+UNFINISHED_STATES = ('queued', 'running')
+KEEP_FINISHED_JOBS = 1000  # finished jobs kept in the database
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    submitted_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    job_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, key)
+);
+"""
+
+
+class JobStore:
+    """
+    Durable record of jobs and checkpoints.
+
+    One connection is shared by all threads behind a lock; every write is
+    committed immediately. Intermediate files of a job live under
+    checkpoint_root/<job id> until the job finishes.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH, checkpoint_root: Optional[str] = None):
+        """
+        Args:
+            path: SQLite database file
+            checkpoint_root: Parent directory of the jobs' checkpoint files
+                (default: '<database name>_checkpoints' next to the database)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_root = Path(checkpoint_root) if checkpoint_root else \
+            self.path.with_name(f"{self.path.stem}_checkpoints")
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(SCHEMA)
+            self._db.commit()
+
+    def _write(self, sql: str, params: tuple) -> None:
+        with self._lock:
+            self._db.execute(sql, params)
+            self._db.commit()
+
+    def add_job(self, job_id: str, kind: str, args: tuple, kwargs: Dict[str, Any], submitted_at: float,
+                priority: str = 'batch', user: str = 'anonymous', dedupe_key: Optional[str] = None) -> None:
+        """Record a newly queued job with the arguments needed to run it again."""
+        params = json.dumps({'args': list(args), 'kwargs': kwargs, 'priority': priority, 'user': user,
+                             'dedupe_key': dedupe_key})
+        self._write("INSERT OR REPLACE INTO jobs (id, kind, params, status, submitted_at) VALUES (?, ?, ?, 'queued', ?)",
+                    (job_id, kind, params, submitted_at))
+
+    def mark_running(self, job_id: str, started_at: float) -> None:
+        self._write("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (started_at, job_id))
+
+    def mark_queued(self, job_id: str) -> None:
+        """Put a preempted job back in the queue; its checkpoints are kept."""
+        self._write("UPDATE jobs SET status = 'queued', started_at = NULL WHERE id = ?", (job_id,))
+
+    def mark_finished(self, job_id: str, status: str, finished_at: float,
+                      result: Any = None, error: Optional[str] = None) -> None:
+        """Record a job's outcome and drop its checkpoints."""
+        self._write("UPDATE jobs SET status = ?, finished_at = ?, result = ?, error = ? WHERE id = ?",
+                    (status, finished_at, json.dumps(result, default=str), error, job_id))
+        self.discard_checkpoints(job_id)
+        self._write("DELETE FROM jobs WHERE status NOT IN (?, ?) AND id NOT IN "
+                    "(SELECT id FROM jobs WHERE status NOT IN (?, ?) ORDER BY finished_at DESC LIMIT ?)",
+                    UNFINISHED_STATES * 2 + (KEEP_FINISHED_JOBS,))
+
+    def save_checkpoint(self, job_id: str, key: str, data: Any) -> None:
+        self._write("INSERT OR REPLACE INTO checkpoints (job_id, key, data) VALUES (?, ?, ?)",
+                    (job_id, key, json.dumps(data, default=str)))
+
+    def load_checkpoints(self, job_id: str) -> Dict[str, Any]:
+        with self._lock:
+            rows = self._db.execute("SELECT key, data FROM checkpoints WHERE job_id = ?", (job_id,)).fetchall()
+        return {row['key']: json.loads(row['data']) for row in rows}
+
+    def discard_checkpoints(self, job_id: str) -> None:
+        self._write("DELETE FROM checkpoints WHERE job_id = ?", (job_id,))
+        shutil.rmtree(self.checkpoint_root / job_id, ignore_errors=True)
+
+    def journal(self, job_id: str) -> CheckpointJournal:
+        """Checkpoint journal of a job, preloaded with what it saved before a restart."""
+        return CheckpointJournal(job_id, self.checkpoint_root / job_id, store=self,
+                                 saved=self.load_checkpoints(job_id))
+
+    def _rows(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        jobs = []
+        for row in rows:
+            job = dict(row)
+            params = json.loads(job.pop('params'))
+            job['args'], job['kwargs'] = tuple(params['args']), params['kwargs']
+            job['priority'], job['user'] = params.get('priority', 'batch'), params.get('user', 'anonymous')
+            job['dedupe_key'] = params.get('dedupe_key')
+            job['result'] = json.loads(job['result']) if job['result'] else None
+            jobs.append(job)
+        return jobs
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Jobs that were queued or running when the server stopped, oldest first."""
+        return self._rows("SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY submitted_at",
+                          UNFINISHED_STATES)
+
+    def recent_finished(self, limit: int) -> List[Dict[str, Any]]:
+        """Most recently finished jobs, oldest first."""
+        rows = self._rows("SELECT * FROM jobs WHERE status NOT IN (?, ?) ORDER BY finished_at DESC LIMIT ?",
+                          UNFINISHED_STATES + (limit,))
+        return rows[::-1]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
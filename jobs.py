@@ -0,0 +1,476 @@
+#!/usr/bin/env python3
+"""
+Conversion Jobs - background execution of conversions for the web app
+
+Endpoints enqueue a job and return its id at once; a small pool of worker
+threads runs the DXF/HTML/unified conversions and keeps the result until
+the client collects it. With a JobStore, jobs survive a restart and resume
+from their checkpoints.
+
+Jobs are 'interactive' (a user waits on the page) or 'batch'. Interactive
+jobs start first; within a class, the user with the fewest running jobs
+goes next, so one user's batch run does not hold back everybody else.
+
+A job submitted with a dedupe key while a job with the same key is queued
+or running is not started again: the request attaches to that job and
+gets its result.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from admission import SAMPLE_SECONDS, AdmissionController
+from html2pdf import checkpoints, progress
+from html2pdf.progress import ProgressBus
+from job_store import JobStore
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+MAX_FINISHED_JOBS = 200  # finished jobs kept for status queries
+
+JOB_STATES = ('queued', 'running', 'done', 'failed')
+PRIORITIES = ('interactive', 'batch')  # highest first
+DEFAULT_PRIORITY = 'batch'
+DEFAULT_USER = 'anonymous'
+BATCH_AGING_SECONDS = 600  # a batch job queued this long competes as interactive
+WAIT_SAMPLES = 1000  # queue waits kept per class for the statistics
+
+
+@dataclass
+class Job:
+    """One queued conversion."""
+    id: str
+    kind: str
+    func: Callable[..., Any] = field(repr=False)
+    args: tuple = field(default=(), repr=False)
+    kwargs: Dict[str, Any] = field(default_factory=dict, repr=False)
+    status: str = 'queued'
+    priority: str = DEFAULT_PRIORITY
+    user: str = DEFAULT_USER
+    preemptions: int = 0
+    dedupe_key: Optional[str] = field(default=None, repr=False)
+    coalesced: int = 0  # identical requests attached to this job
+    memory_mb: Optional[float] = field(default=None, repr=False)  # admission estimate, once computed
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Any = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+
+def _percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class JobManager:
+    """
+    Priority job queue served by a fixed pool of worker threads.
+
+    The next job is the one with the highest class; within a class, the
+    job of the user with the fewest running jobs (then the user served
+    least recently), oldest first. With admission control, the first job in
+    that order whose memory fits the budget starts; the others stay queued
+    without occupying a worker. A job whose function raises is marked
+    'failed' with the error message; otherwise its return value becomes
+    the job result.
+
+    With preemption, a batch job that reaches a yield point (see
+    checkpoints.yield_point) while an interactive job waits for a worker
+    goes back to the queue and later resumes from its checkpoints.
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_finished: int = MAX_FINISHED_JOBS,
+                 bus: Optional[ProgressBus] = None, store: Optional[JobStore] = None,
+                 admission: Optional[AdmissionController] = None, preempt: bool = False):
+        """
+        Args:
+            workers: Number of conversions that run at the same time
+            max_finished: Finished jobs remembered before the oldest are dropped
+            bus: Progress bus that receives the events of every job
+            store: Persistent store; job arguments must then be JSON-serializable
+            admission: Memory budget a job must fit into before it starts; jobs
+                that do not fit stay queued and jobs behind them that fit start first
+            preempt: Let waiting interactive jobs preempt batch jobs at their
+                yield points (needs a store, which holds the checkpoints)
+        """
+        self.workers = max(1, workers)
+        self.bus = bus
+        self.store = store
+        self.admission = admission
+        self.preempt = preempt and store is not None
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._pending: List[str] = []  # queued job ids, in submission order
+        self._lock = threading.Condition()
+        self._stopping = False
+        self._idle = 0  # workers waiting for a job
+        self._running_by_user: Dict[str, int] = defaultdict(int)
+        self._served_at: Dict[str, float] = {}  # user -> when one of their jobs last started
+        self._waits: Dict[str, "deque[float]"] = {priority: deque(maxlen=WAIT_SAMPLES) for priority in PRIORITIES}
+        self._inflight: Dict[str, str] = {}  # dedupe key -> unfinished job id
+        self.preempted = 0
+        self.coalesced = 0
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, kind: str, func: Callable[..., Any], *args, priority: str = DEFAULT_PRIORITY,
+               user: str = DEFAULT_USER, dedupe_key: Optional[str] = None, **kwargs) -> Job:
+        """
+        Queue func(*args, **kwargs) for a worker.
+
+        Args:
+            kind: Label of the job type ('dxf', 'html', 'unified', ...)
+            func: Conversion to run
+            priority: 'interactive' or 'batch'
+            user: Who submitted the job, for fairness between users
+            dedupe_key: Identity of the work (inputs and settings); while a job
+                with the same key is unfinished, that job is returned instead
+                of queueing a duplicate
+
+        Returns:
+            The queued job, or the unfinished identical job it was attached to
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}', expected one of {', '.join(PRIORITIES)}")
+        with self._lock:
+            attached = self._attach(dedupe_key, priority)
+            if attached is None:
+                job = Job(id=uuid.uuid4().hex, kind=kind, func=func, args=args, kwargs=kwargs,
+                          priority=priority, user=user or DEFAULT_USER, dedupe_key=dedupe_key)
+                if dedupe_key is not None:
+                    # Registered before the lock is released, so concurrent duplicates attach to it
+                    self._inflight[dedupe_key] = job.id
+                    self._jobs[job.id] = job
+        if attached is not None:
+            logger.info(f"🔗 Attached {kind} request to {attached.status} job {attached.id} "
+                        f"({attached.coalesced} identical request(s) coalesced)")
+            return attached
+        if self.store is not None:
+            try:
+                self.store.add_job(job.id, kind, args, kwargs, job.submitted_at, priority=job.priority,
+                                   user=job.user, dedupe_key=dedupe_key)
+            except Exception as e:
+                # Never queued: fail it, so requests that attached meanwhile do not wait forever
+                with self._lock:
+                    if self._inflight.get(dedupe_key) == job.id:
+                        del self._inflight[dedupe_key]
+                    job.status, job.error, job.finished_at = 'failed', f"Could not queue job: {e}", time.time()
+                    job.func, job.args, job.kwargs = None, (), {}
+                raise
+        self._enqueue(job)
+        logger.info(f"📥 Queued {priority} {kind} job {job.id} for {job.user}")
+        return job
+
+    def _attach(self, dedupe_key: Optional[str], priority: str) -> Optional[Job]:
+        """The unfinished job doing the same work, counted as coalesced (called with the lock held)."""
+        job = self._jobs.get(self._inflight.get(dedupe_key)) if dedupe_key is not None else None
+        if job is None or job.finished:
+            return None
+        job.coalesced += 1
+        self.coalesced += 1
+        if job.status == 'queued' and PRIORITIES.index(priority) < PRIORITIES.index(job.priority):
+            # Someone is now waiting on the page for it
+            job.priority = priority
+        return job
+    
+    def _enqueue(self, job: Job) -> None:
+        if self.bus is not None:
+            self.bus.open(job.id)
+        with self._lock:
+            self._jobs[job.id] = job
+            if job.dedupe_key is not None:
+                self._inflight.setdefault(job.dedupe_key, job.id)
+            self._pending.append(job.id)
+            self._lock.notify()
+    
+    def resume(self, runners: Dict[str, Callable[..., Any]]) -> int:
+        """
+        Re-queue the jobs a previous process left unfinished, under their old ids.
+        
+        Each job resumes from its checkpoints. Recently finished jobs are
+        loaded too, so their status and result can still be queried.
+        
+        Args:
+            runners: Job kind -> function that runs it
+            
+        Returns:
+            Number of resumed jobs
+        """
+        if self.store is None:
+            return 0
+        
+        with self._lock:
+            for row in self.store.recent_finished(self.max_finished):
+                self._jobs[row['id']] = Job(id=row['id'], kind=row['kind'], func=None, status=row['status'],
+                                            submitted_at=row['submitted_at'], started_at=row['started_at'],
+                                            finished_at=row['finished_at'], result=row['result'],
+                                            error=row['error'])
+        
+        resumed = 0
+        for row in self.store.unfinished():
+            func = runners.get(row['kind'])
+            if func is None:
+                self.store.mark_finished(row['id'], 'failed', time.time(), error=f"Unknown job kind {row['kind']}")
+                continue
+            self._enqueue(Job(id=row['id'], kind=row['kind'], func=func, args=row['args'],
+                              kwargs=row['kwargs'], priority=row['priority'], user=row['user'],
+                              dedupe_key=row['dedupe_key'], submitted_at=row['submitted_at']))
+            resumed += 1
+        if resumed:
+            logger.info(f"🔁 Resuming {resumed} interrupted job(s)")
+        return resumed
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """
+        Position of a job in the queue.
+
+        Returns:
+            1 for the next job to start, 0 if it is running, None if it has finished
+            or is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return None
+            if job.status == 'running':
+                return 0
+            return self._run_order().index(job_id) + 1
+
+    def _class(self, job: Job, now: float) -> int:
+        # Rank of the job's class; batch jobs waiting too long are promoted so they cannot starve
+        rank = PRIORITIES.index(job.priority)
+        if rank and now - job.submitted_at >= BATCH_AGING_SECONDS:
+            return 0
+        return rank
+
+    def _next_job(self, candidates: List[str], running_by_user: Dict[str, int],
+                  served_at: Dict[str, float], now: float) -> str:
+        def key(job_id: str):
+            job = self._jobs[job_id]
+            return (self._class(job, now), running_by_user.get(job.user, 0),
+                    served_at.get(job.user, 0.0), job.submitted_at)
+        return min(candidates, key=key)
+
+    def _run_order(self) -> List[str]:
+        """Queued job ids in the order they would start (called with the lock held)."""
+        order = []
+        candidates = list(self._pending)
+        running_by_user = dict(self._running_by_user)
+        served_at = dict(self._served_at)
+        now = time.time()
+        while candidates:
+            job_id = self._next_job(candidates, running_by_user, served_at, now)
+            candidates.remove(job_id)
+            order.append(job_id)
+            user = self._jobs[job_id].user
+            running_by_user[user] = running_by_user.get(user, 0) + 1
+            now += 1e-6
+            served_at[user] = now
+        return order
+
+    def describe(self, job: Job) -> Dict[str, Any]:
+        """JSON-ready status of a job."""
+        info = {
+            'job_id': job.id,
+            'kind': job.kind,
+            'status': job.status,
+            'priority': job.priority,
+            'user': job.user,
+            'queue_position': self.queue_position(job.id),
+            'submitted_at': job.submitted_at,
+            'started_at': job.started_at,
+            'finished_at': job.finished_at
+        }
+        if job.preemptions:
+            info['preemptions'] = job.preemptions
+        if job.coalesced:
+            info['coalesced'] = job.coalesced
+        if job.finished:
+            info['result'] = job.result
+            info['error'] = job.error
+        return info
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """Status of every remembered job, oldest first."""
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [self.describe(job) for job in jobs]
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of workers and of queued and running jobs."""
+        with self._lock:
+            running = sum(1 for job in self._jobs.values() if job.status == 'running')
+            return {'workers': self.workers, 'queued': len(self._pending), 'running': running}
+
+    def queue_stats(self) -> Dict[str, Any]:
+        """
+        Queue depth and wait times per priority class.
+
+        Returns:
+            Dictionary with 'workers', 'preempted', 'coalesced' (requests
+            attached to an identical unfinished job) and, per class, the jobs
+            'queued' and 'running' and 'wait_seconds' (count, mean, p50, p95
+            and max of the time recent jobs spent queued before they started)
+        """
+        with self._lock:
+            classes = {}
+            for priority in PRIORITIES:
+                jobs = [job for job in self._jobs.values() if job.priority == priority]
+                waits = list(self._waits[priority])
+                summary: Dict[str, Any] = {'count': len(waits)}
+                if waits:
+                    summary.update(mean=round(sum(waits) / len(waits), 3),
+                                   p50=round(_percentile(waits, 0.50), 3),
+                                   p95=round(_percentile(waits, 0.95), 3),
+                                   max=round(max(waits), 3))
+                classes[priority] = {
+                    'queued': sum(1 for job in jobs if job.status == 'queued'),
+                    'running': sum(1 for job in jobs if job.status == 'running'),
+                    'wait_seconds': summary
+                }
+            return {'workers': self.workers, 'preempted': self.preempted, 'coalesced': self.coalesced,
+                    'classes': classes}
+
+    def _admit_next(self) -> Optional[Job]:
+        """The first queued job in run order that may start now (called with the lock held)."""
+        for job_id in self._run_order():
+            job = self._jobs[job_id]
+            if self.admission is None:
+                return job
+            if job.memory_mb is None:
+                job.memory_mb = self.admission.estimate_mb(job.kind, job.args, job.kwargs)
+            if self.admission.try_admit(job.id, job.kind, job.memory_mb):
+                return job
+            if self.admission.held_back(job.id):
+                # Waited long enough: let running jobs drain instead of starting smaller ones
+                return None
+        return None
+
+    def _claim(self) -> Optional[Job]:
+        """Wait for the next job to run and mark it running; None once shut down with nothing to start."""
+        with self._lock:
+            while True:
+                job = self._admit_next()
+                if job is not None:
+                    self._pending.remove(job.id)
+                    self._running_by_user[job.user] += 1
+                    self._served_at[job.user] = time.time()
+                    job.status = 'running'
+                    job.started_at = time.time()
+                    if not job.preemptions:
+                        self._waits[job.priority].append(job.started_at - job.submitted_at)
+                    return job
+                if self._stopping and not self._pending:
+                    return None
+                self._idle += 1
+                # Jobs held back for memory are tried again as running jobs finish or shrink
+                self._lock.wait(SAMPLE_SECONDS if self._pending else None)
+                self._idle -= 1
+
+    def _should_yield(self, job: Job) -> bool:
+        """Whether a running batch job should make way: an interactive job waits and no worker is idle."""
+        with self._lock:
+            if self._idle or self._stopping:
+                return False
+            now = time.time()
+            return any(self._class(self._jobs[job_id], now) < self._class(job, now)
+                       for job_id in self._pending)
+
+    def _work(self) -> None:
+        while True:
+            job = self._claim()
+            if job is None:
+                break
+            logger.info(f"▶️  Running {job.priority} {job.kind} job {job.id}")
+            channel = self.bus.get(job.id) if self.bus is not None else None
+            journal = None
+            if self.store is not None:
+                self.store.mark_running(job.id, job.started_at)
+                journal = self.store.journal(job.id)
+                if self.preempt and job.priority != PRIORITIES[0]:
+                    journal.should_yield = lambda job=job: self._should_yield(job)
+            preempted = False
+            with progress.bind(channel), checkpoints.bind(journal):
+                progress.emit('job_started', job_kind=job.kind)
+                try:
+                    result = job.func(*job.args, **job.kwargs)
+                    status, error = 'done', None
+                except checkpoints.Preempted:
+                    preempted = True
+                    progress.emit('job_preempted')
+                except Exception as e:
+                    logger.error(f"❌ Job {job.id} failed: {e}")
+                    result, status, error = None, 'failed', str(e)
+                finally:
+                    if self.admission is not None:
+                        self.admission.release(job.id)
+                    with self._lock:
+                        self._running_by_user[job.user] -= 1
+                        # Its memory is free for the jobs held back
+                        self._lock.notify_all()
+            if preempted:
+                self._requeue(job)
+                continue
+            with self._lock:
+                job.result, job.error = result, error
+                job.status = status
+                job.finished_at = time.time()
+                job.func, job.args, job.kwargs = None, (), {}
+                if self._inflight.get(job.dedupe_key) == job.id:
+                    # Later identical requests start a fresh conversion
+                    del self._inflight[job.dedupe_key]
+                self._forget_old()
+            if self.store is not None:
+                self.store.mark_finished(job.id, status, job.finished_at, result, error)
+            # Final event only once the result can be collected
+            if channel is not None:
+                channel.publish(status, {'error': error} if error else {})
+
+    def _requeue(self, job: Job) -> None:
+        # Back to the queue under its original submission time; it resumes from its checkpoints
+        channel = self.bus.get(job.id) if self.bus is not None else None
+        if channel is not None:
+            # The rerun announces its files again and finishes the interrupted one
+            channel.reset_progress()
+        with self._lock:
+            job.status = 'queued'
+            job.started_at = None
+            job.preemptions += 1
+            self.preempted += 1
+            self._pending.append(job.id)
+            self._lock.notify()
+        if self.store is not None:
+            self.store.mark_queued(job.id)
+        logger.info(f"⏸️  Preempted {job.kind} job {job.id}, queued again")
+
+    def _forget_old(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers once the queued jobs have run."""
+        with self._lock:
+            self._stopping = True
+            self._lock.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
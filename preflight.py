@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Preflight - estimate what converting a DXF or HTML file will cost
+
+Reads a file's statistics without rendering it (entity counts, block
+inserts, extents and planned pages per scale mode for drawings; size and
+table counts for HTML) and predicts render time, peak memory and output
+size with the cost model calibrated on past conversions.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+from dxf_converter import DXFToPDFConverter
+from html2pdf import cost_model
+from html2pdf.cost_model import CostModel
+
+logger = logging.getLogger(__name__)
+
+DXF_SUFFIXES = {'.dxf'}
+HTML_SUFFIXES = {'.html', '.htm'}
+
+MAX_CACHED_STATS = 256
+# Rough size of one entity in a DXF file, for estimates that must not read the drawing
+DXF_BYTES_PER_ENTITY = 150
+
+_planners: Dict[str, DXFToPDFConverter] = {}
+# (path, mtime, size) -> statistics, so repeated estimates of a file read it once
+_stats_cache: Dict[tuple, Dict[str, Any]] = {}
+
+
+def _cache_key(path: Path) -> tuple:
+    stat = path.stat()
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def _cached(path: Path, analyse) -> Dict[str, Any]:
+    key = _cache_key(path)
+    stats = _stats_cache.get(key)
+    if stats is None:
+        stats = analyse(path)
+        if len(_stats_cache) >= MAX_CACHED_STATS:
+            _stats_cache.pop(next(iter(_stats_cache)), None)
+        _stats_cache[key] = stats
+    return dict(stats)
+
+
+def _planner(scale_mode: str) -> DXFToPDFConverter:
+    # Only used for bounds and page planning; never renders
+    if scale_mode not in _planners:
+        _planners[scale_mode] = DXFToPDFConverter(scale_mode=scale_mode)
+    return _planners[scale_mode]
+
+
+def analyse_dxf(dxf_path) -> Dict[str, Any]:
+    """
+    Statistics of a DXF drawing.
+
+    Args:
+        dxf_path: Path to the DXF file
+
+    Returns:
+        Dictionary with entity counts ('entities', 'by_type', 'inserts',
+        'blocks_used', 'virtual_entities'), 'extents' and, per scale mode,
+        the page 'regions' and the pages actually 'rendered' (capped by the
+        mode's max_pages)
+    """
+    return _cached(Path(dxf_path), _analyse_dxf)
+
+
+def _analyse_dxf(dxf_path: Path) -> Dict[str, Any]:
+    from ezdxf import recover
+
+    doc, auditor = recover.readfile(str(dxf_path))
+    msp = doc.modelspace()
+    standard = _planner('standard')
+    stats = standard.drawing_stats(doc, msp)
+
+    min_x, min_y, max_x, max_y = standard.get_drawing_bounds(msp)
+    stats['extents'] = {'min_x': min_x, 'min_y': min_y, 'max_x': max_x, 'max_y': max_y,
+                        'width': max_x - min_x, 'height': max_y - min_y}
+    stats['audit_errors'] = len(auditor.errors)
+    stats['pages'] = {}
+    for scale_mode, options in DXFToPDFConverter.SCALE_OPTIONS.items():
+        regions = len(_planner(scale_mode).calculate_page_regions(min_x, min_y, max_x, max_y))
+        stats['pages'][scale_mode] = {'regions': regions, 'rendered': min(regions, options['max_pages'])}
+    return stats
+
+
+def analyse_html(html_path) -> Dict[str, Any]:
+    """
+    Statistics of an HTML report.
+
+    Returns:
+        Dictionary with 'bytes', 'tables', 'rows', 'images' and 'struds'
+        (whether the native STRUDS renderer can take it)
+    """
+    return _cached(Path(html_path), cost_model.html_stats)
+
+
+def preflight(path, model: Optional[CostModel] = None) -> Dict[str, Any]:
+    """
+    Statistics and predicted conversion cost of one input file.
+
+    Args:
+        path: DXF or HTML file
+        model: Cost model to predict with (default: the active one, or an
+            uncalibrated model)
+
+    Returns:
+        Dictionary with 'file', 'kind', 'stats' and 'estimates': one
+        prediction per scale mode for drawings, a single one under
+        'default' for HTML. Each prediction has 'seconds', 'peak_mb',
+        'output_bytes' and 'calibrated_on'
+    """
+    path = Path(path)
+    model = model or cost_model.active() or CostModel()
+    suffix = path.suffix.lower()
+
+    if suffix in DXF_SUFFIXES:
+        stats = analyse_dxf(path)
+        estimates = {}
+        for scale_mode, pages in stats['pages'].items():
+            estimates[scale_mode] = dict(model.predict('dxf', dict(stats, pages=pages['rendered'])),
+                                         pages=pages['rendered'])
+        return {'file': path.name, 'kind': 'dxf', 'stats': stats, 'estimates': estimates}
+
+    if suffix in HTML_SUFFIXES:
+        stats = analyse_html(path)
+        return {'file': path.name, 'kind': 'html', 'stats': stats,
+                'estimates': {'default': model.predict('html', stats)}}
+
+    raise ValueError(f"Unsupported file type: {path.name}")
+
+
+def quick_estimate(path, estimate_key: str = 'standard', model: Optional[CostModel] = None) -> Dict[str, Any]:
+    """
+    Predicted conversion cost of a file without reading it.
+
+    Uses the full preflight statistics if they are cached already, and
+    otherwise statistics guessed from the file size alone: entities at
+    DXF_BYTES_PER_ENTITY, and one standard page growing with the square of
+    the scale factor. Cheap enough for request threads deciding whether and
+    when a job may run; the guess ignores block inserts, which admission
+    control makes up for by watching the memory actually used.
+
+    Args:
+        path: DXF or HTML file
+        estimate_key: Scale mode for drawings ('default' for HTML)
+        model: Cost model to predict with (default: the active one, or an
+            uncalibrated model)
+
+    Returns:
+        Prediction with 'seconds', 'peak_mb', 'output_bytes' and 'calibrated_on'
+    """
+    path = Path(path)
+    model = model or cost_model.active() or CostModel()
+    suffix = path.suffix.lower()
+    cached = _stats_cache.get(_cache_key(path))
+
+    if suffix in DXF_SUFFIXES:
+        options = DXFToPDFConverter.SCALE_OPTIONS.get(estimate_key, DXFToPDFConverter.SCALE_OPTIONS['standard'])
+        if cached is not None:
+            pages = cached['pages'][estimate_key]['rendered']
+            return model.predict('dxf', dict(cached, pages=pages))
+        stats = {'virtual_entities': path.stat().st_size / DXF_BYTES_PER_ENTITY,
+                 'pages': min(options['max_pages'], int(options['factor'] ** 2))}
+        return model.predict('dxf', stats)
+
+    if suffix in HTML_SUFFIXES:
+        return model.predict('html', cached if cached is not None else {'bytes': path.stat().st_size})
+
+    raise ValueError(f"Unsupported file type: {path.name}")
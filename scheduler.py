@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Cost-aware scheduling of DXF conversions on parallel workers
+
+Files are handed to the workers longest estimated job first (from the
+preflight cost model), so a large drawing never starts last and stretches
+the makespan. A drawing estimated to cost more than a worker's fair share
+of the batch is split into page batches that run on several workers and
+are joined afterwards. Results are reported in alphabetical order, so
+combined PDFs keep their order whatever order the work finished in.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+import math
+
+from html2pdf import cost_model
+from html2pdf.cost_model import CostModel
+
+logger = logging.getLogger(__name__)
+
+MIN_BATCH_PAGES = 4  # smallest page batch worth re-rendering a drawing for
+FALLBACK_SECONDS_PER_MB = 30.0  # cost estimate for drawings the analyser cannot read
+
+
+@dataclass
+class WorkItem:
+    """One task for a worker: a whole drawing or one batch of its pages."""
+    filename: str
+    path: Path
+    seconds: float  # estimated cost
+    page_range: Optional[Tuple[int, int]] = None  # None for the whole drawing
+
+
+def _estimate(path: Path, scale_mode: str, model: CostModel) -> Tuple[float, int, Optional[Dict[str, Any]]]:
+    """Estimated seconds, rendered pages and statistics of one drawing."""
+    from preflight import analyse_dxf
+
+    try:
+        stats = analyse_dxf(path)
+    except Exception as e:
+        # Unreadable drawings still get converted (and fail there with a proper error)
+        logger.warning(f"⚠️  No estimate for {path.name}, using its size: {e}")
+        return path.stat().st_size / (1024 * 1024) * FALLBACK_SECONDS_PER_MB, 0, None
+    pages = stats['pages'][scale_mode]['rendered']
+    return model.predict('dxf', dict(stats, pages=pages))['seconds'], pages, stats
+
+
+def plan(files: Dict[str, Path], scale_mode: str = 'standard', workers: int = 1,
+         model: Optional[CostModel] = None) -> List[WorkItem]:
+    """
+    Order the conversion of a set of drawings for a number of workers.
+
+    Args:
+        files: Filename -> path of the drawings
+        scale_mode: Scale mode they are converted with
+        workers: Number of workers the items are run on
+        model: Cost model to estimate with (default: the active one)
+
+    Returns:
+        Work items, longest estimated first; a drawing costing more than
+        the total over workers is split into page batches
+    """
+    model = model or cost_model.active() or CostModel()
+    estimates = {name: _estimate(Path(path), scale_mode, model) for name, path in files.items()}
+    fair_share = sum(seconds for seconds, _, _ in estimates.values()) / max(1, workers)
+
+    items = []
+    for name, (seconds, pages, stats) in estimates.items():
+        batches = 1
+        if workers > 1 and seconds > fair_share and pages >= 2 * MIN_BATCH_PAGES:
+            batches = min(workers, pages // MIN_BATCH_PAGES)
+        if batches == 1:
+            items.append(WorkItem(name, Path(files[name]), seconds))
+            continue
+
+        # Each batch renders the drawing once, then writes its own pages
+        size = math.ceil(pages / batches)
+        for start in range(0, pages, size):
+            stop = min(start + size, pages)
+            cost = model.predict('dxf', dict(stats, pages=stop - start))['seconds']
+            items.append(WorkItem(name, Path(files[name]), cost, (start, stop)))
+        logger.info(f"✂️  {name}: {pages} pages split into {batches} batches")
+
+    items.sort(key=lambda item: (-item.seconds, item.filename.lower(), item.page_range or (0, 0)))
+    return items
+
+
+def _part_path(pdf_path: Path, page_range: Tuple[int, int]) -> Path:
+    return pdf_path.with_name(f"{pdf_path.stem}.pages_{page_range[0] + 1:04d}.pdf")
+
+
+def run_scheduled(pool, files: Dict[str, Path], pdf_paths: Dict[str, Path], scale_mode: str = 'standard',
+                  model: Optional[CostModel] = None,
+                  on_done: Optional[Callable[[int, Dict[str, Any]], None]] = None) -> List[Dict[str, Any]]:
+    """
+    Convert drawings on a worker pool in cost order.
+
+    Args:
+        pool: Worker pool with a 'workers' count and submit(dxf_path, pdf_path,
+            scale_mode=..., page_range=...) returning a Future (WarmWorkerPool)
+        files: Filename -> path of the drawings, in the order of the results
+        pdf_paths: Filename -> output PDF
+        scale_mode: Scale mode of the conversion
+        model: Cost model to estimate with (default: the active one)
+        on_done: Called in this thread as on_done(index, result) as soon as
+            a drawing (all of its batches) is finished
+
+    Returns:
+        One result per drawing, in the order of files, with 'input',
+        'output' (path or error), 'success', 'pages' and 'batches'
+    """
+    from dxf_converter import DXFToPDFConverter
+
+    order = list(files)
+    items = plan(files, scale_mode, pool.workers, model)
+    logger.info(f"📋 Scheduled {len(items)} task(s) for {len(order)} drawing(s), longest first:")
+    for item in items:
+        span = f" pages {item.page_range[0] + 1}-{item.page_range[1]}" if item.page_range else ""
+        logger.info(f"   ~{item.seconds:.1f}s {item.filename}{span}")
+
+    futures = {}
+    parts: Dict[str, List[WorkItem]] = {}
+    for item in items:
+        pdf_path = Path(pdf_paths[item.filename])
+        target = _part_path(pdf_path, item.page_range) if item.page_range else pdf_path
+        future = pool.submit(item.path, target, scale_mode=scale_mode, page_range=item.page_range)
+        futures[future] = item
+        parts.setdefault(item.filename, []).append(item)
+
+    outcomes: Dict[str, List[Tuple[WorkItem, Dict[str, Any]]]] = {name: [] for name in order}
+    results: Dict[str, Dict[str, Any]] = {}
+    joiner = None
+    pending = set(futures)
+    while pending:
+        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in finished:
+            item = futures[future]
+            try:
+                outcome = future.result()
+            except Exception as e:
+                logger.error(f"Worker failed on {item.filename}: {str(e)}")
+                outcome = {'success': False, 'output': str(e), 'pages': 0}
+            outcomes[item.filename].append((item, outcome))
+            if len(outcomes[item.filename]) < len(parts[item.filename]):
+                continue
+
+            done = sorted(outcomes[item.filename], key=lambda pair: pair[0].page_range or (0, 0))
+            failed = [outcome for _, outcome in done if not outcome['success']]
+            pdf_path = Path(pdf_paths[item.filename])
+            if len(done) > 1:
+                if failed:
+                    for part_item, part in done:
+                        Path(_part_path(pdf_path, part_item.page_range)).unlink(missing_ok=True)
+                else:
+                    joiner = joiner or DXFToPDFConverter(scale_mode=scale_mode)
+                    joiner.join_parts(item.path, [part['output'] for _, part in done], pdf_path)
+            result = {
+                'input': item.filename,
+                'output': failed[0]['output'] if failed else str(pdf_path),
+                'success': not failed,
+                'pages': sum(part['pages'] for _, part in done) if not failed else 0,
+                'batches': len(done)
+            }
+            results[item.filename] = result
+            if on_done is not None:
+                on_done(order.index(item.filename), result)
+
+    return [results[name] for name in order]
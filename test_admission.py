@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""Test memory-aware admission control of conversion jobs."""
+
+import threading
+import time
+
+import admission as admission_module
+from admission import AdmissionController
+from jobs import JobManager
+from test_conversion_jobs import app_config, wait_for
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_jobs_wait_for_reserved_memory():
+    """A job that does not fit next to the running ones stays queued; a smaller one that fits starts first."""
+    estimates = {'big': 70, 'small': 20, 'huge': 500}
+    admission = AdmissionController(100, estimate=lambda kind, args, kwargs: estimates[kind],
+                                     memory_probe=lambda: 1000.0)
+    manager = JobManager(workers=3, admission=admission)
+    gates = {name: threading.Event() for name in ['first', 'second', 'third']}
+    try:
+        first = manager.submit('big', gates['first'].wait)
+        wait_until(lambda: manager.get(first.id).status == 'running')
+        second = manager.submit('big', gates['second'].wait)
+        third = manager.submit('small', gates['third'].wait)
+
+        # The second big job does not fit; the small one fits next to the first and passes it
+        wait_until(lambda: manager.get(third.id).status == 'running')
+        stats = admission.stats()
+        assert stats['reserved_mb'] == 90 and stats['headroom_mb'] == 10
+        assert stats['waiting'] == [second.id] and stats['queue_depth'] == 1
+        assert manager.get(second.id).status == 'queued' and manager.queue_position(second.id) == 1
+        assert manager.stats() == {'workers': 3, 'queued': 1, 'running': 2}
+
+        gates['first'].set()
+        wait_until(lambda: manager.get(second.id).status == 'running')
+        assert admission.stats()['reserved_mb'] == 90
+
+        # Larger than the whole budget: runs once nothing else is running
+        gates['second'].set()
+        huge = manager.submit('huge', lambda: 'done')
+        time.sleep(0.2)
+        assert manager.get(huge.id).status == 'queued'
+        gates['third'].set()
+        assert wait_for(manager, huge.id).result == 'done'
+        assert admission.stats()['running'] == [] and admission.waited == 2
+    finally:
+        for gate in gates.values():
+            gate.set()
+        manager.shutdown()
+    print("✅ Jobs wait until their estimated memory fits the budget")
+
+
+def test_interactive_job_not_stuck_behind_memory_wait():
+    """A small interactive job starts while a batch job waits for memory, without a free worker being held."""
+    estimates = {'batch_4x': 80, 'report': 1}
+    admission = AdmissionController(100, estimate=lambda kind, args, kwargs: estimates[kind],
+                                     memory_probe=lambda: 1000.0)
+    manager = JobManager(workers=2, admission=admission)
+    gate = threading.Event()
+    try:
+        first = manager.submit('batch_4x', gate.wait, priority='batch')
+        wait_until(lambda: manager.get(first.id).status == 'running')
+        second = manager.submit('batch_4x', lambda: 'second', priority='batch')
+        report = manager.submit('report', lambda: 'report', priority='interactive')
+        assert wait_for(manager, report.id, timeout=2).result == 'report'
+        assert manager.get(second.id).status == 'queued' and admission.stats()['waiting'] == [second.id]
+        gate.set()
+        assert wait_for(manager, second.id).result == 'second'
+    finally:
+        gate.set()
+        manager.shutdown()
+    print("✅ Interactive job ran while a batch job waited for memory")
+
+
+def test_long_memory_wait_stops_jobs_passing():
+    """Once a job has waited MAX_PASSED_SECONDS for memory, smaller jobs no longer start before it."""
+    estimates = {'big': 70, 'small': 20}
+    admission = AdmissionController(100, estimate=lambda kind, args, kwargs: estimates[kind],
+                                     memory_probe=lambda: 1000.0)
+    manager = JobManager(workers=3, admission=admission)
+    gate = threading.Event()
+    passed_seconds = admission_module.MAX_PASSED_SECONDS
+    admission_module.MAX_PASSED_SECONDS = 0
+    try:
+        first = manager.submit('big', gate.wait)
+        wait_until(lambda: manager.get(first.id).status == 'running')
+        second = manager.submit('big', lambda: 'second')
+        wait_until(lambda: admission.stats()['waiting'] == [second.id])
+        small = manager.submit('small', lambda: 'small')
+        time.sleep(0.2)
+        assert manager.get(small.id).status == 'queued'
+
+        gate.set()
+        assert wait_for(manager, small.id).result == 'small'
+        assert manager.get(second.id).started_at <= manager.get(small.id).started_at
+    finally:
+        admission_module.MAX_PASSED_SECONDS = passed_seconds
+        gate.set()
+        manager.shutdown()
+    print("✅ A job waiting too long for memory is no longer passed")
+
+
+def test_observed_memory_holds_back_jobs():
+    """Jobs using more than estimated block the queue by what the process actually grew."""
+    memory = {'mb': 500.0}
+    admission = AdmissionController(100, estimate=lambda kind, args, kwargs: 10,
+                                     memory_probe=lambda: memory['mb'])
+    manager = JobManager(workers=2, admission=admission)
+    gate = threading.Event()
+    try:
+        first = manager.submit('dxf', gate.wait)
+        wait_until(lambda: manager.get(first.id).status == 'running')
+        memory['mb'] = 595.0  # the running job grew the process by 95 MB
+        second = manager.submit('dxf', lambda: 'done')
+        wait_until(lambda: admission.stats()['queue_depth'] == 1)
+        stats = admission.stats()
+        assert stats['observed_mb'] == 95 and stats['in_use_mb'] == 95
+        assert stats['running'][0]['observed_peak_mb'] == 95
+
+        memory['mb'] = 520.0  # memory was given back
+        assert wait_for(manager, second.id).result == 'done'
+    finally:
+        gate.set()
+        manager.shutdown()
+    print("✅ Observed process growth counts against the budget")
+
+
+def test_admission_endpoint():
+    """GET /admission reports the budget, memory in use and queue depth."""
+    with app_config() as web:
+        status = web.app.test_client().get('/admission').get_json()
+    assert status['success'] and 'queued' in status['jobs']
+    if status['enabled']:
+        assert status['budget_mb'] > 0 and 'headroom_mb' in status and 'queue_depth' in status
+    print(f"✅ Admission status: {status}")
+
+
+if __name__ == "__main__":
+    test_jobs_wait_for_reserved_memory()
+    test_interactive_job_not_stuck_behind_memory_wait()
+    test_long_memory_wait_stops_jobs_passing()
+    test_observed_memory_holds_back_jobs()
+    test_admission_endpoint()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Test the file catalog: incremental updates, sorted pages and ETag caching."""
+
+import os
+from pathlib import Path
+import tempfile
+
+from catalog import FileCatalog
+from test_conversion_jobs import app_config
+from test_dxf_combine_modes import create_dxf
+from test_streaming_merger import write_synthetic_pdf
+
+
+def make_tree(tmp):
+    input_folder = Path(tmp) / "input"
+    output_folder = Path(tmp) / "output"
+    input_folder.mkdir()
+    (output_folder / "HTML_REPORTS" / "session_20250101_120000").mkdir(parents=True)
+    (output_folder / "DXF_DRAWINGS" / "session_20250101_120000").mkdir(parents=True)
+    (output_folder / "DXF_DRAWINGS" / "session_20250102_090000").mkdir(parents=True)
+    create_dxf(input_folder / "b_footing.dxf", 2500, 4000)
+    create_dxf(input_folder / "A_column.DXF", 4000, 2500)
+    (input_folder / "report.html").write_text("<html></html>")
+    (input_folder / "notes.txt").write_text("ignored")
+    (input_folder / ".hidden.dxf").write_text("ignored")
+    return input_folder, output_folder
+
+
+def test_queries_and_incremental_updates():
+    """Listings are sorted and paginated; only changes bump the generation."""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_folder, output_folder = make_tree(tmp)
+        write_synthetic_pdf(output_folder / "old.pdf", 0, pages=3)
+        write_synthetic_pdf(output_folder / "new.pdf", 0, pages=1)
+        os.utime(output_folder / "old.pdf", (1000, 1000))
+        catalog = FileCatalog(str(input_folder), str(output_folder))
+
+        assert catalog.names('inputs') == ['A_column.DXF', 'b_footing.dxf', 'report.html']
+        assert catalog.names('inputs', kind='html') == ['report.html']
+        assert catalog.names('outputs', sort='mtime', order='desc') == ['new.pdf', 'old.pdf']
+
+        sessions = catalog.listing('sessions', order='desc')
+        assert [s['name'] for s in sessions] == ['session_20250102_090000', 'session_20250101_120000']
+        assert sessions[1]['types'] == ['html', 'dxf']
+
+        page = catalog.query('outputs', sort='size', per_page=1, page=2, with_pages=True)
+        assert page['total'] == 2 and page['items'][0]['name'] == 'old.pdf'
+        assert page['items'][0]['pages'] == 3
+
+        # Nothing changed: same ETag; a new file changes it
+        etag = catalog.query('inputs')['etag']
+        assert catalog.query('inputs')['etag'] == etag
+        create_dxf(input_folder / "c_slab.dxf", 3000, 3000)
+        result = catalog.query('inputs')
+        assert result['etag'] != etag and result['total'] == 4
+
+        # A file rewritten in place is picked up after invalidate()
+        outputs_generation = catalog.generations['outputs']
+        write_synthetic_pdf(output_folder / "old.pdf", 0, pages=5)
+        catalog.invalidate()
+        page = catalog.query('outputs', sort='name', with_pages=True)
+        assert catalog.generations['outputs'] == outputs_generation + 1
+        assert [item['pages'] for item in page['items']] == [1, 5]
+    print("✅ Catalog lists, sorts, paginates and tracks changes")
+
+
+def test_etag_follows_the_listing():
+    """ETags differ for different listings and survive a restart for the same one."""
+    with tempfile.TemporaryDirectory() as tmp:
+        first, second = Path(tmp) / "first", Path(tmp) / "second"
+        first.mkdir()
+        second.mkdir()
+        (first / "x.dxf").write_text("0\nEOF\n")
+        (second / "y.dxf").write_text("0\nEOF\n")
+        (second / "z.html").write_text("<html></html>")
+
+        etag = FileCatalog(str(first), str(Path(tmp) / "output")).query('inputs')['etag']
+        assert FileCatalog(str(second), str(Path(tmp) / "output")).query('inputs')['etag'] != etag
+        # A new process with the same files answers with the same ETag
+        assert FileCatalog(str(first), str(Path(tmp) / "output")).query('inputs')['etag'] == etag
+        # A file rewritten in place changes it
+        (first / "x.dxf").write_text("0\nSECTION\n0\nEOF\n")
+        assert FileCatalog(str(first), str(Path(tmp) / "output")).query('inputs')['etag'] != etag
+    print("✅ ETags follow the listing, not the process")
+
+
+def test_mixed_case_suffixes():
+    """Inputs are recognised whatever the case of their suffix, by the catalog and by sessions."""
+    from unified_converter import UnifiedConverter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        input_folder = Path(tmp) / "input"
+        input_folder.mkdir()
+        create_dxf(input_folder / "a_column.Dxf", 4000, 2500)
+        (input_folder / "b_report.Html").write_text("<html></html>")
+        (input_folder / "c_report.hTm").write_text("<html></html>")
+        catalog = FileCatalog(str(input_folder), str(Path(tmp) / "output"))
+        assert catalog.names('inputs', kind='dxf') == ['a_column.Dxf']
+        assert catalog.names('inputs', kind='html') == ['b_report.Html', 'c_report.hTm']
+
+        files = UnifiedConverter(str(input_folder), str(Path(tmp) / "output")).scan_input_files()
+        assert files == {'html': ['b_report.Html', 'c_report.hTm'], 'dxf': ['a_column.Dxf']}
+    print("✅ Mixed-case suffixes are listed and converted")
+
+
+def test_catalog_endpoint_etag():
+    """The endpoint answers 304 while the listing is unchanged."""
+    with tempfile.TemporaryDirectory() as tmp, app_config() as app_module:
+        input_folder, output_folder = make_tree(tmp)
+        original = app_module.catalog
+        app_module.catalog = FileCatalog(str(input_folder), str(output_folder))
+        try:
+            client = app_module.app.test_client()
+            response = client.get('/catalog/inputs?sort=name&order=desc&per_page=2')
+            data = response.get_json()
+            assert [item['name'] for item in data['items']] == ['report.html', 'b_footing.dxf']
+            assert data['total'] == 3
+
+            etag = response.headers['ETag']
+            cached = client.get('/catalog/inputs?sort=name&order=desc&per_page=2',
+                                headers={'If-None-Match': etag})
+            assert cached.status_code == 304
+
+            (input_folder / "second.htm").write_text("<html></html>")
+            changed = client.get('/catalog/inputs?sort=name&order=desc&per_page=2',
+                                 headers={'If-None-Match': etag})
+            assert changed.status_code == 200 and changed.get_json()['total'] == 4
+
+            sessions = client.get('/get_session_folders').get_json()
+            assert sessions['sessions'] == ['session_20250102_090000', 'session_20250101_120000']
+            assert sessions['html_sessions'] == ['session_20250101_120000']
+            assert client.get('/catalog/unknown').status_code == 404
+        finally:
+            app_module.catalog = original
+    print("✅ Catalog endpoint supports conditional requests")
+
+
+if __name__ == "__main__":
+    test_queries_and_incremental_updates()
+    test_etag_follows_the_listing()
+    test_mixed_case_suffixes()
+    test_catalog_endpoint_etag()
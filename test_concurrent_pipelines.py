@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Test running the HTML and DXF pipelines of a session concurrently."""
+
+from pathlib import Path
+import tempfile
+
+from PyPDF2 import PdfReader
+
+from test_dxf_combine_modes import create_dxf
+from test_native_renderer import create_struds_report
+from unified_converter import UnifiedConverter
+
+
+def test_concurrent_session_matches_sequential():
+    """Both ways produce the same outputs and report per-pipeline durations."""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_folder = Path(tmp) / "input"
+        input_folder.mkdir()
+        create_dxf(input_folder / "a_column.dxf", 4000, 2500)
+        create_dxf(input_folder / "b_footing.dxf", 2500, 4000)
+        create_struds_report(input_folder / "beam_report.html", rows=150)
+
+        page_counts = {}
+        for concurrent in (True, False):
+            converter = UnifiedConverter(str(input_folder), str(Path(tmp) / str(concurrent)),
+                                         html_backend='native', concurrent=concurrent)
+            results = converter.convert_all_files()
+            summary = results['summary']
+
+            assert summary['overall_success'] and summary['html_successful'] == 1
+            assert summary['dxf_successful'] == 2 and summary['dxf_combined_pdf']
+            assert results['html_results']['duration_seconds'] == summary['html_duration_seconds'] > 0
+            assert results['dxf_results']['duration_seconds'] == summary['dxf_duration_seconds'] > 0
+            assert summary['duration_seconds'] >= max(summary['html_duration_seconds'],
+                                                      summary['dxf_duration_seconds'])
+            page_counts[concurrent] = (len(PdfReader(results['html_results']['output_path']).pages),
+                                       len(PdfReader(results['dxf_results']['combined_pdf']).pages))
+            print(f"⏱️  concurrent={concurrent}: {summary['duration_seconds']:.2f}s "
+                  f"(HTML {summary['html_duration_seconds']:.2f}s, DXF {summary['dxf_duration_seconds']:.2f}s)")
+
+        assert page_counts[True] == page_counts[False]
+    print("✅ Concurrent and sequential sessions agree")
+
+
+if __name__ == "__main__":
+    test_concurrent_session_matches_sequential()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Test the background job queue behind the conversion endpoints."""
+
+from contextlib import contextmanager
+from pathlib import Path
+import tempfile
+import threading
+import time
+
+from jobs import JobManager
+
+
+@contextmanager
+def app_config(**overrides):
+    """
+    The app with its cost model (and any overrides) pointed at a temporary
+    folder, so tests never calibrate the real LOGS/preflight_model.json.
+    """
+    import app as web
+    from html2pdf import cost_model
+
+    with tempfile.TemporaryDirectory() as tmp:
+        overrides.setdefault('PREFLIGHT_MODEL', str(Path(tmp) / "preflight_model.json"))
+        saved = {key: web.app.config[key] for key in overrides}
+        web.app.config.update(overrides)
+        cost_model.set_model(None)
+        try:
+            yield web
+        finally:
+            web.app.config.update(saved)
+            cost_model.set_model(None)
+
+
+def wait_for(manager, job_id, timeout=10):
+    """Poll a job until it finishes."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job_id} did not finish")
+
+
+def test_queue_positions_and_results():
+    """Jobs run in order; queued jobs report their position; errors fail the job only."""
+    manager = JobManager(workers=1)
+    gate = threading.Event()
+    try:
+        blocker = manager.submit('dxf', gate.wait)
+        second = manager.submit('html', lambda x: x * 2, 21)
+        third = manager.submit('unified', lambda: 1 / 0)
+
+        time.sleep(0.1)
+        assert manager.queue_position(blocker.id) == 0
+        assert manager.queue_position(second.id) == 1
+        assert manager.queue_position(third.id) == 2
+        assert manager.describe(second)['status'] == 'queued'
+
+        gate.set()
+        assert wait_for(manager, second.id).result == 42
+        failed = wait_for(manager, third.id)
+        assert failed.status == 'failed' and 'division' in failed.error
+        assert manager.queue_position(third.id) is None
+        assert [job['kind'] for job in manager.list_jobs()] == ['dxf', 'html', 'unified']
+    finally:
+        gate.set()
+        manager.shutdown()
+    print("✅ Job queue keeps order, positions and results")
+
+
+def test_endpoints_async_and_sync():
+    """Conversion endpoints return a job id, or the result itself with sync=true."""
+    with app_config() as web:
+        client = web.app.test_client()
+        response = client.post('/convert', json={'files': ['missing.dxf']})
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+
+        deadline = time.time() + 10
+        while True:
+            status = client.get(f'/jobs/{job_id}').get_json()
+            if status['status'] == 'done' or time.time() > deadline:
+                break
+            time.sleep(0.05)
+        assert status['status'] == 'done' and status['result']['total'] == 0
+
+        response = client.post('/convert', json={'files': ['missing.dxf'], 'sync': True})
+        assert response.status_code == 200 and response.get_json()['total'] == 0
+        assert client.get('/jobs/unknown').status_code == 404
+    print("✅ Endpoints queue jobs and still convert synchronously on request")
+
+
+if __name__ == "__main__":
+    test_queue_positions_and_results()
+    test_endpoints_async_and_sync()
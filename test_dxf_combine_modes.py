@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Test building COMBINED_ALL_DXF by merging or by dual output during rendering."""
+
+from pathlib import Path
+import tempfile
+
+import ezdxf
+from PyPDF2 import PdfReader
+
+from unified_converter import UnifiedConverter
+
+
+def create_dxf(path, width, height):
+    """Write a tiny drawing: a labelled rectangle of the given size."""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(0, 0), (width, 0), (width, height), (0, height)], close=True)
+    msp.add_text(path.stem, dxfattribs={'height': 150}).set_placement((200, 200))
+    doc.saveas(path)
+
+
+def page_sizes(reader):
+    """Rounded (width, height) of every page."""
+    return [(round(float(p.mediabox.width)), round(float(p.mediabox.height))) for p in reader.pages]
+
+
+def page_contents(reader):
+    """Content streams of every page (what was drawn, independent of metadata)."""
+    return [page.get_contents().get_data() for page in reader.pages]
+
+
+def test_combine_modes_produce_same_pages():
+    """Both modes build a combined PDF with every page, in alphabetical order."""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_folder = Path(tmp) / "input"
+        input_folder.mkdir()
+        # Different shapes so the page order can be checked from page contents
+        create_dxf(input_folder / "b_footing.dxf", 2500, 4000)
+        create_dxf(input_folder / "A_column.dxf", 4000, 2500)
+
+        page_counts = {}
+        for mode in ('merge', 'dual'):
+            converter = UnifiedConverter(str(input_folder), str(Path(tmp) / mode), combine_mode=mode)
+            results = converter.convert_all_files()['dxf_results']
+
+            assert results['combined_success'], results
+            combined = PdfReader(results['combined_pdf'])
+            singles = [PdfReader(str(converter.dxf_output_folder / f"{stem}_A4_landscape.pdf"))
+                       for stem in ("A_column", "b_footing")]
+            assert len(combined.pages) == sum(len(r.pages) for r in singles) == results['total_pages']
+            assert page_sizes(combined) == page_sizes(singles[0]) + page_sizes(singles[1])
+            assert page_contents(combined) == page_contents(singles[0]) + page_contents(singles[1])
+            page_counts[mode] = len(combined.pages)
+            print(f"📄 {mode}: {page_counts[mode]} combined pages")
+
+        assert page_counts['merge'] == page_counts['dual']
+    print("✅ Merge and dual combine modes agree")
+
+
+def test_dual_mode_leaves_failed_drawing_out():
+    """A drawing failing partway through leaves no pages in the dual-mode combined PDF."""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_folder = Path(tmp) / "input"
+        input_folder.mkdir()
+        create_dxf(input_folder / "a_column.dxf", 4000, 2500)
+        create_dxf(input_folder / "b_footing.dxf", 3000, 9000)
+        create_dxf(input_folder / "c_slab.dxf", 2500, 4000)
+
+        converter = UnifiedConverter(str(input_folder), str(Path(tmp) / "out"), combine_mode='dual')
+        render_page = converter.dxf_converter._render_page
+
+        def fail_on_second_footing_page(canvas, idx, region, region_count, total, outputs, file_name):
+            if file_name == "b_footing.dxf" and idx == 1:
+                raise RuntimeError("renderer crashed")
+            render_page(canvas, idx, region, region_count, total, outputs, file_name)
+
+        converter.dxf_converter._render_page = fail_on_second_footing_page
+        results = converter.convert_all_files()['dxf_results']
+
+        assert results['combined_success'] and results['failed'] == 1
+        combined = PdfReader(results['combined_pdf'])
+        singles = [PdfReader(str(converter.dxf_output_folder / f"{stem}_A4_landscape.pdf"))
+                   for stem in ("a_column", "c_slab")]
+        assert page_contents(combined) == page_contents(singles[0]) + page_contents(singles[1])
+    print("✅ Dual mode drops a failed drawing's partial pages from the combined PDF")
+
+
+if __name__ == "__main__":
+    test_combine_modes_produce_same_pages()
+    test_dual_mode_leaves_failed_drawing_out()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Test the hot-folder watcher: debouncing, change detection and incremental sessions."""
+
+import os
+from pathlib import Path
+import tempfile
+import time
+
+from PyPDF2 import PdfReader
+
+from hot_folder import HotFolderWatcher
+from test_dxf_combine_modes import create_dxf
+from test_native_renderer import create_struds_report
+
+
+def write_dxf(path, width, height, mtime):
+    create_dxf(path, width, height)
+    os.utime(path, (mtime, mtime))
+
+
+def test_watcher_converts_only_settled_changes():
+    """New, edited and deleted files each trigger one incremental session."""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_folder = Path(tmp) / "input"
+        input_folder.mkdir()
+        write_dxf(input_folder / "a_column.dxf", 4000, 2500, 1000)
+        write_dxf(input_folder / "b_footing.dxf", 2500, 4000, 1000)
+        create_struds_report(input_folder / "beam_report.html", rows=20)
+
+        watcher = HotFolderWatcher(str(input_folder), str(Path(tmp) / "output"),
+                                   settle_seconds=5, html_backend='native')
+        assert watcher.poll(now=0) is None  # just seen: may still be copying
+        first = watcher.poll(now=10)
+        assert sorted(first['changed']) == ['a_column.dxf', 'b_footing.dxf', 'beam_report.html']
+        assert first['incremental']['dxf']['rebuilt'] == ['a_column.dxf', 'b_footing.dxf']
+        assert watcher.poll(now=20) is None
+
+        # Touched but identical: no session
+        os.utime(input_folder / "a_column.dxf", (2000, 2000))
+        assert watcher.poll(now=30) is None
+        assert watcher.poll(now=40) is None
+
+        # One edit and one new file that is still being written
+        time.sleep(1.1)  # sessions are named by the second
+        write_dxf(input_folder / "b_footing.dxf", 2500, 4500, 3000)
+        write_dxf(input_folder / "c_slab.dxf", 3000, 3000, 3000)
+        assert watcher.poll(now=50) is None
+        write_dxf(input_folder / "c_slab.dxf", 3000, 3300, 3001)  # more bytes arrive
+        assert watcher.poll(now=58) is None  # b settled, c not: wait for c
+        second = watcher.poll(now=64)
+        assert sorted(second['changed']) == ['b_footing.dxf', 'c_slab.dxf']
+        assert second['incremental']['dxf'] == {'reused': ['a_column.dxf'],
+                                                'rebuilt': ['b_footing.dxf', 'c_slab.dxf']}
+        assert second['incremental']['html']['reused'] == ['beam_report.html']
+        combined = PdfReader(second['dxf_results']['combined_pdf'])
+        assert len(combined.pages) == second['dxf_results']['total_pages']
+
+        # A restarted watcher keeps its index; a deleted file leaves the combined PDF
+        time.sleep(1.1)
+        (input_folder / "a_column.dxf").unlink()
+        restarted = HotFolderWatcher(str(input_folder), str(Path(tmp) / "output"),
+                                     settle_seconds=5, html_backend='native')
+        third = restarted.poll(now=100)
+        assert third['removed'] == ['a_column.dxf'] and third['changed'] == []
+        assert third['input_files']['dxf'] == ['b_footing.dxf', 'c_slab.dxf']
+        assert third['incremental']['dxf']['rebuilt'] == []
+        assert restarted.poll(now=110) is None
+    print("✅ Hot folder converts settled changes incrementally")
+
+
+if __name__ == "__main__":
+    test_watcher_converts_only_settled_changes()
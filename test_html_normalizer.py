@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Test the STRUDS HTML normaliser."""
+
+from pathlib import Path
+import tempfile
+
+from html2pdf.normalizer import inject_stylesheet, is_struds_report, normalize_html
+
+STRUDS_SAMPLE = (
+    "<HTML><BODY><TABLE><TR><TD><B><FONT FACE = VERDANA COLOR = DARKORCHID SIZE = 2> PROJECT </FONT></B></TD>"
+    "<TD WIDTH = 100><B><FONT FACE = VERDANA COLOR = DARKORCHID SIZE = 2>: 1</FONT></B></TD></TR></TABLE >"
+    "<TABLE><TR><TH ALIGN = LEFT> <FONT FACE = VERDANA COLOR = FE00CC SIZE = 2> Soil Parameters :</TH></TR>"
+    "<TR><TD>SBC of soil</TD><TD> = 250.00 kN/m\xb2</TD></TR></TABLE></BODY></HTML>"
+)
+
+
+def test_inject_stylesheet_any_case():
+    """Stylesheet lands in the head whatever the tag case."""
+    css = "<style>x</style>"
+    assert inject_stylesheet("<HTML><HEAD><TITLE>t</TITLE></HEAD><BODY></BODY></HTML>", css) == \
+        "<HTML><HEAD><TITLE>t</TITLE><style>x</style></HEAD><BODY></BODY></HTML>"
+    assert inject_stylesheet("<HTML><BODY>x</BODY></HTML>", css).startswith(
+        "<HTML><head><style>x</style></head>")
+    assert inject_stylesheet("<TABLE></TABLE>", css) == \
+        "<html><head><style>x</style></head><body><TABLE></TABLE></body></html>"
+    print("✅ Stylesheet injection is case-insensitive")
+
+
+def test_normalize_struds_report():
+    """FONT wrappers are folded into cell classes and cp1252 text survives."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "nurseSAMPLE.html"
+        source.write_bytes(STRUDS_SAMPLE.encode('cp1252'))
+        output = Path(tmp) / "normalised.html"
+
+        assert is_struds_report(source)
+        stats = normalize_html(source, output, extra_css="<style>/*pdf*/</style>")
+        html = output.read_text(encoding='utf-8')
+
+        print(f"📄 {stats.bytes_before} -> {stats.bytes_after} bytes, "
+              f"{stats.elements_before} -> {stats.elements_after} elements")
+
+        assert stats.encoding == 'cp1252'
+        assert stats.elements_after < stats.elements_before
+        assert stats.folded_cells == 3
+        assert '<font' not in html.lower()
+        assert '<td class="b f1">PROJECT' in html
+        assert '<td width="100" class="b f1">: 1' in html
+        assert '<th align="LEFT" class="f2">Soil Parameters :' in html
+        assert 'kN/m\xb2' in html
+        assert html.index('/*pdf*/') < html.index('</head>')
+        assert '.f2 { font-family: VERDANA, sans-serif !important; color: #FE00CC !important;' in html
+    print("✅ STRUDS report normalised")
+
+
+if __name__ == "__main__":
+    test_inject_stylesheet_any_case()
+    test_normalize_struds_report()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Test incremental sessions: only changed inputs are re-rendered."""
+
+from pathlib import Path
+import tempfile
+import time
+
+from PyPDF2 import PdfReader
+
+from test_dxf_combine_modes import create_dxf, page_contents, page_sizes
+from test_native_renderer import create_struds_report
+from unified_converter import UnifiedConverter
+
+
+def run_session(input_folder, output_folder):
+    # Session folders are named by the second
+    time.sleep(1.1)
+    converter = UnifiedConverter(str(input_folder), str(output_folder),
+                                 html_backend='native', incremental=True)
+    return converter.convert_all_files()
+
+
+def test_unchanged_inputs_are_reused():
+    """A second session re-renders only the edited inputs and keeps the page order."""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_folder = Path(tmp) / "input"
+        output_folder = Path(tmp) / "output"
+        input_folder.mkdir()
+        create_dxf(input_folder / "a_column.dxf", 4000, 2500)
+        create_dxf(input_folder / "b_footing.dxf", 2500, 4000)
+        create_struds_report(input_folder / "report_1.html", rows=5)
+        create_struds_report(input_folder / "report_2.html", rows=5)
+
+        first = run_session(input_folder, output_folder)
+        assert first['incremental']['dxf']['reused'] == []
+        assert sorted(first['incremental']['dxf']['rebuilt']) == ['a_column.dxf', 'b_footing.dxf']
+        assert first['incremental']['html']['reused'] == []
+        first_combined = PdfReader(first['dxf_results']['combined_pdf'])
+        first_sizes, first_contents = page_sizes(first_combined), page_contents(first_combined)
+
+        # Edit one input of each kind
+        create_dxf(input_folder / "b_footing.dxf", 2500, 4200)
+        create_struds_report(input_folder / "report_2.html", rows=200)
+
+        second = run_session(input_folder, output_folder)
+        assert second['incremental']['dxf'] == {'reused': ['a_column.dxf'], 'rebuilt': ['b_footing.dxf']}
+        assert second['incremental']['html'] == {'reused': ['report_1.html'], 'rebuilt': ['report_2.html']}
+
+        dxf = second['dxf_results']
+        combined = PdfReader(dxf['combined_pdf'])
+        assert len(combined.pages) == dxf['total_pages']
+        reused_pages = next(r['pages'] for r in dxf['details'] if r['input'] == 'a_column.dxf')
+        assert page_sizes(combined)[:reused_pages] == first_sizes[:reused_pages]
+        assert page_contents(combined)[:reused_pages] == first_contents[:reused_pages]
+        assert all(Path(dxf['combined_pdf']).parent.joinpath(r['output']).exists() for r in dxf['details'])
+
+        html = second['html_results']
+        ranges = html['page_ranges']
+        assert ranges['report_1.html'] == [0, 1]
+        assert ranges['report_2.html'][1] == len(PdfReader(html['output_path']).pages) > 2
+        print(f"♻️  Reused {second['incremental']}")
+
+        # Nothing changed: everything is reused
+        third = run_session(input_folder, output_folder)
+        assert third['incremental']['dxf']['rebuilt'] == []
+        assert third['incremental']['html']['rebuilt'] == []
+        assert len(PdfReader(third['dxf_results']['combined_pdf']).pages) == len(combined.pages)
+    print("✅ Incremental sessions reuse unchanged inputs")
+
+
+def test_missing_previous_output_is_converted_again():
+    """An unchanged drawing whose previous PDF was deleted is rendered again instead of failing the session."""
+    with tempfile.TemporaryDirectory() as tmp:
+        input_folder = Path(tmp) / "input"
+        output_folder = Path(tmp) / "output"
+        input_folder.mkdir()
+        create_dxf(input_folder / "a_column.dxf", 4000, 2500)
+        create_dxf(input_folder / "b_footing.dxf", 2500, 4000)
+
+        first = run_session(input_folder, output_folder)
+        column = next(r for r in first['dxf_results']['details'] if r['input'] == 'a_column.dxf')
+        Path(first['dxf_results']['combined_pdf']).parent.joinpath(column['output']).unlink()
+
+        second = run_session(input_folder, output_folder)
+        assert second['incremental']['dxf'] == {'reused': ['b_footing.dxf'], 'rebuilt': ['a_column.dxf']}
+        dxf = second['dxf_results']
+        assert dxf['combined_success'] and dxf['failed'] == 0
+        assert len(PdfReader(dxf['combined_pdf']).pages) == dxf['total_pages']
+    print("✅ A vanished previous output is converted again")
+
+
+if __name__ == "__main__":
+    test_unchanged_inputs_are_reused()
+    test_missing_previous_output_is_converted_again()
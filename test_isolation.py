@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Test isolated DXF conversions: child processes with CPU, memory and wall-clock limits."""
+
+from pathlib import Path
+import json
+import tempfile
+
+import ezdxf
+from PyPDF2 import PdfReader
+
+from dxf_converter import DXFToPDFConverter
+from isolation import ResourceLimits, convert_isolated
+from test_dxf_combine_modes import create_dxf, page_contents
+
+
+def create_dense_dxf(path, lines=30000):
+    """A drawing with many entities, slow to render."""
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    for i in range(lines):
+        msp.add_line((i % 200 * 10, i // 200 * 10), (i % 200 * 10 + 8, i // 200 * 10 + 8))
+    doc.saveas(path)
+
+
+def test_isolated_conversion_matches_in_process():
+    """An isolated conversion writes the same pages and reports the child's resource usage."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        create_dxf(tmp / "column.dxf", 3000, 9000)
+        success, reference, pages = DXFToPDFConverter(output_folder=str(tmp / "ref")).convert_dxf_to_pdf(
+            tmp / "column.dxf")
+        assert success
+
+        result = convert_isolated(tmp / "column.dxf", output_folder=str(tmp / "out"))
+        assert result['success'] and result['status'] == 'ok', result
+        assert result['pages'] == pages
+        assert page_contents(PdfReader(result['output'])) == page_contents(PdfReader(reference))
+        usage = result['usage']
+        assert usage['cpu_seconds'] > 0 and usage['max_rss_mb'] > 10 and usage['wall_seconds'] > 0
+        assert result['limits']['memory_limit_mb'] == 4096
+    print(f"✅ Isolated conversion matches in-process output; usage {usage}")
+
+
+def test_limits_end_only_the_child():
+    """CPU, memory and wall-clock limits stop the child and are reported as such."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        create_dense_dxf(tmp / "dense.dxf")
+
+        cpu = convert_isolated(tmp / "dense.dxf", output_folder=str(tmp),
+                               limits=ResourceLimits(cpu_seconds=1, timeout_seconds=120))
+        assert not cpu['success'] and cpu['status'] == 'cpu_limit', cpu
+        # Reported CPU time is rounded and may land just under the limit
+        assert cpu['usage']['cpu_seconds'] >= 0.9
+
+        memory = convert_isolated(tmp / "dense.dxf", output_folder=str(tmp),
+                                  limits=ResourceLimits(memory_limit_mb=150, timeout_seconds=120))
+        assert not memory['success'] and memory['status'] == 'memory_limit', memory
+
+        timeout = convert_isolated(tmp / "dense.dxf", output_folder=str(tmp),
+                                   limits=ResourceLimits(timeout_seconds=0.3))
+        assert not timeout['success'] and timeout['status'] == 'timeout', timeout
+    print(f"✅ Limits: {cpu['status']}, {memory['status']}, {timeout['status']}")
+
+
+def test_batch_log_records_usage():
+    """An isolated batch writes each file's status and resource usage to the conversion log."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "input").mkdir()
+        create_dxf(tmp / "input" / "a_footing.dxf", 3000, 2000)
+        (tmp / "input" / "b_broken.dxf").write_text("not a drawing")
+        converter = DXFToPDFConverter(input_folder=str(tmp / "input"), output_folder=str(tmp / "out"),
+                                      log_folder=str(tmp / "logs"))
+        results = converter.batch_convert(limits=ResourceLimits())
+        assert [r['status'] for r in results] == ['ok', 'failed']
+        log = next((tmp / "logs").glob("conversion_log_*.txt")).read_text()
+        assert log.count("Resources: CPU") == 2 and "Status: failed" in log
+    print("✅ Conversion log records status and resource usage per file")
+
+
+def test_unified_session_log_records_usage():
+    """Unified sessions with limits record each drawing's resource usage in the session log."""
+    from unified_converter import UnifiedConverter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "input").mkdir()
+        create_dxf(tmp / "input" / "a_footing.dxf", 3000, 2000)
+        create_dxf(tmp / "input" / "b_column.dxf", 3000, 9000)
+        converter = UnifiedConverter(str(tmp / "input"), str(tmp / "out"), combine_mode='dual',
+                                     dxf_limits=ResourceLimits())
+        assert converter.combine_mode == 'merge'
+        session = converter.convert_all_files()
+        assert session['dxf_results']['combined_success']
+        log = json.loads(next(converter.logs_folder.glob("conversion_log_*.json")).read_text())
+        details = log['dxf_results']['details']
+        assert [d['status'] for d in details] == ['ok', 'ok']
+        assert all(d['usage']['cpu_seconds'] > 0 for d in details)
+    print("✅ Unified session log records the isolated conversions' resource usage")
+
+
+def test_unified_session_cleans_up_when_isolation_fails():
+    """An error starting the child leaves no merge thread or partial combined PDF behind."""
+    import threading
+    import isolation
+    from unified_converter import UnifiedConverter
+
+    def broken(*args, **kwargs):
+        raise OSError("cannot create temporary directory")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "input").mkdir()
+        create_dxf(tmp / "input" / "a_footing.dxf", 3000, 2000)
+        converter = UnifiedConverter(str(tmp / "input"), str(tmp / "out"), dxf_limits=ResourceLimits())
+        original, isolation.convert_isolated = isolation.convert_isolated, broken
+        try:
+            results = converter.convert_all_files()['dxf_results']
+        finally:
+            isolation.convert_isolated = original
+        assert not results['success'] and 'temporary directory' in results['error']
+        assert list(converter.dxf_output_folder.glob("COMBINED_ALL_DXF_*")) == []
+        assert not any(thread.name == 'pdf-merge' for thread in threading.enumerate())
+    print("✅ Failed isolated conversion aborts the combined PDF")
+
+
+if __name__ == "__main__":
+    test_isolated_conversion_matches_in_process()
+    test_limits_end_only_the_child()
+    test_batch_log_records_usage()
+    test_unified_session_log_records_usage()
+    test_unified_session_cleans_up_when_isolation_fails()
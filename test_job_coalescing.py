@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Test single-flight coalescing of identical conversion requests."""
+
+from pathlib import Path
+import tempfile
+import threading
+
+from job_store import JobStore
+from jobs import JobManager
+from test_admission import wait_until
+from test_conversion_jobs import app_config, wait_for
+
+
+def test_identical_requests_share_one_job():
+    """Requests with the same key attach to the unfinished job and get its result."""
+    manager = JobManager(workers=1)
+    gate = threading.Event()
+    runs = []
+
+    def convert(name):
+        runs.append(name)
+        gate.wait()
+        return {'success': True, 'output': f"{name}.pdf"}
+
+    try:
+        first = manager.submit('dxf', convert, 'footing', dedupe_key='footing@4x', priority='batch', user='alice')
+        wait_until(lambda: manager.get(first.id).status == 'running')
+        second = manager.submit('dxf', convert, 'footing', dedupe_key='footing@4x', user='bob')
+        queued = manager.submit('dxf', convert, 'column', dedupe_key='column@4x', priority='batch')
+        third = manager.submit('dxf', convert, 'column', dedupe_key='column@4x', priority='interactive')
+        assert second is first and third is queued
+        assert manager.get(queued.id).priority == 'interactive'  # promoted for the waiting user
+        assert manager.describe(first)['coalesced'] == 1
+
+        gate.set()
+        assert wait_for(manager, first.id).result == {'success': True, 'output': 'footing.pdf'}
+        assert wait_for(manager, queued.id).result['output'] == 'column.pdf'
+        assert runs == ['footing', 'column']
+        assert manager.queue_stats()['coalesced'] == 2
+
+        # Once finished, the same request converts again (the inputs may have changed since)
+        again = manager.submit('dxf', convert, 'footing', dedupe_key='footing@4x')
+        assert again.id != first.id
+        wait_for(manager, again.id)
+        assert runs == ['footing', 'column', 'footing']
+    finally:
+        gate.set()
+        manager.shutdown()
+    print("✅ Identical in-flight requests coalesced into one conversion")
+
+
+def test_concurrent_submissions_start_once():
+    """Many threads submitting the same work at once create a single job."""
+    manager = JobManager(workers=2)
+    gate = threading.Event()
+    jobs = []
+    try:
+        threads = [threading.Thread(target=lambda: jobs.append(manager.submit('html', gate.wait, dedupe_key='report')))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len({job.id for job in jobs}) == 1 and jobs[0].coalesced == 7
+    finally:
+        gate.set()
+        manager.shutdown()
+    print("✅ Concurrent identical submissions start one job")
+
+
+def test_resumed_job_keeps_its_key():
+    """After a restart, identical requests attach to the resumed job."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(str(Path(tmp) / "jobs.sqlite3"))
+        store.add_job('job-1', 'dxf', (['footing.dxf'], 'maximum_4x'), {}, 1.0, dedupe_key='footing@4x')
+        gate = threading.Event()
+        manager = JobManager(workers=1, store=store)
+        try:
+            assert manager.resume({'dxf': lambda files, scale_mode: gate.wait()}) == 1
+            assert manager.submit('dxf', print, dedupe_key='footing@4x').id == 'job-1'
+        finally:
+            gate.set()
+            manager.shutdown()
+    print("✅ Resumed jobs keep coalescing identical requests")
+
+
+def test_failed_persist_releases_the_key():
+    """If the job cannot be stored, identical requests start a new job instead of waiting on it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(str(Path(tmp) / "jobs.sqlite3"))
+        manager = JobManager(workers=1, store=store)
+        add_job = store.add_job
+        try:
+            def disk_full(*args, **kwargs):
+                raise OSError("database or disk is full")
+
+            store.add_job = disk_full
+            try:
+                manager.submit('dxf', lambda: 'done', dedupe_key='footing@4x')
+                assert False, "expected OSError"
+            except OSError:
+                pass
+            store.add_job = add_job
+            job = manager.submit('dxf', lambda: 'done', dedupe_key='footing@4x')
+            assert job.coalesced == 0 and wait_for(manager, job.id).result == 'done'
+        finally:
+            manager.shutdown()
+    print("✅ A job that could not be stored does not capture later requests")
+
+
+def test_fingerprint_follows_inputs_and_settings():
+    """The request key changes with the file contents and the conversion settings."""
+    with tempfile.TemporaryDirectory() as tmp, app_config(UPLOAD_FOLDER=tmp) as web:
+        drawing = Path(tmp) / "footing.dxf"
+        drawing.write_text("0\nEOF\n")
+        key = web.job_fingerprint('dxf', (['footing.dxf'], 'maximum_4x'))
+        assert key == web.job_fingerprint('dxf', (['footing.dxf'], 'maximum_4x'))
+        assert key != web.job_fingerprint('dxf', (['footing.dxf'], 'standard'))
+        drawing.write_text("0\nSECTION\n0\nEOF\n")
+        assert key != web.job_fingerprint('dxf', (['footing.dxf'], 'maximum_4x'))
+    print("✅ Request keys follow input contents and settings")
+
+
+if __name__ == "__main__":
+    test_identical_requests_share_one_job()
+    test_concurrent_submissions_start_once()
+    test_resumed_job_keeps_its_key()
+    test_failed_persist_releases_the_key()
+    test_fingerprint_follows_inputs_and_settings()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""Test priority classes, per-user fairness and preemption of conversion jobs."""
+
+from pathlib import Path
+import tempfile
+import threading
+
+from PyPDF2 import PdfReader
+
+from dxf_converter import DXFToPDFConverter
+from job_store import JobStore
+from jobs import JobManager
+from test_admission import wait_until
+from test_conversion_jobs import app_config, wait_for
+from test_dxf_combine_modes import create_dxf
+
+
+def test_interactive_first_then_fair_between_users():
+    """Interactive jobs jump the queue; within a class, users take turns."""
+    manager = JobManager(workers=1)
+    gate = threading.Event()
+    started = []
+    try:
+        blocker = manager.submit('dxf', gate.wait, priority='batch', user='carol')
+        wait_until(lambda: manager.get(blocker.id).status == 'running')
+        jobs = {
+            'alice_1': manager.submit('dxf', started.append, 'alice_1', priority='batch', user='alice'),
+            'alice_2': manager.submit('dxf', started.append, 'alice_2', priority='batch', user='alice'),
+            'bob_report': manager.submit('html', started.append, 'bob_report', priority='interactive', user='bob'),
+            'bob_1': manager.submit('dxf', started.append, 'bob_1', priority='batch', user='bob'),
+        }
+        expected = ['bob_report', 'alice_1', 'bob_1', 'alice_2']
+        assert [manager.queue_position(jobs[name].id) for name in expected] == [1, 2, 3, 4]
+        assert manager.describe(jobs['bob_report'])['priority'] == 'interactive'
+
+        gate.set()
+        for job in jobs.values():
+            wait_for(manager, job.id)
+        assert started == expected
+
+        stats = manager.queue_stats()
+        assert stats['classes']['interactive']['wait_seconds']['count'] == 1
+        batch_waits = stats['classes']['batch']['wait_seconds']
+        assert batch_waits['count'] == 4 and batch_waits['p50'] <= batch_waits['p95'] <= batch_waits['max']
+    finally:
+        gate.set()
+        manager.shutdown()
+    print(f"✅ Start order {started}; waits {stats['classes']}")
+
+
+def test_unknown_priority_is_rejected():
+    manager = JobManager(workers=1)
+    try:
+        manager.submit('dxf', lambda: None, priority='urgent')
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert 'urgent' in str(e)
+    finally:
+        manager.shutdown()
+    print("✅ Unknown priorities are rejected")
+
+
+def test_interactive_job_preempts_batch_at_page_boundary():
+    """A batch DXF job yields after a checkpointed page batch and later resumes from it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        dxf_path = tmp / "tall_footing.dxf"
+        create_dxf(dxf_path, 1000, 6000)
+        pdf_path = tmp / "tall_footing.pdf"
+        store = JobStore(str(tmp / "jobs.sqlite3"))
+        manager = JobManager(workers=1, store=store, preempt=True)
+
+        converter = DXFToPDFConverter(input_folder=str(tmp), output_folder=str(tmp), log_folder=str(tmp))
+        converter.CHECKPOINT_PAGES = 2
+        render_page = converter._render_page
+        rendered, order = [], []
+        first_page = threading.Event()
+        release = threading.Event()
+
+        def render_slowly(canvas, idx, *args):
+            if idx == 0:
+                first_page.set()
+                release.wait(5)
+            rendered.append(idx)
+            render_page(canvas, idx, *args)
+
+        converter._render_page = render_slowly
+
+        def convert():
+            success, output, pages = converter.convert_dxf_to_pdf(dxf_path, pdf_path)
+            order.append('batch')
+            return {'success': success, 'output': output, 'pages': pages}
+
+        try:
+            batch = manager.submit('dxf', convert, priority='batch', user='alice')
+            assert first_page.wait(10)
+            report = manager.submit('html', order.append, 'report', priority='interactive', user='bob')
+            release.set()
+
+            result = wait_for(manager, batch.id, timeout=120).result
+            assert manager.get(report.id).status == 'done'
+            assert order == ['report', 'batch']
+            assert result['success'] and manager.get(batch.id).preemptions == 1
+            # Pages 1-2 were checkpointed before yielding and not rendered again
+            assert rendered == list(range(result['pages'])) and result['pages'] > 2
+            assert len(PdfReader(result['output']).pages) == result['pages']
+            assert store.unfinished() == [] and manager.queue_stats()['preempted'] == 1
+        finally:
+            release.set()
+            manager.shutdown()
+    print(f"✅ Batch job yielded to the interactive job after page 2 of {result['pages']}")
+
+
+def test_batch_job_not_preempted_while_a_worker_is_free():
+    """With an idle worker, the interactive job simply runs there."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(str(Path(tmp) / "jobs.sqlite3"))
+        manager = JobManager(workers=2, store=store, preempt=True)
+        gate = threading.Event()
+        try:
+            batch = manager.submit('dxf', gate.wait, priority='batch')
+            wait_until(lambda: manager.get(batch.id).status == 'running')
+            report = manager.submit('html', lambda: 'done', priority='interactive')
+            assert wait_for(manager, report.id).result == 'done'
+            assert not manager._should_yield(manager.get(batch.id))
+        finally:
+            gate.set()
+            manager.shutdown()
+    print("✅ No preemption while a worker is idle")
+
+
+def test_queue_endpoint():
+    """GET /queue reports per-class queue depth and wait times."""
+    with app_config() as web:
+        status = web.app.test_client().get('/queue').get_json()
+    assert status['success'] and set(status['classes']) == {'interactive', 'batch'}
+    assert 'wait_seconds' in status['classes']['interactive']
+    print(f"✅ Queue status: {status}")
+
+
+if __name__ == "__main__":
+    test_interactive_first_then_fair_between_users()
+    test_unknown_priority_is_rejected()
+    test_interactive_job_preempts_batch_at_page_boundary()
+    test_batch_job_not_preempted_while_a_worker_is_free()
+    test_queue_endpoint()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Test the persistent job store and resuming interrupted jobs from checkpoints."""
+
+from pathlib import Path
+import tempfile
+import time
+
+from PyPDF2 import PdfReader
+
+from dxf_converter import DXFToPDFConverter
+from html2pdf import checkpoints
+from job_store import JobStore
+from jobs import JobManager
+from test_dxf_combine_modes import create_dxf
+from unified_converter import UnifiedConverter
+
+
+class Crash(Exception):
+    pass
+
+
+def test_dxf_resumes_after_last_page_batch():
+    """A restarted job renders only the pages after its last checkpointed batch."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        dxf_path = tmp / "tall_footing.dxf"
+        create_dxf(dxf_path, 1000, 6000)
+        pdf_path = tmp / "tall_footing.pdf"
+        store = JobStore(str(tmp / "jobs.sqlite3"))
+
+        converter = DXFToPDFConverter(input_folder=str(tmp), output_folder=str(tmp), log_folder=str(tmp))
+        converter.CHECKPOINT_PAGES = 2
+        render_page = converter._render_page
+        rendered = []
+
+        def crash_on_fifth_page(canvas, idx, *args):
+            if idx == 4 and not rendered[4:]:
+                raise Crash("server stopped")
+            rendered.append(idx)
+            render_page(canvas, idx, *args)
+
+        converter._render_page = crash_on_fifth_page
+        with checkpoints.bind(store.journal('job-1')):
+            success, error, _ = converter.convert_dxf_to_pdf(dxf_path, pdf_path)
+        assert not success and 'server stopped' in error
+        assert rendered == [0, 1, 2, 3]
+
+        # "Restart": a fresh journal loaded from the database
+        rendered.clear()
+        rendered.extend([None] * 5)  # let page 5 through this time
+        with checkpoints.bind(store.journal('job-1')):
+            success, output, pages = converter.convert_dxf_to_pdf(dxf_path, pdf_path)
+        assert success
+        assert rendered[5:] == list(range(4, pages))
+        assert len(PdfReader(output).pages) == pages > 4
+        assert PdfReader(output).metadata.title.startswith("tall_footing")
+        print(f"♻️  Resumed at page 5 of {pages}")
+
+        # Finished files are not converted again by the same job
+        rendered.clear()
+        with checkpoints.bind(store.journal('job-1')):
+            assert converter.convert_dxf_to_pdf(dxf_path, pdf_path) == (True, str(pdf_path), pages)
+        assert rendered == []
+
+
+def test_manager_resumes_unfinished_jobs():
+    """Jobs left queued or running are re-run under their ids; finished ones stay queryable."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(str(Path(tmp) / "jobs.sqlite3"))
+        store.add_job('old', 'echo', ('done before',), {}, time.time() - 10)
+        store.mark_finished('old', 'done', time.time() - 5, result={'value': 'done before'})
+        store.add_job('interrupted', 'echo', ('again',), {}, time.time())
+        store.mark_running('interrupted', time.time())
+        store.save_checkpoint('interrupted', 'step', 1)
+
+        seen = []
+
+        def echo(value):
+            seen.append(checkpoints.active().load('step'))
+            return {'value': value}
+
+        manager = JobManager(workers=1, store=JobStore(str(Path(tmp) / "jobs.sqlite3")))
+        try:
+            assert manager.resume({'echo': echo}) == 1
+            deadline = time.time() + 10
+            while not manager.get('interrupted').finished and time.time() < deadline:
+                time.sleep(0.01)
+            assert manager.get('interrupted').result == {'value': 'again'}
+            assert seen == [1]  # the job saw its checkpoint from before the restart
+            assert manager.get('old').result == {'value': 'done before'}
+            assert store.unfinished() == [] and store.load_checkpoints('interrupted') == {}
+        finally:
+            manager.shutdown()
+    print("✅ Interrupted jobs resume under their ids")
+
+
+def test_unified_session_resumes_in_same_folders():
+    """A resumed unified job keeps its session timestamp and merges the combined PDF."""
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JobStore(str(Path(tmp) / "jobs.sqlite3"))
+        with checkpoints.bind(store.journal('job-2')):
+            first = UnifiedConverter(str(Path(tmp) / "in"), str(Path(tmp) / "out"), combine_mode='dual')
+        time.sleep(1.1)
+        with checkpoints.bind(store.journal('job-2')):
+            resumed = UnifiedConverter(str(Path(tmp) / "in"), str(Path(tmp) / "out"))
+        assert resumed.timestamp == first.timestamp
+        assert first.combine_mode == 'merge'
+    print("✅ Resumed sessions continue in their folders")
+
+
+if __name__ == "__main__":
+    test_dxf_resumes_after_last_page_batch()
+    test_manager_resumes_unfinished_jobs()
+    test_unified_session_resumes_in_same_folders()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test the native reportlab renderer for STRUDS reports."""
+
+from pathlib import Path
+import tempfile
+
+from PyPDF2 import PdfReader
+
+from html2pdf.native_renderer import UnsupportedHTMLError, parse_report, render_report
+
+HEADER = "<B><FONT FACE = VERDANA COLOR = DARKORCHID SIZE = 2>"
+
+
+def create_struds_report(path, rows=200):
+    """Write a STRUDS-style report with one long table."""
+    body = [f"<P><U><B><H3><FONT FACE = VERDANA COLOR = MAROON>Beam Design Report :</H3></FONT></U></B>",
+            "<TABLE BORDER = 1><TR><TH>Beam</TH><TH>Span</TH><TH>A<SUB>st</SUB></TH></TR>"]
+    for i in range(rows):
+        body.append(f"<TR><TD>{HEADER}B{i}</FONT></B></TD><TD> {i * 0.25:.3f} m</TD>"
+                    f"<TD>= {100 + i} mm\xb2</TD>")
+    body.append("</TABLE><HR>End of report")
+    path.write_bytes(''.join(body).encode('cp1252'))
+
+
+def test_parse_report_table_model():
+    """Headings, table rows and cell styling are parsed into the model."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "nurseBEAM.html"
+        create_struds_report(source, rows=3)
+
+        blocks = parse_report(source)
+        kinds = [block.kind for block in blocks]
+        assert kinds == ['heading', 'table', 'rule', 'text'], kinds
+
+        table = blocks[1]
+        assert len(table.rows) == 4
+        assert all(cell.header for cell in table.rows[0])
+        first = table.rows[1][0]
+        assert first.plain_text == "B0" and first.uniform and first.bold and first.color == 'darkorchid'
+        assert table.rows[1][2].plain_text == "= 100 mm\xb2"
+        assert not table.rows[0][2].uniform  # A<sub>st</sub> needs a Paragraph
+    print("✅ STRUDS report parsed into table model")
+
+
+def test_render_repeats_header_rows():
+    """Long tables paginate on A4 with the header row on every page."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "nurseBEAM.html"
+        output = Path(tmp) / "nurseBEAM.pdf"
+        create_struds_report(source)
+
+        cells = render_report(source, output)
+        reader = PdfReader(str(output))
+        print(f"📄 {cells} cells -> {len(reader.pages)} pages")
+
+        assert cells == 3 + 200 * 3
+        assert len(reader.pages) > 1
+        for page in reader.pages:
+            assert "Span" in page.extract_text()
+        width, height = reader.pages[0].mediabox.width, reader.pages[0].mediabox.height
+        assert round(float(width)) == 595 and round(float(height)) == 842
+    print("✅ Header rows repeat on every page")
+
+
+def test_unrecognised_html_is_rejected():
+    """Ordinary HTML is left for the wkhtmltopdf fallback."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "report.html"
+        source.write_text("<html><body><h1>Report</h1><table><tr><td>x</td></tr></table></body></html>")
+        try:
+            render_report(source, Path(tmp) / "report.pdf")
+        except UnsupportedHTMLError:
+            print("✅ Non-STRUDS HTML falls back to wkhtmltopdf")
+            return
+        raise AssertionError("Expected UnsupportedHTMLError")
+
+
+def test_native_backend_faster_than_wkhtmltopdf():
+    """Both backends render the same reports; the native one must be clearly faster.
+
+    Only guards against the native backend losing its lead; it does not
+    establish the order-of-magnitude speedup (see HTML2PDF_README.md).
+    """
+    import shutil
+    import pytest
+    from benchmark_html_backends import benchmark_html_backends
+
+    if shutil.which('wkhtmltopdf') is None:
+        pytest.skip("wkhtmltopdf not found - backend comparison needs both backends")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(3):
+            create_struds_report(Path(tmp) / f"report_{i}.html", rows=300)
+        totals = benchmark_html_backends(tmp)
+    assert totals['native'] > 0 and totals['speedup'] is not None
+    assert totals['speedup'] > 2, totals
+    print(f"✅ Native backend {totals['speedup']:.1f}x faster than wkhtmltopdf")
+
+
+if __name__ == "__main__":
+    test_parse_report_table_model()
+    test_render_repeats_header_rows()
+    test_unrecognised_html_is_rejected()
+    test_native_backend_faster_than_wkhtmltopdf()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Test the reusable page canvas: same pages and viewports as per-page rendering, drawn once."""
+
+from pathlib import Path
+import tempfile
+
+import ezdxf
+from ezdxf.addons.drawing import Frontend
+from PyPDF2 import PdfReader
+
+from dxf_converter import DXFToPDFConverter, PageCanvas
+from test_dxf_combine_modes import create_dxf, page_sizes
+
+
+def render_recorded(converter, dxf_path, pdf_path):
+    """Convert, recording every page's region and axis limits and the number of draw_layout calls."""
+    pages, draws = [], []
+    render, draw_layout = PageCanvas.render, Frontend.draw_layout
+
+    def recording_render(canvas, region, margin_factor, outputs):
+        render(canvas, region, margin_factor, outputs)
+        pages.append((region, margin_factor, canvas.ax.get_xlim(), canvas.ax.get_ylim(), canvas.area_ratio))
+
+    def counting_draw_layout(frontend, *args, **kwargs):
+        draws.append(1)
+        return draw_layout(frontend, *args, **kwargs)
+
+    PageCanvas.render, Frontend.draw_layout = recording_render, counting_draw_layout
+    try:
+        success, output, count = converter.convert_dxf_to_pdf(dxf_path, pdf_path)
+    finally:
+        PageCanvas.render, Frontend.draw_layout = render, draw_layout
+    assert success, output
+    return count, pages, len(draws)
+
+
+def test_pages_match_per_page_layout():
+    """Page count and each page's view match the former per-page figures; the drawing is drawn once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        create_dxf(tmp / "tall_footing.dxf", 3000, 9000)
+        converter = DXFToPDFConverter(output_folder=str(tmp), scale_mode='enlarged_2x')
+
+        count, pages, draws = render_recorded(converter, tmp / "tall_footing.dxf", tmp / "out.pdf")
+
+        # Pagination is unchanged: one page per planned region
+        msp = ezdxf.readfile(str(tmp / "tall_footing.dxf")).modelspace()
+        regions = converter.calculate_page_regions(*converter.get_drawing_bounds(msp))
+        assert count == len(regions) == len(pages) > 1
+        assert [page[0] for page in pages] == regions
+
+        for region, margin_factor, (x0, x1), (y0, y1), area_ratio in pages:
+            # Former layout: the region plus margin_factor on each side, at equal scale
+            rx_min, ry_min, rx_max, ry_max = region
+            old_x = (rx_min - (rx_max - rx_min) * margin_factor, rx_max + (rx_max - rx_min) * margin_factor)
+            old_y = (ry_min - (ry_max - ry_min) * margin_factor, ry_max + (ry_max - ry_min) * margin_factor)
+            tolerance = 1e-6 * max(old_x[1] - old_x[0], old_y[1] - old_y[0])
+            # Same centre, the old view fully visible, widened on one axis only to fill the page
+            assert abs((x0 + x1) - sum(old_x)) < tolerance and abs((y0 + y1) - sum(old_y)) < tolerance
+            assert x0 <= old_x[0] + tolerance and x1 >= old_x[1] - tolerance
+            assert y0 <= old_y[0] + tolerance and y1 >= old_y[1] - tolerance
+            assert abs((x1 - x0) - (old_x[1] - old_x[0])) < tolerance or \
+                abs((y1 - y0) - (old_y[1] - old_y[0])) < tolerance
+            assert abs((x1 - x0) / (y1 - y0) - area_ratio) < 1e-6
+
+        # Every page is exactly A4 landscape
+        assert set(page_sizes(PdfReader(str(tmp / "out.pdf")))) == {(842, 595)}
+        # The modelspace is drawn once per drawing, not once per page
+        assert draws == 1
+    print(f"✅ {count} pages with the former viewports, drawn {draws} time(s)")
+
+
+def test_canvas_released_after_drawing():
+    """close() drops the figure's artists so nothing is kept between drawings."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        create_dxf(tmp / "column.dxf", 3000, 3000)
+        doc = ezdxf.readfile(str(tmp / "column.dxf"))
+        with PageCanvas(doc, doc.modelspace(), 297, 210, 10, 72) as canvas:
+            figure = canvas.figure
+            assert figure.axes and figure.axes[0].get_children()
+        assert canvas.figure is None and figure.axes == []
+    print("✅ Page canvas releases its figure")
+
+
+if __name__ == "__main__":
+    test_pages_match_per_page_layout()
+    test_canvas_released_after_drawing()
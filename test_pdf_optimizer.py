@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Test the size-optimised (compact) output profile."""
+
+from pathlib import Path
+import shutil
+import tempfile
+import tracemalloc
+
+import numpy as np
+from PIL import Image
+from PyPDF2 import PdfReader
+from reportlab import rl_config
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.pdfgen import canvas
+
+from html2pdf.merger import StreamingPdfMerger, merge_pdfs
+from html2pdf.optimizer import optimize_pdf
+from html2pdf.service import HTMLToPDFService
+
+
+def create_report_pdfs(folder, count=3):
+    """Write uncompressed per-report PDFs sharing one embedded font and one 1600px image."""
+    pdfmetrics.registerFont(TTFont('Vera', 'Vera.ttf'))
+    pixels = np.random.default_rng(0).integers(0, 256, (1600, 1600, 3), dtype=np.uint8)
+    logo = ImageReader(Image.fromarray(pixels))
+    files = []
+    rl_config.useA85 = 0  # raw binary streams, like wkhtmltopdf
+    for i in range(count):
+        path = Path(folder) / f"report{i}.pdf"
+        c = canvas.Canvas(str(path), pagesize=A4, pageCompression=0)
+        for page in range(2):
+            c.setFont('Vera', 10)
+            for line in range(50):
+                c.drawString(40, 800 - line * 12, f"Beam B{line} span 4.500 m Ast = 402 mm2")
+            c.drawImage(logo, 40, 40, width=300, height=300)
+            c.bookmarkPage(f"r{i}p{page}")
+            c.addOutlineEntry(f"Report {i} page {page}", f"r{i}p{page}")
+            c.showPage()
+        c.save()
+        files.append(path)
+    rl_config.useA85 = 1
+    return files
+
+
+def test_compact_profile_shrinks_merged_reports():
+    """Streams are compressed, shared resources deduplicated and images downsampled."""
+    with tempfile.TemporaryDirectory() as tmp:
+        merged = Path(tmp) / "combined.pdf"
+        assert merge_pdfs(create_report_pdfs(tmp), merged)
+
+        stats = optimize_pdf(merged, target_dpi=150)
+        print(f"📄 {stats.original_bytes:,} -> {stats.optimized_bytes:,} bytes "
+              f"({stats.reduction_percent:.0f}% smaller)")
+
+        assert stats.optimized_bytes == merged.stat().st_size
+        assert stats.optimized_bytes < stats.original_bytes / 2
+        assert stats.objects_deduplicated > 0
+        assert stats.images_downsampled == 1  # one image left after deduplication
+
+        reader = PdfReader(str(merged))
+        assert len(reader.pages) == 6
+        assert len(reader.outline) == 6
+        assert "Beam B0 span" in reader.pages[5].extract_text()
+        image = reader.pages[0]['/Resources']['/XObject']
+        image = list(image.values())[0].get_object()
+        assert image['/Width'] == round(A4[0] / 72 * 150)
+    print("✅ Compact profile shrinks the combined PDF")
+
+
+def test_reports_optimised_before_streaming_merge():
+    """Each report is optimised alone; the merge writes their shared font and image once."""
+    with tempfile.TemporaryDirectory() as tmp:
+        reports = create_report_pdfs(tmp)
+        whole = Path(tmp) / "whole.pdf"
+        assert merge_pdfs(reports, whole)
+        optimize_pdf(whole, target_dpi=150)
+
+        for report in reports:
+            optimize_pdf(report, target_dpi=150)
+        combined = Path(tmp) / "combined.pdf"
+        with StreamingPdfMerger(combined, dedupe=True) as merger:
+            for report in reports:
+                merger.append(report)
+        assert merger.deduplicated >= 2 * (len(reports) - 1)  # at least the font and the image
+
+        reader = PdfReader(str(combined))
+        assert len(reader.pages) == 6 and len(reader.outline) == 6
+        assert "Beam B0 span" in reader.pages[5].extract_text()
+        images = {page['/Resources'].get_object()['/XObject'].get_object().raw_get(name).idnum
+                  for page in reader.pages for name in page['/Resources'].get_object()['/XObject'].get_object()}
+        assert len(images) == 1
+        # As small as optimising the whole combined PDF
+        assert combined.stat().st_size < whole.stat().st_size * 1.1
+        print(f"✅ Per-report optimisation + dedupe merge: {combined.stat().st_size:,} bytes "
+              f"(whole-file optimisation: {whole.stat().st_size:,})")
+
+
+def test_compact_service_memory_bounded_by_one_report():
+    """The compact profile's peak memory follows one report, not the number of reports."""
+    with tempfile.TemporaryDirectory() as tmp:
+        reports = create_report_pdfs(tmp, count=2)
+        peaks = {}
+        for count in (2, 8):
+            service = HTMLToPDFService(str(Path(tmp) / "input"), str(Path(tmp) / f"out_{count}"),
+                                       output_profile='compact')
+            sources = []
+            for i in range(count):
+                sources.append(Path(tmp) / f"copy_{count}_{i}.pdf")
+                shutil.copy(reports[i % 2], sources[-1])
+
+            class PrebuiltConverter:
+                """Stands in for the renderer: hands out the prebuilt report PDFs."""
+                def __init__(self, *args, **kwargs):
+                    self.render_reports, self.backends_used = {}, {}
+
+                def convert_batch(self, html_files, on_converted):
+                    for index, pdf in enumerate(sources):
+                        on_converted(index, pdf)
+                    return sources, []
+
+                def cleanup(self):
+                    pass
+
+            import html2pdf.service as service_module
+            real_converter = service_module.HTMLConverter
+            service_module.HTMLConverter = PrebuiltConverter
+            service.scan_html_files = lambda: [Path(f"report{i}.html") for i in range(count)]
+            tracemalloc.start()
+            try:
+                result = service.convert_html_to_pdf()
+                peaks[count] = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+                service_module.HTMLConverter = real_converter
+            assert result['success'], result
+            assert len(PdfReader(result['output_path']).pages) == 2 * count
+            assert result['optimized_bytes'] < result['original_bytes'] / 2
+    print(f"📈 Peak traced memory: 2 reports {peaks[2] / 2**20:.1f} MB, 8 reports {peaks[8] / 2**20:.1f} MB")
+    assert peaks[8] < peaks[2] * 1.5
+    print("✅ Compact profile memory bounded by the largest report")
+
+
+if __name__ == "__main__":
+    test_compact_profile_shrinks_merged_reports()
+    test_reports_optimised_before_streaming_merge()
+    test_compact_service_memory_bounded_by_one_report()
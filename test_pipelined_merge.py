@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Test the pipelined merge that overlaps merging with conversion."""
+
+from pathlib import Path
+import tempfile
+import time
+
+from PyPDF2 import PdfReader
+
+from html2pdf.converter import HTMLConverter
+from html2pdf.merger import PipelinedMerger
+from test_streaming_merger import write_synthetic_pdf
+
+
+def test_out_of_order_completion_merges_in_order():
+    """Files finishing out of order are appended in sequence order, skipping failures."""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(5):
+            files.append(Path(tmp) / f"part{i}.pdf")
+            write_synthetic_pdf(files[-1], i, pages=1)
+
+        merger = PipelinedMerger(Path(tmp) / "combined.pdf", total=5)
+        merger.submit(1, files[1])
+        merger.submit(0, files[0])
+        time.sleep(0.2)
+        # Files 0 and 1 are merged while 2-4 are still "converting"
+        assert merger.merged_files == files[:2]
+
+        merger.submit(4, files[4])
+        merger.submit(3, None)  # failed conversion
+        merger.submit(2, files[2])
+        assert merger.finish()
+
+        reader = PdfReader(str(Path(tmp) / "combined.pdf"))
+        texts = [page.extract_text() for page in reader.pages]
+        assert texts == ["File 0 page 0", "File 1 page 0", "File 2 page 0", "File 4 page 0"], texts
+    print("✅ Pipelined merge keeps alphabetical order")
+
+
+def test_convert_batch_feeds_merger_as_files_finish():
+    """HTMLConverter reports each file as it finishes so merging overlaps conversion."""
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = []
+        for name in ("nurseA.html", "nurseB.html", "broken.html"):
+            sources.append(Path(tmp) / name)
+            sources[-1].write_bytes(b"<TABLE><TR><TD><B><FONT FACE = VERDANA SIZE = 2>"
+                                    + name.encode() + b"</FONT></B></TABLE>")
+
+        converter = HTMLConverter(Path(tmp) / "work", backend='native', wkhtmltopdf="/nonexistent")
+        merger = PipelinedMerger(Path(tmp) / "combined.pdf", total=len(sources))
+        events = []
+
+        def on_converted(index, pdf_path):
+            events.append((index, pdf_path is not None))
+            merger.submit(index, pdf_path)
+
+        # The broken file is not a STRUDS report and wkhtmltopdf is unavailable
+        sources[2].write_text("<html><body>plain</body></html>")
+        successful, failed = converter.convert_batch(sources, on_converted=on_converted)
+
+        assert events == [(0, True), (1, True), (2, False)]
+        assert len(successful) == 2 and len(failed) == 1
+        assert merger.finish()
+        assert len(PdfReader(str(Path(tmp) / "combined.pdf")).pages) == 2
+    print("✅ convert_batch feeds the merger file by file")
+
+
+if __name__ == "__main__":
+    test_out_of_order_completion_merges_in_order()
+    test_convert_batch_feeds_merger_as_files_finish()
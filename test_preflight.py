@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""Test the preflight analyser, the cost model's calibration and the preflight endpoints."""
+
+from pathlib import Path
+import tempfile
+
+import ezdxf
+
+from dxf_converter import DXFToPDFConverter
+from html2pdf import cost_model, normalizer
+from html2pdf.cost_model import CostModel, html_stats
+from preflight import preflight
+from test_conversion_jobs import app_config
+from test_dxf_combine_modes import create_dxf
+from test_native_renderer import create_struds_report
+
+
+def create_block_drawing(path):
+    """A drawing with a nested block inserted three times."""
+    doc = ezdxf.new()
+    bolt = doc.blocks.new('BOLT')
+    bolt.add_circle((0, 0), 5)
+    plate = doc.blocks.new('PLATE')
+    plate.add_lwpolyline([(0, 0), (100, 0), (100, 50), (0, 50)], close=True)
+    plate.add_blockref('BOLT', (20, 25))
+    plate.add_blockref('BOLT', (80, 25))
+    msp = doc.modelspace()
+    msp.add_line((0, 0), (6000, 1500))
+    for i in range(3):
+        msp.add_blockref('PLATE', (i * 2000, 0))
+    doc.saveas(path)
+
+
+def test_analysis():
+    """Entity counts include block contents; pages are planned per scale mode; HTML tags are counted."""
+    with tempfile.TemporaryDirectory() as tmp:
+        dxf_path = Path(tmp) / "plates.dxf"
+        create_block_drawing(dxf_path)
+        result = preflight(dxf_path, CostModel())
+        stats = result['stats']
+        assert result['kind'] == 'dxf'
+        assert stats['entities'] == 4 and stats['inserts'] == 3
+        assert stats['by_type'] == {'INSERT': 3, 'LINE': 1}
+        assert stats['blocks_used'] == 2
+        assert stats['virtual_entities'] == 1 + 3 * 3
+        assert stats['extents']['width'] > 4000
+        assert set(result['estimates']) == set(DXFToPDFConverter.SCALE_OPTIONS)
+        pages = stats['pages']
+        assert pages['standard']['rendered'] <= pages['enlarged_2x']['rendered'] <= pages['maximum_4x']['rendered']
+        assert result['estimates']['maximum_4x']['seconds'] > result['estimates']['standard']['seconds']
+
+        html_path = Path(tmp) / "report.html"
+        create_struds_report(html_path, rows=300)
+        expected_rows = html_path.read_bytes().upper().count(b'<TR')
+        whole = html_stats(html_path)
+        # Tags split across chunk boundaries are counted once
+        chunk_size = normalizer.CHUNK_SIZE
+        normalizer.CHUNK_SIZE = 7
+        try:
+            chunked = html_stats(html_path)
+        finally:
+            normalizer.CHUNK_SIZE = chunk_size
+        assert whole == chunked
+        assert whole['tables'] == 1 and whole['rows'] == expected_rows and whole['struds']
+        assert preflight(html_path, CostModel())['estimates']['default']['output_bytes'] > 0
+    print("✅ Preflight statistics are correct for drawings and HTML")
+
+
+def test_calibration_on_past_runs():
+    """Conversions calibrate the active model; estimates then track the real cost."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        model_path = tmp / "model.json"
+        cost_model.set_model(CostModel(str(model_path)))
+        try:
+            converter = DXFToPDFConverter(output_folder=str(tmp / "out"))
+            for i, height in enumerate([2000, 6000, 12000, 20000]):
+                create_dxf(tmp / f"drawing_{i}.dxf", 4000, height)
+                success, output, pages = converter.convert_dxf_to_pdf(tmp / f"drawing_{i}.dxf")
+                assert success, output
+        finally:
+            cost_model.set_model(None)
+
+        model = CostModel(str(model_path))
+        assert len(model.observations['dxf']) == 4
+        create_dxf(tmp / "probe.dxf", 4000, 9000)
+        estimate = preflight(tmp / "probe.dxf", model)['estimates']['standard']
+        assert estimate['calibrated_on']['seconds'] == 4
+        success, output, pages = converter.convert_dxf_to_pdf(tmp / "probe.dxf")
+        actual_bytes = Path(output).stat().st_size
+        assert estimate['pages'] == pages
+        assert 0.5 < estimate['output_bytes'] / actual_bytes < 2, (estimate, actual_bytes)
+    print(f"✅ Calibrated estimate {estimate['output_bytes']} bytes vs {actual_bytes} actual")
+
+
+def test_peak_memory_only_from_lone_conversions():
+    """Peaks come from samples during the render, are never negative, and overlapping runs record none."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        create_dxf(tmp / "column.dxf", 3000, 9000)
+        model = CostModel()
+        cost_model.set_model(model)
+        try:
+            converter = DXFToPDFConverter(output_folder=str(tmp / "out"))
+            assert converter.convert_dxf_to_pdf(tmp / "column.dxf")[0]
+            with cost_model.PeakMemory() as other:  # e.g. another job's render in this process
+                assert converter.convert_dxf_to_pdf(tmp / "column.dxf")[0]
+        finally:
+            cost_model.set_model(None)
+
+    alone, overlapped = model.observations['dxf']
+    assert alone['peak_mb'] >= 0 and 'peak_mb' not in overlapped
+    assert other.peak_mb is None and cost_model._measurements == []
+
+    freed = cost_model.PeakMemory()
+    freed.baseline, freed.highest = 500.0, 480.0  # memory given back since the start
+    assert freed.peak_mb == 0.0
+    freed.close()
+    print(f"✅ Peak {alone['peak_mb']} MB recorded alone, none when overlapped")
+
+
+def test_quick_estimate_reads_no_drawing():
+    """Quick estimates come from the file size until full statistics are cached."""
+    import preflight as preflight_module
+
+    with tempfile.TemporaryDirectory() as tmp:
+        dxf_path = Path(tmp) / "column.dxf"
+        create_dxf(dxf_path, 3000, 9000)
+        model = CostModel()
+        cached = len(preflight_module._stats_cache)
+
+        guess = preflight_module.quick_estimate(dxf_path, 'maximum_4x', model)
+        assert guess['peak_mb'] > 0 and guess['seconds'] > 0
+        assert len(preflight_module._stats_cache) == cached  # the drawing was not parsed
+
+        full = preflight(dxf_path, model)
+        assert preflight_module.quick_estimate(dxf_path, 'maximum_4x', model) == \
+            {k: v for k, v in full['estimates']['maximum_4x'].items() if k != 'pages'}
+    print(f"✅ Quick estimate {guess} without parsing the drawing")
+
+
+def test_endpoints():
+    """GET /preflight/<file> and POST /preflight answer with estimates and totals."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        (tmp / "input").mkdir()
+        create_dxf(tmp / "input" / "column.dxf", 3000, 9000)
+        create_struds_report(tmp / "input" / "beams.html", rows=50)
+        with app_config(UPLOAD_FOLDER=str(tmp / "input"), OUTPUT_FOLDER=str(tmp / "out"),
+                        PREFLIGHT_MODEL=str(tmp / "model.json")) as app_module:
+            original = app_module.catalog
+            app_module.catalog = app_module.FileCatalog(str(tmp / "input"), str(tmp / "out"))
+            client = app_module.app.test_client()
+            try:
+                single = client.get('/preflight/column.dxf').get_json()
+                assert single['success'] and single['kind'] == 'dxf'
+                assert single['estimates']['standard']['pages'] == single['stats']['pages']['standard']['rendered']
+                assert client.get('/preflight/missing.dxf').status_code == 404
+
+                batch = client.post('/preflight', json={'scale_mode': 'enlarged_2x'}).get_json()
+                assert batch['success'] and [f['file'] for f in batch['files']] == ['beams.html', 'column.dxf']
+                expected = batch['files'][0]['estimates']['default']['output_bytes'] + \
+                    batch['files'][1]['estimates']['enlarged_2x']['output_bytes']
+                assert batch['totals']['output_bytes'] == expected
+            finally:
+                app_module.catalog = original
+    print("✅ Preflight endpoints return per-file estimates and totals")
+
+
+if __name__ == "__main__":
+    test_analysis()
+    test_calibration_on_past_runs()
+    test_peak_memory_only_from_lone_conversions()
+    test_quick_estimate_reads_no_drawing()
+    test_endpoints()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Test the progress event bus and its Server-Sent Events endpoint."""
+
+from pathlib import Path
+import tempfile
+import time
+
+from dxf_converter import DXFToPDFConverter
+from html2pdf import progress
+from html2pdf.progress import ProgressBus, ProgressChannel
+from job_store import JobStore
+from jobs import JobManager
+from test_conversion_jobs import app_config
+from test_dxf_combine_modes import create_dxf
+
+
+def test_channel_progress_and_eta():
+    """Pages credit their share of a file; file_done credits the rest."""
+    channel = ProgressChannel('job')
+    with progress.bind(channel):
+        progress.expect_files(2)
+        progress.emit('file_started', file='a.dxf')
+        progress.emit('page', file='a.dxf', page=1, total=4)
+        progress.emit('file_done', file='a.dxf')
+        progress.emit('file_started', file='b.html')
+    progress.emit('page', file='outside.dxf', page=1, total=1)  # no job: dropped
+
+    events = channel.read()
+    assert [e['kind'] for e in events] == ['file_started', 'page', 'file_done', 'file_started']
+    assert [e['seq'] for e in events] == [1, 2, 3, 4]
+    assert events[1]['progress'] == 0.125 and 'eta_seconds' in events[1]
+    assert events[2]['progress'] == 0.5
+    assert [e['seq'] for e in channel.read(after=3)] == [4]
+    assert channel.read(after=4, timeout=0.05) == []
+    print("✅ Progress and ETA follow pages and files")
+
+
+def test_emit_cost_is_negligible():
+    """Emitting outside a job is cheap next to rendering a page."""
+    start = time.perf_counter()
+    for i in range(100000):
+        progress.emit('page', file='a.dxf', page=i, total=100000)
+    per_call = (time.perf_counter() - start) / 100000
+    print(f"⏱️  emit() without a job: {per_call * 1e6:.2f} µs")
+    assert per_call < 20e-6
+
+
+def test_disconnected_clients_leave_nothing_behind():
+    """Readers hold no state in the bus; finished channels are bounded."""
+    bus = ProgressBus(max_closed=3)
+    channel = bus.open('job-0')
+    channel.publish('file_started', {'file': 'a.dxf'})
+    stream = bus.stream('job-0', heartbeat=0.05)
+    assert next(stream)['kind'] == 'file_started'
+    assert next(stream) is None  # heartbeat while idle
+    stream.close()  # client went away
+    channel.publish('done', {})
+    assert [e['kind'] for e in bus.stream('job-0')] == ['file_started', 'done']
+
+    for i in range(1, 10):
+        bus.open(f'job-{i}').publish('done', {})
+    assert len(bus._channels) <= 4
+    print("✅ Streams keep no per-client state")
+
+
+def test_dxf_job_streams_page_events():
+    """A DXF job reports file, page and final events over SSE."""
+    with app_config() as web, tempfile.TemporaryDirectory() as tmp:
+        dxf_path = Path(tmp) / "tall_footing.dxf"
+        create_dxf(dxf_path, 1000, 6000)
+
+        def convert():
+            return web.get_dxf_converter('standard').convert_dxf_to_pdf(dxf_path, Path(tmp) / "out.pdf")
+
+        job = web.get_job_manager().submit('dxf', convert)
+        client = web.app.test_client()
+        body = client.get(f'/jobs/{job.id}/events').get_data(as_text=True)
+
+    kinds = [line.split(': ', 1)[1] for line in body.splitlines() if line.startswith('event: ')]
+    print(f"📡 Events: {kinds}")
+    assert kinds[0] == 'job_started' and kinds[-1] == 'done'
+    assert kinds.count('page') == job.result[2] > 1
+    assert 'file_started' in kinds and 'file_done' in kinds
+    assert client.get('/jobs/unknown/events').status_code == 404
+
+
+def test_preempted_job_progress_reaches_one():
+    """After a preemption, the rerun neither doubles the file total nor counts the interrupted file twice."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        create_dxf(tmp / "tall_footing.dxf", 1000, 6000)
+        converter = DXFToPDFConverter(input_folder=str(tmp), output_folder=str(tmp), log_folder=str(tmp))
+        converter.CHECKPOINT_PAGES = 2
+        bus = ProgressBus()
+        manager = JobManager(workers=1, bus=bus, store=JobStore(str(tmp / "jobs.sqlite3")), preempt=True)
+        yields = []
+
+        def yield_once(job):
+            yields.append(job.id)
+            return len(yields) == 1
+
+        manager._should_yield = yield_once
+
+        def convert():
+            progress.expect_files(1)
+            return converter.convert_dxf_to_pdf(tmp / "tall_footing.dxf", tmp / "out.pdf")
+
+        try:
+            job = manager.submit('dxf', convert)
+            events = list(bus.stream(job.id))
+        finally:
+            manager.shutdown()
+
+    kinds = [e['kind'] for e in events]
+    assert kinds.count('job_preempted') == 1 and kinds[-1] == 'done'
+    assert kinds.count('file_started') == 2 and kinds.count('file_done') == 1
+    fractions = [e['progress'] for e in events if 'progress' in e]
+    assert fractions[-1] == 1.0 and max(fractions) == 1.0
+    assert bus.get(job.id).files_total == 1
+    print(f"✅ Progress after preemption: {fractions[-1]} with one file counted once")
+
+
+if __name__ == "__main__":
+    test_channel_progress_and_eta()
+    test_emit_cost_is_negligible()
+    test_disconnected_clients_leave_nothing_behind()
+    test_dxf_job_streams_page_events()
+    test_preempted_job_progress_reaches_one()
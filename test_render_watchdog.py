@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Test per-file watchdog timeouts and the degraded retry for HTML renders."""
+
+from pathlib import Path
+import os
+import stat
+import sys
+import tempfile
+import time
+
+from html2pdf.converter import HTMLConverter
+from html2pdf.watchdog import RenderTimeout, run_with_limits
+
+# Stand-in for wkhtmltopdf: hangs (with a child process) while JavaScript is
+# enabled, otherwise writes a minimal PDF to the last argument
+FAKE_WKHTMLTOPDF = f"""#!{sys.executable}
+import subprocess, sys, time
+if '--enable-javascript' in sys.argv:
+    subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])
+    time.sleep(60)
+with open(sys.argv[-1], 'wb') as f:
+    f.write(b'%PDF-1.4\\n%%EOF\\n')
+"""
+
+
+def make_fake_wkhtmltopdf(folder):
+    """Write the fake renderer script and make it executable."""
+    script = Path(folder) / "wkhtmltopdf"
+    script.write_text(FAKE_WKHTMLTOPDF)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    return script
+
+
+def test_timeout_kills_process_group():
+    """A hung command and its children are killed once the timeout expires."""
+    with tempfile.TemporaryDirectory() as tmp:
+        pid_file = Path(tmp) / "child.pid"
+        start = time.perf_counter()
+        try:
+            run_with_limits([sys.executable, '-c',
+                             'import subprocess, sys, time;'
+                             'p = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(60)"]);'
+                             f'open({str(pid_file)!r}, "w").write(str(p.pid)); time.sleep(60)'], timeout=1)
+        except RenderTimeout as e:
+            elapsed = time.perf_counter() - start
+            print(f"⏱️  {e} ({elapsed:.1f}s)")
+            assert elapsed < 10
+            if Path('/proc').exists():
+                child = int(pid_file.read_text())
+                time.sleep(0.2)
+                try:
+                    os.kill(child, 0)
+                    # Orphans may linger as zombies until reaped by init
+                    assert Path(f"/proc/{child}/status").read_text().find("zombie") != -1
+                except ProcessLookupError:
+                    pass
+            print("✅ Hung renderer and its children killed")
+            return
+    raise AssertionError("Expected RenderTimeout")
+
+
+def test_hung_render_retries_with_degraded_profile():
+    """A file that hangs on the normal profile succeeds on the cheaper retry."""
+    if os.name != 'posix':
+        print("⚠️  Skipping: fake renderer script needs POSIX")
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        fake = make_fake_wkhtmltopdf(tmp)
+        source = Path(tmp) / "report.html"
+        source.write_text("<html><body><p>Report</p></body></html>")
+
+        converter = HTMLConverter(Path(tmp) / "work", timeout=1, wkhtmltopdf=str(fake))
+        successful, failed = converter.convert_batch([source])
+        report = converter.render_reports["report.html"]
+        print(f"📄 {report.status}: {[(a['profile'], a['status']) for a in report.attempts]}")
+
+        assert not failed and len(successful) == 1
+        assert report.status == 'degraded'
+        assert [a['status'] for a in report.attempts] == ['timeout', 'ok']
+        assert report.duration_seconds >= 1
+    print("✅ Degraded retry recovered the hung render")
+
+
+def test_memory_limit_set_on_the_renderer():
+    """The renderer runs under the address-space limit, set without a preexec_fn."""
+    if not Path('/proc').exists():
+        print("⚠️  Skipping: rlimits are set with prlimit, Linux only")
+        return
+    stderr = run_with_limits([sys.executable, '-c',
+                              'import resource, sys, time; time.sleep(0.5);'
+                              'sys.stderr.write(str(resource.getrlimit(resource.RLIMIT_AS)[0]));'
+                              'blocks = [bytearray(64 * 2**20) for _ in range(8)]'],
+                             timeout=30, memory_limit_mb=256)
+    assert stderr.startswith(str(256 * 2**20)) and 'MemoryError' in stderr, stderr
+    print("✅ Renderer memory limited to 256 MB")
+
+
+if __name__ == "__main__":
+    test_timeout_kills_process_group()
+    test_hung_render_retries_with_degraded_profile()
+    test_memory_limit_set_on_the_renderer()
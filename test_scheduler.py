@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Test cost-aware scheduling: largest jobs first, page batches, alphabetical assembly."""
+
+from pathlib import Path
+import tempfile
+
+from PyPDF2 import PdfReader
+
+from dxf_converter import DXFToPDFConverter
+from html2pdf.cost_model import CostModel
+from scheduler import plan, run_scheduled
+from test_dxf_combine_modes import create_dxf, page_contents
+from unified_converter import UnifiedConverter
+from worker_pool import WarmWorkerPool
+
+
+def page_bound_model():
+    """A cost model calibrated so that time grows with pages and hardly has a fixed part."""
+    model = CostModel()
+    for pages, seconds in [(1, 0.2), (10, 1.1), (20, 2.1)]:
+        model.observe('dxf', {'virtual_entities': 2, 'pages': pages}, seconds, 1000 * pages)
+    return model
+
+
+def create_inputs(folder):
+    """Two one-page drawings and one long drawing, last in alphabetical order."""
+    folder.mkdir(exist_ok=True)
+    create_dxf(folder / "a_column.dxf", 4000, 2000)
+    create_dxf(folder / "b_footing.dxf", 4000, 2500)
+    create_dxf(folder / "z_beam_sections.dxf", 4000, 40000)
+    return {name: folder / name for name in ["a_column.dxf", "b_footing.dxf", "z_beam_sections.dxf"]}
+
+
+def test_plan_orders_longest_first_and_splits():
+    """The long drawing runs first; with two workers it is split into page batches."""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = create_inputs(Path(tmp))
+        model = page_bound_model()
+
+        single = plan(files, workers=1, model=model)
+        # Equal estimates keep alphabetical order
+        assert [item.filename for item in single] == ["z_beam_sections.dxf", "a_column.dxf", "b_footing.dxf"]
+        assert all(item.page_range is None for item in single)
+
+        split = plan(files, workers=2, model=model)
+        batches = [item for item in split if item.page_range]
+        assert [item.filename for item in split[:len(batches)]] == ["z_beam_sections.dxf"] * 2
+        assert batches[0].page_range[0] == 0 and batches[0].page_range[1] == batches[1].page_range[0]
+        assert [item.seconds for item in split] == sorted((item.seconds for item in split), reverse=True)
+    print("✅ Plan runs the longest drawing first and splits it across two workers")
+
+
+def test_scheduled_conversion_matches_sequential():
+    """Split drawings are joined into the same pages; the combined PDF stays alphabetical."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        files = create_inputs(tmp / "input")
+        converter = DXFToPDFConverter(output_folder=str(tmp / "reference"))
+        reference = {}
+        for name, path in files.items():
+            success, output, pages = converter.convert_dxf_to_pdf(path)
+            assert success, output
+            reference[name] = page_contents(PdfReader(output))
+
+        from html2pdf import cost_model
+        cost_model.set_model(page_bound_model())
+        try:
+            with WarmWorkerPool(workers=2, output_folder=str(tmp / "pool")) as pool:
+                (tmp / "pool").mkdir()
+                finished = []
+                pdf_paths = {name: tmp / "pool" / f"{Path(name).stem}.pdf" for name in files}
+                results = run_scheduled(pool, files, pdf_paths,
+                                        on_done=lambda index, result: finished.append(result['input']))
+                assert [r['input'] for r in results] == list(files)
+                assert finished[0] == "z_beam_sections.dxf"
+                for result in results:
+                    assert result['success'], result['output']
+                    assert page_contents(PdfReader(result['output'])) == reference[result['input']]
+                assert results[2]['batches'] == 2
+                assert not list((tmp / "pool").glob("*.pages_*.pdf"))
+
+                unified = UnifiedConverter(str(tmp / "input"), str(tmp / "out"), dxf_pool=pool)
+                session = unified.convert_all_files()
+        finally:
+            cost_model.set_model(None)
+
+        combined = PdfReader(session['dxf_results']['combined_pdf'])
+        expected = [page for name in files for page in reference[name]]
+        assert page_contents(combined) == expected
+        assert [r['input'] for r in session['dxf_results']['details']] == list(files)
+    print(f"✅ Scheduled conversion: {len(expected)} pages, identical to the sequential run, alphabetical")
+
+
+if __name__ == "__main__":
+    test_plan_orders_longest_first_and_splits()
+    test_scheduled_conversion_matches_sequential()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test per-job scratch areas used by concurrent HTML conversions."""
+
+from pathlib import Path
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+
+from html2pdf.converter import HTMLConverter
+from html2pdf.scratch import OWNER_FILE, ScratchArea, purge_stale
+from html2pdf.service import HTMLToPDFService, _claim_output_name
+
+
+def test_scratch_area_is_private_and_removed():
+    """Each job gets its own directory, removed even when the job fails."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        with ScratchArea(root) as first, ScratchArea(root) as second:
+            assert first.path != second.path
+            (first.path / "report.pdf").write_bytes(b"%PDF")
+            (second.path / "report.pdf").write_bytes(b"%PDF")
+
+        try:
+            with ScratchArea(root) as failing:
+                (failing.path / "partial.pdf").write_bytes(b"%PDF")
+                raise RuntimeError("render crashed")
+        except RuntimeError:
+            pass
+
+        assert list(root.iterdir()) == []
+    print("✅ Scratch areas are private and always removed")
+
+
+def test_purge_stale_removes_dead_owners_only():
+    """Areas owned by a dead process are purged; live ones are kept."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+
+        orphan = ScratchArea(root, job_id="orphan")
+        orphan.create()
+        (orphan.path / OWNER_FILE).write_text(str(dead.pid))
+
+        with ScratchArea(root, job_id="live") as live:
+            assert purge_stale(root) == 1
+            assert live.path.exists() and not orphan.path.exists()
+    print("✅ Stale scratch areas purged")
+
+
+def test_concurrent_converters_keep_their_pdfs():
+    """Two overlapping jobs converting the same report do not clobber each other."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        source = root / "nurseBEAM.html"
+        source.write_bytes(b"<TABLE><TR><TD><B><FONT FACE = VERDANA SIZE = 2>B1</FONT></B>"
+                           b"<TD>= 250.00 kN/m\xb2</TABLE>")
+
+        areas = [ScratchArea(root / "temp"), ScratchArea(root / "temp")]
+        converters = [HTMLConverter(area.create(), backend='native') for area in areas]
+        results = {}
+
+        threads = [threading.Thread(target=lambda c=c: results.update({id(c): c.convert_file(source)}))
+                   for c in converters]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        first, second = (results[id(c)] for c in converters)
+        assert first != second and first.exists() and second.exists()
+
+        converters[0].cleanup()
+        assert not first.exists() and second.exists()
+        for area in areas:
+            area.remove()
+    print("✅ Concurrent jobs keep their own intermediates")
+
+
+def test_default_combined_name_is_kept():
+    """The combined PDF keeps its timestamp name; a second job in the same second gets _2."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / "input").mkdir()
+        shutil.copy(Path("INPUT_DATA") / "nurse011BDR.html", root / "input")
+        service = HTMLToPDFService(str(root / "input"), str(root / "output"), backend='native')
+
+        result = service.convert_html_to_pdf()
+        assert result['success'], result
+        assert re.fullmatch(r'combined_html_\d{8}_\d{6}\.pdf', result['output_file'])
+        assert Path(result['output_path']) == root / "output" / result['output_file']
+
+        stem = result['output_file'][:-len('.pdf')]
+        assert _claim_output_name(root / "output", stem) == f"{stem}_2.pdf"
+        assert _claim_output_name(root / "output", stem) == f"{stem}_3.pdf"
+        assert Path(result['output_path']).stat().st_size > 0
+    print(f"✅ Combined output named {result['output_file']}")
+
+
+if __name__ == "__main__":
+    test_scratch_area_is_private_and_removed()
+    test_purge_stale_removes_dead_owners_only()
+    test_concurrent_converters_keep_their_pdfs()
+    test_default_combined_name_is_kept()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Test that importing the web app is fast and has no side effects (python -X importtime app.py)."""
+
+import os
+from pathlib import Path
+import subprocess
+import sys
+import tempfile
+
+REPO = Path(__file__).resolve().parent
+# Loaded on the first conversion, never at import
+HEAVY_MODULES = ('matplotlib', 'ezdxf', 'numpy', 'PyPDF2', 'reportlab', 'pdfkit')
+IMPORT_BUDGET_SECONDS = 1.0
+
+
+def import_times(cwd):
+    """Cumulative import time in seconds of every module imported by 'import app'."""
+    env = dict(os.environ, PYTHONPATH=str(REPO))
+    completed = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'],
+                               cwd=cwd, env=env, capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+def test_import_is_fast_and_side_effect_free():
+    """No heavy libraries, no files created, and the import stays within budget."""
+    with tempfile.TemporaryDirectory() as tmp:
+        times = import_times(tmp)
+        created = sorted(os.listdir(tmp))
+
+    heavy = sorted({name.split('.')[0] for name in times} & set(HEAVY_MODULES))
+    print(f"⏱️  import app: {times['app']:.3f}s")
+    assert not heavy, f"Imported at startup: {heavy}"
+    assert not created, f"Created at import: {created}"
+    assert times['app'] < IMPORT_BUDGET_SECONDS, f"import app took {times['app']:.3f}s"
+    print("✅ App imports quickly without loading converters or touching the disk")
+
+
+def test_unrelated_requests_do_not_start_jobs():
+    """The index page and /health neither open the job store nor start workers."""
+    script = ("import app, threading\n"
+              "client = app.app.test_client()\n"
+              "assert client.get('/health').status_code == 200\n"
+              "assert client.get('/').status_code == 200\n"
+              "assert app._job_manager is None\n"
+              "assert not any(t.name.startswith('job-worker') for t in threading.enumerate())\n"
+              "assert client.get('/queue').get_json()['success'] and app._job_manager is not None\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, PYTHONPATH=str(REPO), PREFLIGHT_MODEL=str(Path(tmp) / "model.json"),
+                   JOB_STORE=str(Path(tmp) / "jobs.sqlite3"))
+        subprocess.run([sys.executable, '-c', script], cwd=REPO, env=env, check=True)
+        assert (Path(tmp) / "jobs.sqlite3").exists()
+    print("✅ The job manager starts with the first job route, not the first request")
+
+
+if __name__ == "__main__":
+    test_import_is_fast_and_side_effect_free()
+    test_unrelated_requests_do_not_start_jobs()
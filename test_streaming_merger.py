@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test the streaming, memory-bounded PDF merger."""
+
+from pathlib import Path
+import tempfile
+import time
+import tracemalloc
+
+from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import Fit
+
+from html2pdf.merger import StreamingPdfMerger, merge_pdfs
+
+PAGES_PER_FILE = 10
+
+
+def write_synthetic_pdf(path, index, pages=PAGES_PER_FILE):
+    """Write a small PDF by hand: shared font, one content stream per page."""
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+               b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+                   b" ".join(b"%d 0 R" % (4 + 2 * i) for i in range(pages)), pages),
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    for i in range(pages):
+        content = b"BT /F1 12 Tf 72 720 Td (File %d page %d) Tj ET" % (index, i)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (5 + 2 * i))
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+
+    data = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    Path(path).write_bytes(bytes(data))
+
+
+def merge_peak_memory(files, output):
+    """Merge files and return (peak traced bytes, seconds)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    with StreamingPdfMerger(output) as merger:
+        for pdf in files:
+            merger.append(pdf)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak, elapsed
+
+
+def test_merge_keeps_order_and_outline():
+    """Pages keep their order and source bookmarks point at the copied pages."""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(3):
+            source = Path(tmp) / f"plain{i}.pdf"
+            write_synthetic_pdf(source, i, pages=2)
+            writer = PdfWriter()
+            writer.append(PdfReader(str(source)))
+            writer.add_outline_item(f"Report {i}", 1, fit=Fit.fit())
+            files.append(Path(tmp) / f"report{i}.pdf")
+            with open(files[-1], 'wb') as f:
+                writer.write(f)
+
+        output = Path(tmp) / "combined.pdf"
+        assert merge_pdfs(files, output)
+
+        reader = PdfReader(str(output))
+        texts = [page.extract_text() for page in reader.pages]
+        assert texts == [f"File {i} page {p}" for i in range(3) for p in range(2)], texts
+        titles = [item.title for item in reader.outline]
+        assert titles == ["Report 0", "Report 1", "Report 2"]
+        assert [reader.get_destination_page_number(item) for item in reader.outline] == [1, 3, 5]
+    print("✅ Merged pages and outline in order")
+
+
+def test_peak_memory_flat_for_10000_pages():
+    """Peak memory for 1,000 files / 10,000 pages stays close to that of 100 files."""
+    with tempfile.TemporaryDirectory() as tmp:
+        files = []
+        for i in range(1000):
+            path = Path(tmp) / f"part{i:04d}.pdf"
+            write_synthetic_pdf(path, i)
+            files.append(path)
+
+        small_peak, small_time = merge_peak_memory(files[:100], Path(tmp) / "small.pdf")
+        large_peak, large_time = merge_peak_memory(files, Path(tmp) / "large.pdf")
+        print(f"📊 100 files: peak {small_peak / 1e6:.1f} MB in {small_time:.1f}s; "
+              f"1000 files: peak {large_peak / 1e6:.1f} MB in {large_time:.1f}s")
+
+        reader = PdfReader(str(Path(tmp) / "large.pdf"))
+        assert len(reader.pages) == 1000 * PAGES_PER_FILE
+        assert reader.pages[-1].extract_text() == "File 999 page 9"
+        # Only per-page bookkeeping (xref offsets, the Kids list written at
+        # close) grows with input count, ~256 B per page; PdfMerger peaks at
+        # ~90 MB on the same 10,000 pages
+        extra_pages = 900 * PAGES_PER_FILE
+        assert large_peak - small_peak < extra_pages * 512, (small_peak, large_peak)
+        assert large_peak < 8 * 1024 * 1024
+    print("✅ Peak memory stays flat as inputs grow")
+
+
+if __name__ == "__main__":
+    test_merge_keeps_order_and_outline()
+    test_peak_memory_flat_for_10000_pages()
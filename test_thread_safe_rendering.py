@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Stress test: many DXF conversions in one process, on several threads at once."""
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+import tempfile
+
+from PyPDF2 import PdfReader
+
+from dxf_converter import DXFToPDFConverter
+from test_dxf_combine_modes import create_dxf, page_contents, page_sizes
+
+THREADS = 8
+ROUNDS = 3
+
+
+def test_concurrent_conversions_match_sequential_output():
+    """Threaded conversions produce exactly the pages a sequential run produces."""
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        shapes = [(4000, 2500), (2500, 4000), (1000, 6000), (6000, 1000)]
+        drawings = []
+        for i, (width, height) in enumerate(shapes):
+            path = tmp / f"drawing_{i}.dxf"
+            create_dxf(path, width, height)
+            drawings.append(path)
+        converter = DXFToPDFConverter(output_folder=str(tmp / "out"))
+
+        expected = {}
+        for path in drawings:
+            success, output, pages = converter.convert_dxf_to_pdf(path, tmp / f"{path.stem}_ref.pdf")
+            assert success, output
+            expected[path.stem] = (pages, page_sizes(PdfReader(output)), page_contents(PdfReader(output)))
+
+        def convert(task):
+            path, run = task
+            return path.stem, converter.convert_dxf_to_pdf(path, tmp / f"{path.stem}_{run}.pdf")
+
+        tasks = [(path, run) for run in range(ROUNDS) for path in drawings]
+        with ThreadPoolExecutor(max_workers=THREADS) as pool:
+            results = list(pool.map(convert, tasks))
+
+        for stem, (success, output, pages) in results:
+            assert success, output
+            reference_pages, reference_sizes, reference_contents = expected[stem]
+            assert pages == reference_pages
+            assert page_sizes(PdfReader(output)) == reference_sizes
+            assert page_contents(PdfReader(output)) == reference_contents, f"{output} differs from the sequential run"
+
+    # Rendering never registers figures with pyplot's global figure manager
+    pyplot = sys.modules.get('matplotlib.pyplot')
+    assert pyplot is None or pyplot.get_fignums() == []
+    print(f"✅ {len(tasks)} conversions on {THREADS} threads match the sequential output")
+
+
+if __name__ == "__main__":
+    test_concurrent_conversions_match_sequential_output()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Test the warm DXF worker pool: pre-loaded workers, recycling and latency stats."""
+
+from pathlib import Path
+import tempfile
+
+from PyPDF2 import PdfReader
+
+from test_dxf_combine_modes import create_dxf
+from worker_pool import WarmWorkerPool
+
+
+def test_pool_converts_and_recycles_workers():
+    """Every task converts its file; a worker is replaced after max_tasks_per_worker tasks."""
+    with tempfile.TemporaryDirectory() as tmp:
+        names = ["a_column", "b_footing", "c_slab"]
+        for i, name in enumerate(names):
+            create_dxf(Path(tmp) / f"{name}.dxf", 3000, 2000 + 2000 * i)
+
+        with WarmWorkerPool(workers=1, max_tasks_per_worker=2, output_folder=tmp) as pool:
+            futures = [pool.submit(Path(tmp) / f"{name}.dxf") for name in names]
+            results = [future.result(timeout=300) for future in futures]
+            stats = pool.stats()
+
+        for name, result in zip(names, results):
+            assert result['success'], result['output']
+            assert Path(result['output']).name == f"{name}_A4_landscape.pdf"
+            assert len(PdfReader(result['output']).pages) == result['pages']
+        assert [r['task_number'] for r in results] == [1, 2, 1]
+        assert results[0]['pid'] != results[2]['pid']
+
+    print(f"📊 Warm-up: {stats['warmup']}")
+    print(f"📊 First task: {stats['first_task']}")
+    print(f"📊 Steady state: {stats['steady_state']}")
+    assert stats['processes_started'] == 2 and stats['recycled'] == 1
+    assert stats['first_task']['count'] == 2 and stats['steady_state']['count'] == 1
+    print("✅ Warm pool converts, recycles workers and reports first-task latency separately")
+
+
+def test_failed_conversion_is_reported():
+    """A file that is not a DXF drawing fails its task without breaking the pool."""
+    with tempfile.TemporaryDirectory() as tmp:
+        bad = Path(tmp) / "broken.dxf"
+        bad.write_text("not a drawing")
+        with WarmWorkerPool(workers=1, output_folder=tmp) as pool:
+            result = pool.convert(bad)
+            assert not result['success'] and result['pages'] == 0
+    print("✅ Failed conversions come back as results")
+
+
+if __name__ == "__main__":
+    test_pool_converts_and_recycles_workers()
+    test_failed_conversion_is_reported()
@@ -4,35 +4,91 @@ Unified Converter - Process both HTML and DXF files in one click
 Generates outputs in separate date-stamped subfolders
 """
 
+import contextvars
 import logging
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import json
 
+from conversion_manifest import MANIFEST_NAME, ConversionManifest, file_sha256
 from dxf_converter import DXFToPDFConverter
+from html2pdf import checkpoints, progress
 from html2pdf.service import HTMLToPDFService
+from html2pdf.watchdog import DEFAULT_MEMORY_LIMIT_MB
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How COMBINED_ALL_DXF is built: 'merge' streams the per-file PDFs into it as
+# they finish; 'dual' saves every rendered page to the per-file and the
+# combined PDF during rendering, so no per-file PDF is read back
+COMBINE_MODES = ('merge', 'dual')
+
+# Input files picked up from the input folder, per pipeline
+INPUT_PATTERNS = {
+    'html': ['*.html', '*.htm', '*.HTML', '*.HTM'],
+    'dxf': ['*.dxf', '*.DXF']
+}
+
 
 class UnifiedConverter:
     """Unified converter for both HTML and DXF files with organized output structure."""
     
-    def __init__(self, input_folder: str = "INPUT_DATA", base_output_folder: str = "OUTPUT_PDF"):
+    def __init__(self, input_folder: str = "INPUT_DATA", base_output_folder: str = "OUTPUT_PDF",
+                 html_backend: str = "wkhtmltopdf", html_output_profile: str = "quality",
+                 combine_mode: str = "merge", incremental: bool = False, concurrent: bool = True,
+                 html_memory_limit_mb: Optional[int] = DEFAULT_MEMORY_LIMIT_MB, dxf_pool=None,
+                 dxf_limits=None):
         """
         Initialize unified converter.
         
         Args:
             input_folder: Directory containing both HTML and DXF files
             base_output_folder: Base directory for organized outputs
+            html_backend: HTML rendering backend ('wkhtmltopdf' or 'native')
+            html_output_profile: Combined HTML report profile ('quality' or 'compact')
+            combine_mode: How the combined DXF PDF is built ('merge' or 'dual')
+            incremental: Re-render only inputs that changed since the last session and
+                copy the pages of unchanged inputs from the previous combined PDFs
+            concurrent: Run the HTML and DXF pipelines at the same time
+            html_memory_limit_mb: Address-space limit of each wkhtmltopdf process
+                (None for no limit)
+            dxf_pool: Worker pool (WarmWorkerPool) to convert the drawings on,
+                largest estimated first; None converts them one by one here
+            dxf_limits: isolation.ResourceLimits: without a pool, convert each
+                drawing in a child process with these CPU and memory limits and
+                record its resource usage in the session log
         """
         self.input_folder = Path(input_folder)
         self.base_output_folder = Path(base_output_folder)
-        
-        # Create timestamp for this conversion session
-        self.timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.combine_mode = combine_mode if combine_mode in COMBINE_MODES else 'merge'
+        self.incremental = incremental
+        self.concurrent = concurrent
+        self.dxf_pool = dxf_pool
+        self.dxf_limits = dxf_limits
+        journal = checkpoints.active()
+        if (incremental or journal is not None) and self.combine_mode == 'dual':
+            # Pages of unchanged or already converted inputs can only be spliced in by the merger
+            logger.info("Incremental or resumable session: combined DXF PDF is built by merging")
+            self.combine_mode = 'merge'
+        if (dxf_pool is not None or dxf_limits is not None) and self.combine_mode == 'dual':
+            # Drawings rendered in other processes reach the combined PDF as files
+            logger.info("Drawings converted in other processes: combined DXF PDF is built by merging")
+            self.combine_mode = 'merge'
+        
+        # Create timestamp for this conversion session; a job resumed after a
+        # restart continues in the session folders it had started
+        self.timestamp = journal.load('unified_session') if journal is not None else None
+        if self.timestamp:
+            logger.info(f"🔁 Resuming session {self.timestamp}")
+        else:
+            self.timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+            if journal is not None:
+                journal.save('unified_session', self.timestamp)
         
         # Create organized output structure
         self.html_output_folder = self.base_output_folder / "HTML_REPORTS" / f"session_{self.timestamp}"
@@ -54,7 +110,10 @@ class UnifiedConverter:
         
         self.html_converter = HTMLToPDFService(
             input_folder=str(self.input_folder),
-            output_folder=str(self.html_output_folder)
+            output_folder=str(self.html_output_folder),
+            backend=html_backend,
+            output_profile=html_output_profile,
+            memory_limit_mb=html_memory_limit_mb
         )
         
         logger.info(f"Unified Converter initialized for session: {self.timestamp}")
@@ -69,16 +128,17 @@ class UnifiedConverter:
         Returns:
             Dictionary with 'html' and 'dxf' file lists sorted alphabetically
         """
-        html_files = []
-        dxf_files = []
-        
-        # Scan for HTML files
-        for pattern in ['*.html', '*.htm', '*.HTML', '*.HTM']:
-            html_files.extend([f.name for f in self.input_folder.glob(pattern)])
-        
-        # Scan for DXF files
-        for pattern in ['*.dxf', '*.DXF']:
-            dxf_files.extend([f.name for f in self.input_folder.glob(pattern)])
+        # One directory pass; each entry is matched against the pattern suffixes, in any case
+        suffix_kinds = {pattern.lstrip('*').lower(): kind for kind, patterns in INPUT_PATTERNS.items()
+                        for pattern in patterns}
+        found = {'html': [], 'dxf': []}
+        if self.input_folder.is_dir():
+            with os.scandir(self.input_folder) as scan:
+                for entry in scan:
+                    kind = suffix_kinds.get(os.path.splitext(entry.name)[1].lower())
+                    if kind and not entry.name.startswith('.'):
+                        found[kind].append(entry.name)
+        html_files, dxf_files = found['html'], found['dxf']
         
         # ALPHABETICAL SORTING - case insensitive
         html_files = sorted(list(set(html_files)), key=str.lower)
@@ -98,10 +158,14 @@ class UnifiedConverter:
             'dxf': dxf_files
         }
     
-    def convert_all_files(self) -> Dict[str, Any]:
+    def convert_all_files(self, input_files: Optional[Dict[str, List[str]]] = None) -> Dict[str, Any]:
         """
         Convert all HTML and DXF files in one operation.
         
+        Args:
+            input_files: {'html': [...], 'dxf': [...]} filenames to convert instead
+                of everything in the input folder (each list in alphabetical order)
+        
         Returns:
             Comprehensive conversion results
         """
@@ -112,7 +176,8 @@ class UnifiedConverter:
         start_time = datetime.now()
         
         # Scan input files
-        input_files = self.scan_input_files()
+        if input_files is None:
+            input_files = self.scan_input_files()
         
         logger.info(f"📁 Found {len(input_files['html'])} HTML files")
         logger.info(f"📁 Found {len(input_files['dxf'])} DXF files")
@@ -143,122 +208,43 @@ class UnifiedConverter:
             }
         }
         
-        # Convert HTML files
-        if input_files['html']:
-            logger.info("\n📄 CONVERTING HTML FILES...")
-            logger.info("-" * 50)
-            
-            try:
-                html_result = self.html_converter.convert_html_to_pdf(
-                    output_filename=f"combined_html_reports_{self.timestamp}.pdf"
-                )
-                results['html_results'] = html_result
-                
-                if html_result['success']:
-                    logger.info(f"✅ HTML conversion successful: {html_result['output_file']}")
-                else:
-                    logger.error(f"❌ HTML conversion failed: {html_result.get('error', 'Unknown error')}")
-                    
-            except Exception as e:
-                logger.error(f"❌ HTML conversion error: {e}")
-                results['html_results'] = {
-                    'success': False,
-                    'error': str(e),
-                    'total': len(input_files['html']),
-                    'successful': 0,
-                    'failed': len(input_files['html'])
-                }
+        # Incremental mode: hash this session's inputs to find what is unchanged
+        manifest = None
+        input_hashes = {}
+        if self.incremental:
+            manifest = ConversionManifest(self.base_output_folder / MANIFEST_NAME)
+            for filename in input_files['html'] + input_files['dxf']:
+                input_hashes[filename] = file_sha256(self.input_folder / filename)
+            results['incremental'] = {
+                'html': {'reused': [], 'rebuilt': []},
+                'dxf': {'reused': [], 'rebuilt': []}
+            }
         
-        # Convert DXF files INDIVIDUALLY + COMBINED
-        if input_files['dxf']:
-            logger.info("\n🏗️  CONVERTING DXF FILES (ALPHABETICAL ORDER)...")
-            logger.info("-" * 50)
+        # Both pipelines run at once with their own budgets: the HTML side mostly
+        # waits on wkhtmltopdf subprocesses (bounded by the watchdog's timeout and
+        # memory limit) on a worker thread, while DXF rendering uses this thread
+        incremental = results.get('incremental')
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix='html-pipeline') as executor:
+            html_future = None
+            if input_files['html']:
+                if self.concurrent:
+                    # Copied context: the HTML side reports progress to the same job
+                    html_future = executor.submit(contextvars.copy_context().run,
+                                                  self._convert_html_pipeline, input_files['html'],
+                                                  manifest, input_hashes, incremental)
+                else:
+                    results['html_results'] = self._convert_html_pipeline(
+                        input_files['html'], manifest, input_hashes, incremental)
             
-            try:
-                # STEP 1: Convert each DXF file individually (alphabetical order)
-                individual_results = []
-                individual_pdfs = []
-                
-                for i, dxf_filename in enumerate(input_files['dxf'], 1):
-                    logger.info(f"🔄 Converting DXF {i}/{len(input_files['dxf'])}: {dxf_filename}")
-                    
-                    dxf_path = self.input_folder / dxf_filename
-                    if dxf_path.exists():
-                        success, output_path, pages = self.dxf_converter.convert_dxf_to_pdf(dxf_path)
-                        
-                        result = {
-                            'input': dxf_filename,
-                            'output': Path(output_path).name if success else output_path,
-                            'success': success,
-                            'pages': pages,
-                            'timestamp': datetime.now().isoformat()
-                        }
-                        individual_results.append(result)
-                        
-                        if success:
-                            individual_pdfs.append(Path(output_path))
-                            logger.info(f"   ✅ {dxf_filename} → {pages} pages")
-                        else:
-                            logger.error(f"   ❌ {dxf_filename} → {output_path}")
-                
-                # STEP 2: Combine all successful DXF PDFs into one master PDF
-                combined_pdf_path = None
-                if individual_pdfs:
-                    logger.info(f"\n📚 COMBINING {len(individual_pdfs)} DXF PDFs...")
-                    
-                    from html2pdf.merger import merge_pdfs
-                    combined_pdf_path = self.dxf_output_folder / f"COMBINED_ALL_DXF_{self.timestamp}.pdf"
-                    
-                    # Sort PDFs alphabetically by filename for consistent order
-                    individual_pdfs.sort(key=lambda p: p.name.lower())
-                    
-                    logger.info(f"📄 Combining PDFs in alphabetical order:")
-                    for i, pdf_path in enumerate(individual_pdfs, 1):
-                        logger.info(f"   {i:2d}. {pdf_path.name}")
-                    
-                    combine_success = merge_pdfs(individual_pdfs, combined_pdf_path)
-                    
-                    if combine_success:
-                        logger.info(f"✅ Combined PDF created: {combined_pdf_path.name}")
-                    else:
-                        logger.error(f"❌ Failed to create combined PDF")
-                        combined_pdf_path = None
-                
-                # Process DXF results
-                successful_dxf = sum(1 for r in individual_results if r['success'])
-                failed_dxf = len(individual_results) - successful_dxf
-                total_pages = sum(r.get('pages', 0) for r in individual_results if r['success'])
-                
-                results['dxf_results'] = {
-                    'success': successful_dxf > 0,
-                    'total': len(individual_results),
-                    'successful': successful_dxf,
-                    'failed': failed_dxf,
-                    'total_pages': total_pages,
-                    'details': individual_results,
-                    'individual_pdfs': len(individual_pdfs),
-                    'combined_pdf': str(combined_pdf_path) if combined_pdf_path else None,
-                    'combined_success': combined_pdf_path is not None
-                }
-                
-                logger.info(f"✅ DXF conversion complete:")
-                logger.info(f"   📄 Individual PDFs: {successful_dxf}/{len(individual_results)} successful")
-                logger.info(f"   📚 Combined PDF: {'✅ Created' if combined_pdf_path else '❌ Failed'}")
-                logger.info(f"   📄 Total pages: {total_pages}")
-                
-            except Exception as e:
-                logger.error(f"❌ DXF conversion error: {e}")
-                results['dxf_results'] = {
-                    'success': False,
-                    'error': str(e),
-                    'total': len(input_files['dxf']),
-                    'successful': 0,
-                    'failed': len(input_files['dxf']),
-                    'total_pages': 0,
-                    'individual_pdfs': 0,
-                    'combined_pdf': None,
-                    'combined_success': False
-                }
+            if input_files['dxf']:
+                results['dxf_results'] = self._convert_dxf_pipeline(
+                    input_files['dxf'], manifest, input_hashes, incremental)
+            
+            if html_future is not None:
+                results['html_results'] = html_future.result()
+        
+        if manifest:
+            manifest.save()
         
         # Calculate summary
         end_time = datetime.now()
@@ -270,6 +256,8 @@ class UnifiedConverter:
         results['summary'] = {
             'overall_success': html_success or dxf_success,
             'duration_seconds': duration,
+            'html_duration_seconds': results['html_results'].get('duration_seconds', 0),
+            'dxf_duration_seconds': results['dxf_results'].get('duration_seconds', 0),
             'total_input_files': len(input_files['html']) + len(input_files['dxf']),
             'html_files_processed': len(input_files['html']),
             'dxf_files_processed': len(input_files['dxf']),
@@ -293,6 +281,334 @@ class UnifiedConverter:
         
         return results
     
+    def _convert_html_pipeline(self, html_files: List[str], manifest: Optional[ConversionManifest],
+                               input_hashes: Dict[str, str], incremental: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Convert the HTML reports into one combined PDF.
+        
+        Args:
+            html_files: HTML filenames of this session
+            manifest: Previous session's manifest (incremental mode only)
+            input_hashes: filename -> SHA-256 of the input (incremental mode only)
+            incremental: Session's reused/rebuilt record, updated for 'html'
+            
+        Returns:
+            HTML results, including the pipeline's duration_seconds
+        """
+        start = time.perf_counter()
+        logger.info("\n📄 CONVERTING HTML FILES...")
+        logger.info("-" * 50)
+        
+        try:
+            html_settings = self.html_converter.settings_key
+            reuse = {}
+            if manifest:
+                for filename in html_files:
+                    entry = manifest.lookup('html', filename, input_hashes[filename], html_settings)
+                    if entry:
+                        reuse[filename] = (Path(entry['combined_pdf']), range(*entry['pages']))
+            
+            html_result = self.html_converter.convert_html_to_pdf(
+                html_files=html_files,
+                output_filename=f"combined_html_reports_{self.timestamp}.pdf",
+                reuse=reuse
+            )
+            if manifest and html_result['success']:
+                page_ranges = html_result['page_ranges']
+                manifest.record('html', Path(html_result['output_path']), {
+                    filename: {'sha256': input_hashes[filename], 'settings': html_settings,
+                               'pages': pages, 'pdf': None}
+                    for filename, pages in page_ranges.items() if filename in input_hashes
+                })
+                incremental['html'] = {
+                    'reused': html_result['reused'],
+                    'rebuilt': [f for f in page_ranges if f not in reuse]
+                }
+            
+            if html_result['success']:
+                logger.info(f"✅ HTML conversion successful: {html_result['output_file']}")
+            else:
+                logger.error(f"❌ HTML conversion failed: {html_result.get('error', 'Unknown error')}")
+                
+        except Exception as e:
+            logger.error(f"❌ HTML conversion error: {e}")
+            html_result = {
+                'success': False,
+                'error': str(e),
+                'total': len(html_files),
+                'successful': 0,
+                'failed': len(html_files)
+            }
+        
+        html_result['duration_seconds'] = round(time.perf_counter() - start, 3)
+        return html_result
+    
+    def _convert_dxf_pipeline(self, dxf_files: List[str], manifest: Optional[ConversionManifest],
+                              input_hashes: Dict[str, str], incremental: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Convert each DXF drawing to its own PDF and build the combined DXF PDF.
+        
+        Args:
+            dxf_files: DXF filenames of this session, in alphabetical order
+            manifest: Previous session's manifest (incremental mode only)
+            input_hashes: filename -> SHA-256 of the input (incremental mode only)
+            incremental: Session's reused/rebuilt record, updated for 'dxf'
+            
+        Returns:
+            DXF results, including the pipeline's duration_seconds
+        """
+        start = time.perf_counter()
+        logger.info("\n🏗️  CONVERTING DXF FILES (ALPHABETICAL ORDER)...")
+        logger.info("-" * 50)
+        
+        try:
+            # STEP 1: Convert each DXF file individually (alphabetical order)
+            individual_results = []
+            
+            # STEP 2 runs alongside STEP 1: pages go straight into the combined
+            # PDF while rendering ('dual'), or each successful DXF PDF is appended
+            # as soon as all files before it are done ('merge')
+            combined_pdf_path = self.dxf_output_folder / f"COMBINED_ALL_DXF_{self.timestamp}.pdf"
+            combined_pages = combined_merger = None
+            if self.combine_mode == 'dual':
+                from matplotlib.backends.backend_pdf import PdfPages
+                combined_pages = PdfPages(combined_pdf_path)
+            else:
+                from html2pdf.merger import PipelinedMerger
+                combined_merger = PipelinedMerger(combined_pdf_path, len(dxf_files))
+            progress.expect_files(len(dxf_files))
+            
+            scheduled = {}
+            rebuild_combined = False  # a drawing failed after writing pages into the dual-mode combined PDF
+            # Any error (or preemption) leaves no merge thread or half-written combined PDF behind
+            try:
+                for i, dxf_filename in enumerate(dxf_files, 1):
+                    logger.info(f"🔄 Converting DXF {i}/{len(dxf_files)}: {dxf_filename}")
+                    
+                    dxf_path = self.input_folder / dxf_filename
+                    entry = None
+                    if manifest and dxf_path.exists():
+                        entry = manifest.lookup('dxf', dxf_filename, input_hashes[dxf_filename],
+                                                self.dxf_converter.scale_mode)
+                    if entry:
+                        # Unchanged since the last session: copy its PDF (its old pages are spliced below)
+                        output_path = self.dxf_output_folder / Path(entry['pdf']).name
+                        try:
+                            if not Path(entry['combined_pdf']).is_file():
+                                raise FileNotFoundError(entry['combined_pdf'])
+                            shutil.copy2(entry['pdf'], output_path)
+                        except OSError as e:
+                            logger.warning(f"   ⚠️  Previous output of {dxf_filename} unavailable, converting again: {e}")
+                            entry = None
+                    
+                    if not dxf_path.exists():
+                        progress.emit('file_done', file=dxf_filename, success=False)
+                        if combined_merger is not None:
+                            combined_merger.submit(i - 1, None)
+                    elif entry:
+                        pages = entry['pages'][1] - entry['pages'][0]
+                        individual_results.append({
+                            'input': dxf_filename,
+                            'output': output_path.name,
+                            'success': True,
+                            'pages': pages,
+                            'reused': True,
+                            'timestamp': datetime.now().isoformat()
+                        })
+                        combined_merger.submit(i - 1, Path(entry['combined_pdf']), range(*entry['pages']))
+                        logger.info(f"   ♻️  {dxf_filename} unchanged → {pages} pages reused")
+                        progress.emit('file_done', file=dxf_filename, reused=True)
+                    elif self.dxf_pool is not None:
+                        # Converted below, on the pool, in estimated-cost order
+                        scheduled[dxf_filename] = i - 1
+                        individual_results.append(None)
+                    elif self.dxf_limits is not None:
+                        from isolation import convert_isolated
+                        progress.emit('file_started', file=dxf_filename)
+                        outcome = convert_isolated(dxf_path, scale_mode=self.dxf_converter.scale_mode,
+                                                   output_folder=str(self.dxf_output_folder), limits=self.dxf_limits)
+                        progress.emit('file_done', file=dxf_filename, success=outcome['success'])
+                        result = self._dxf_result(dxf_filename, outcome['success'], outcome['output'], outcome['pages'])
+                        result.update(status=outcome['status'], usage=outcome['usage'])
+                        individual_results.append(result)
+                        combined_merger.submit(i - 1, Path(outcome['output']) if outcome['success'] else None)
+                    else:
+                        success, output_path, pages = self.dxf_converter.convert_dxf_to_pdf(
+                            dxf_path, combined_pdf=combined_pages)
+                        
+                        individual_results.append(self._dxf_result(dxf_filename, success, output_path, pages))
+                        if not success and combined_pages is not None:
+                            # Pages rendered before the failure are already in the combined PDF;
+                            # like merge mode, it is rebuilt from the successful drawings only
+                            rebuild_combined = True
+                            logger.warning(f"   ⚠️  {dxf_filename} failed: combined PDF will be rebuilt without it")
+                        if combined_merger is not None:
+                            combined_merger.submit(i - 1, Path(output_path) if success else None)
+                
+                if scheduled:
+                    self._convert_dxf_scheduled(scheduled, individual_results, combined_merger)
+            except BaseException:
+                if combined_merger is not None:
+                    combined_merger.abort()
+                if combined_pages is not None:
+                    combined_pages.close()
+                raise
+            individual_pdfs = [self.dxf_output_folder / r['output'] for r in individual_results if r['success']]
+            
+            # STEP 2: Finish the combined master PDF (files were added in alphabetical order)
+            if combined_pages is not None:
+                combined_pages.infodict()['Title'] = f'COMBINED ALL DXF - {self.timestamp}'
+                combined_pages.close()
+            if not individual_pdfs:
+                if combined_merger is not None:
+                    combined_merger.abort()
+                combined_pdf_path.unlink(missing_ok=True)
+                combined_pdf_path = None
+            else:
+                logger.info(f"\n📚 COMBINING {len(individual_pdfs)} DXF PDFs...")
+                
+                logger.info(f"📄 Combining PDFs in alphabetical order:")
+                for i, pdf_path in enumerate(individual_pdfs, 1):
+                    logger.info(f"   {i:2d}. {pdf_path.name}")
+                
+                progress.emit('merge_started', output=combined_pdf_path.name)
+                if combined_merger is not None:
+                    combine_success = combined_merger.finish()
+                elif rebuild_combined:
+                    from html2pdf.merger import merge_pdfs
+                    combine_success = merge_pdfs(individual_pdfs, combined_pdf_path)
+                else:
+                    combine_success = combined_pdf_path.exists()
+                
+                if combine_success:
+                    logger.info(f"✅ Combined PDF created: {combined_pdf_path.name}")
+                    if manifest:
+                        self._record_dxf_session(manifest, combined_pdf_path, dxf_files,
+                                                 input_hashes, combined_merger.page_ranges,
+                                                 individual_results, incremental)
+                else:
+                    logger.error(f"❌ Failed to create combined PDF")
+                    combined_pdf_path = None
+            
+            # Process DXF results
+            successful_dxf = sum(1 for r in individual_results if r['success'])
+            failed_dxf = len(individual_results) - successful_dxf
+            total_pages = sum(r.get('pages', 0) for r in individual_results if r['success'])
+            
+            dxf_results = {
+                'success': successful_dxf > 0,
+                'total': len(individual_results),
+                'successful': successful_dxf,
+                'failed': failed_dxf,
+                'total_pages': total_pages,
+                'details': individual_results,
+                'individual_pdfs': len(individual_pdfs),
+                'combined_pdf': str(combined_pdf_path) if combined_pdf_path else None,
+                'combined_success': combined_pdf_path is not None
+            }
+            
+            logger.info(f"✅ DXF conversion complete:")
+            logger.info(f"   📄 Individual PDFs: {successful_dxf}/{len(individual_results)} successful")
+            logger.info(f"   📚 Combined PDF: {'✅ Created' if combined_pdf_path else '❌ Failed'}")
+            logger.info(f"   📄 Total pages: {total_pages}")
+            
+        except Exception as e:
+            logger.error(f"❌ DXF conversion error: {e}")
+            dxf_results = {
+                'success': False,
+                'error': str(e),
+                'total': len(dxf_files),
+                'successful': 0,
+                'failed': len(dxf_files),
+                'total_pages': 0,
+                'individual_pdfs': 0,
+                'combined_pdf': None,
+                'combined_success': False
+            }
+        
+        dxf_results['duration_seconds'] = round(time.perf_counter() - start, 3)
+        return dxf_results
+    
+    def _dxf_result(self, dxf_filename: str, success: bool, output_path: str, pages: int) -> Dict[str, Any]:
+        """Result entry of one converted drawing."""
+        if success:
+            logger.info(f"   ✅ {dxf_filename} → {pages} pages")
+        else:
+            logger.error(f"   ❌ {dxf_filename} → {output_path}")
+        return {
+            'input': dxf_filename,
+            'output': Path(output_path).name if success else output_path,
+            'success': success,
+            'pages': pages,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    def _convert_dxf_scheduled(self, scheduled: Dict[str, int], individual_results: List[Any],
+                               combined_merger) -> None:
+        """
+        Convert drawings on the worker pool, largest estimated first.
+        
+        Args:
+            scheduled: filename -> position in the session's alphabetical order
+            individual_results: Session results; the entries at the scheduled
+                positions are filled in
+            combined_merger: Merger of the combined PDF; each drawing is handed
+                over at its alphabetical position as soon as it is finished
+        """
+        from scheduler import run_scheduled
+        
+        journal = checkpoints.active()
+        suffix = self.dxf_converter.scale_config['suffix']
+        files, pdf_paths = {}, {}
+        for dxf_filename, index in scheduled.items():
+            pdf_path = self.dxf_output_folder / f"{Path(dxf_filename).stem}{suffix}_A4_landscape.pdf"
+            done = journal.load(f"dxf_file:{pdf_path}") if journal is not None else None
+            if done and pdf_path.exists():
+                # Converted before the restart
+                logger.info(f"♻️  {dxf_filename} was converted before the restart ({done['pages']} pages)")
+                individual_results[index] = self._dxf_result(dxf_filename, True, str(pdf_path), done['pages'])
+                combined_merger.submit(index, pdf_path)
+                progress.emit('file_done', file=dxf_filename)
+                continue
+            files[dxf_filename] = self.input_folder / dxf_filename
+            pdf_paths[dxf_filename] = pdf_path
+            progress.emit('file_started', file=dxf_filename)
+        
+        def finished(position, outcome):
+            dxf_filename = outcome['input']
+            index = scheduled[dxf_filename]
+            individual_results[index] = self._dxf_result(dxf_filename, outcome['success'],
+                                                         outcome['output'], outcome['pages'])
+            if outcome['success'] and journal is not None:
+                journal.save(f"dxf_file:{outcome['output']}", {'pages': outcome['pages']})
+            combined_merger.submit(index, Path(outcome['output']) if outcome['success'] else None)
+            progress.emit('file_done', file=dxf_filename, success=outcome['success'])
+        
+        if files:
+            run_scheduled(self.dxf_pool, files, pdf_paths, self.dxf_converter.scale_mode, on_done=finished)
+    
+    def _record_dxf_session(self, manifest: ConversionManifest, combined_pdf_path: Path,
+                            dxf_files: List[str], input_hashes: Dict[str, str],
+                            page_ranges: Dict[int, Tuple[int, int]],
+                            individual_results: List[Dict[str, Any]],
+                            incremental: Dict[str, Any]) -> None:
+        """Record where each DXF file's pages ended up in the combined PDF."""
+        outputs = {r['input']: r for r in individual_results if r['success']}
+        inputs = {}
+        for index, (start, end) in page_ranges.items():
+            filename = dxf_files[index]
+            inputs[filename] = {
+                'sha256': input_hashes[filename],
+                'settings': self.dxf_converter.scale_mode,
+                'pages': [start, end],
+                'pdf': str(self.dxf_output_folder / outputs[filename]['output'])
+            }
+        manifest.record('dxf', combined_pdf_path, inputs)
+        incremental['dxf'] = {
+            'reused': [f for f, r in outputs.items() if r.get('reused')],
+            'rebuilt': [f for f, r in outputs.items() if not r.get('reused')]
+        }
+    
     def save_conversion_log(self, results: Dict[str, Any]) -> None:
         """Save detailed conversion log to JSON file."""
         log_file = self.logs_folder / f"conversion_log_{self.timestamp}.json"
@@ -315,7 +631,8 @@ class UnifiedConverter:
         summary = results['summary']
         
         logger.info(f"🕒 Session: {results['timestamp']}")
-        logger.info(f"⏱️  Duration: {summary['duration_seconds']:.1f} seconds")
+        logger.info(f"⏱️  Duration: {summary['duration_seconds']:.1f} seconds "
+                    f"(HTML {summary['html_duration_seconds']:.1f}s, DXF {summary['dxf_duration_seconds']:.1f}s)")
         logger.info(f"📁 Total input files: {summary['total_input_files']}")
         
         logger.info(f"\n📄 HTML CONVERSION:")
@@ -367,6 +684,7 @@ class UnifiedConverter:
 
 def main():
     """Main function for command-line usage."""
+    logging.basicConfig(level=logging.INFO)
     print("🚀 UNIFIED HTML & DXF TO PDF CONVERTER")
     print("="*70)
     
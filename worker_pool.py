@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Warm Worker Pool - DXF conversions in long-lived, pre-loaded processes
+
+Worker processes are forked from a fork server that has already imported
+ezdxf, its drawing add-on and matplotlib (with its font cache), and each
+worker renders a tiny drawing once at start-up so fonts and the PDF backend
+are resolved before the first real task. Workers are recycled after a fixed
+number of tasks to bound matplotlib's memory growth.
+
+Recycling replaces the whole executor once it has been given
+workers * max_tasks_per_worker tasks (the old one finishes its queue and
+exits): ProcessPoolExecutor's own max_tasks_per_child can stall on Python
+3.11 when a retiring worker is not replaced.
+"""
+
+import io
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = max(1, min(4, os.cpu_count() or 1))
+MAX_TASKS_PER_WORKER = 50
+# Imported once in the fork server; every worker inherits them
+PRELOAD_MODULES = ['matplotlib.figure', 'matplotlib.backends.backend_agg', 'matplotlib.backends.backend_pdf',
+                   'ezdxf', 'ezdxf.addons.drawing', 'ezdxf.addons.drawing.matplotlib', 'dxf_converter']
+
+# Per-process state of a worker
+_worker = {'tasks': 0, 'warmup_seconds': 0.0, 'converters': {}}
+
+
+def _warm_up() -> None:
+    """Worker initializer: load the drawing stack and resolve fonts once."""
+    started = time.perf_counter()
+    import ezdxf
+    from ezdxf.addons.drawing import Frontend, RenderContext
+    from ezdxf.addons.drawing.matplotlib import MatplotlibBackend
+    from matplotlib import font_manager
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    font_manager.findfont(font_manager.FontProperties(family=['sans-serif']))
+    doc = ezdxf.new()
+    msp = doc.modelspace()
+    msp.add_lwpolyline([(0, 0), (100, 0), (100, 50), (0, 50)], close=True)
+    msp.add_text("warm-up", dxfattribs={'height': 10}).set_placement((10, 10))
+    fig = Figure(figsize=(2, 1))
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0, 0, 1, 1])
+    Frontend(RenderContext(doc), MatplotlibBackend(ax)).draw_layout(msp, finalize=True)
+    fig.savefig(io.BytesIO(), format='pdf')
+    _worker['warmup_seconds'] = time.perf_counter() - started
+
+
+def _convert(dxf_path: str, pdf_path: Optional[str], scale_mode: str, output_folder: str,
+             max_pages: Optional[int], page_range: Optional[Tuple[int, int]] = None) -> Dict[str, Any]:
+    """Worker task: convert one DXF file with a converter cached per scale mode."""
+    from dxf_converter import DXFToPDFConverter
+
+    key = (scale_mode, output_folder)
+    converter = _worker['converters'].get(key)
+    if converter is None:
+        converter = _worker['converters'][key] = DXFToPDFConverter(output_folder=output_folder,
+                                                                   scale_mode=scale_mode)
+    _worker['tasks'] += 1
+    started = time.perf_counter()
+    success, output, pages = converter.convert_dxf_to_pdf(dxf_path, pdf_path, max_pages=max_pages,
+                                                          page_range=page_range)
+    return {
+        'success': success,
+        'output': output,
+        'pages': pages,
+        'pid': os.getpid(),
+        'task_number': _worker['tasks'],
+        'seconds': time.perf_counter() - started,
+        'warmup_seconds': _worker['warmup_seconds']
+    }
+
+
+def _summary(values: List[float]) -> Dict[str, Any]:
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    return {
+        'count': len(values),
+        'mean_seconds': round(sum(values) / len(values), 4),
+        'p50_seconds': round(ordered[len(ordered) // 2], 4),
+        'max_seconds': round(ordered[-1], 4)
+    }
+
+
+class WarmWorkerPool:
+    """
+    Process pool for DXF conversions with pre-loaded, recycled workers.
+
+    Latency is recorded per task inside the worker, split into each
+    worker's first task and later (steady-state) tasks, so a cold start is
+    visible separately in stats().
+    """
+
+    def __init__(self, workers: int = DEFAULT_WORKERS, max_tasks_per_worker: int = MAX_TASKS_PER_WORKER,
+                 output_folder: str = "OUTPUT_PDF"):
+        """
+        Args:
+            workers: Number of worker processes
+            max_tasks_per_worker: Tasks after which a worker is replaced by a fresh one
+            output_folder: Default folder of the per-file PDFs
+        """
+        self.workers = max(1, workers)
+        self.max_tasks_per_worker = max(1, max_tasks_per_worker)
+        self.output_folder = output_folder
+        self._lock = threading.Lock()
+        self._first: List[float] = []
+        self._steady: List[float] = []
+        self._warmups: List[float] = []
+        self._pids = set()
+        self._recycled = 0
+
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            self._context = multiprocessing.get_context('forkserver')
+            self._context.set_forkserver_preload(PRELOAD_MODULES)
+        else:
+            self._context = multiprocessing.get_context('spawn')
+        self._executor = self._new_executor()
+        self._submitted = 0
+        logger.info(f"🔥 Warm worker pool: {self.workers} process(es), recycled every "
+                    f"{self.max_tasks_per_worker} task(s)")
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=self._context, initializer=_warm_up)
+
+    def submit(self, dxf_path, pdf_path=None, scale_mode: str = 'standard',
+               max_pages: Optional[int] = None, page_range: Optional[Tuple[int, int]] = None) -> Future:
+        """
+        Queue one DXF conversion (or, with page_range, one batch of its pages).
+
+        Returns:
+            Future resolving to a dict with 'success', 'output', 'pages' and timing fields
+        """
+        with self._lock:
+            if self._submitted >= self.workers * self.max_tasks_per_worker:
+                # Queued tasks still run on the old workers, which then exit
+                self._executor.shutdown(wait=False)
+                self._executor = self._new_executor()
+                self._submitted = 0
+                self._recycled += 1
+            self._submitted += 1
+            future = self._executor.submit(_convert, str(dxf_path), str(pdf_path) if pdf_path else None,
+                                           scale_mode, self.output_folder, max_pages, page_range)
+        future.add_done_callback(self._record)
+        return future
+
+    def convert(self, dxf_path, pdf_path=None, scale_mode: str = 'standard',
+                max_pages: Optional[int] = None) -> Dict[str, Any]:
+        """Convert one DXF file and wait for the result."""
+        return self.submit(dxf_path, pdf_path, scale_mode, max_pages).result()
+
+    def _record(self, future: Future) -> None:
+        if future.cancelled() or future.exception() is not None:
+            return
+        result = future.result()
+        with self._lock:
+            if result['pid'] not in self._pids:
+                self._pids.add(result['pid'])
+                self._warmups.append(result['warmup_seconds'])
+            (self._first if result['task_number'] == 1 else self._steady).append(result['seconds'])
+
+    def stats(self) -> Dict[str, Any]:
+        """First-task and steady-state latency, warm-up time and worker recycling."""
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'max_tasks_per_worker': self.max_tasks_per_worker,
+                'processes_started': len(self._pids),
+                'recycled': self._recycled,
+                'warmup': _summary(self._warmups),
+                'first_task': _summary(self._first),
+                'steady_state': _summary(self._steady)
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self) -> 'WarmWorkerPool':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.shutdown()